@@ -11,7 +11,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from fastapi import APIRouter, Query, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Query, HTTPException, BackgroundTasks, Request
+from fastapi.responses import JSONResponse
 from typing import Optional, List
 import logging
 from datetime import datetime
@@ -23,6 +24,8 @@ from services.mobile_banner_crawler import MobileBannerCrawler
 from services.enhanced_mobile_banner_crawler import EnhancedMobileBannerCrawler
 from models.banner import BannerResponse
 from core.cache import get_banner_cache
+from core.shared_snapshot import is_snapshot_reader, forward_to_owner, register_owner_action
+from core.http_cache import build_etag, to_http_date, is_not_modified, cache_headers, not_modified_response
 from core.scheduler import get_scheduler
 
 logger = logging.getLogger(__name__)
@@ -35,6 +38,7 @@ _crawl_lock = threading.Lock()
 
 @router.get("/mobile", response_model=BannerResponse)
 async def get_mobile_banners(
+    request: Request,
     force_crawl: bool = Query(False, description="是否强制重新爬取")
 ):
     """
@@ -65,15 +69,48 @@ async def get_mobile_banners(
         
         # 如果有缓存数据且不强制爬取，返回缓存结果
         if not force_crawl and cache_status["cache_count"] > 0:
+            # 条件请求：缓存代数未变化时直接返回 304
+            etag = build_etag("banner", banner_cache.generation)
+            last_modified = to_http_date(cache_status["last_update"])
+            if is_not_modified(request, etag, last_modified):
+                return not_modified_response(etag, last_modified)
+            
             cached_images = banner_cache.get_banner_images()
             image_urls = [img.get('url', '') for img in cached_images if img.get('url')]
             
             logger.info("📋 返回缓存的Banner图片URL列表")
-            return BannerResponse(
+            # 缓存结果的时间戳使用缓存更新时间，保证同一 ETag 对应的响应内容完全一致
+            dropped = cache_status["dropped_count"]
+            banner_response = BannerResponse(
                 success=True,
                 images=image_urls,
                 total=len(image_urls),
-                message=f"获取手机版Banner图片成功（缓存），共 {len(image_urls)} 张"
+                dropped=dropped,
+                message=f"获取手机版Banner图片成功（缓存），共 {len(image_urls)} 张" + _dropped_note(dropped),
+                timestamp=cache_status["last_update"] or datetime.now().isoformat()
+            )
+            return JSONResponse(
+                content=banner_response.model_dump(),
+                headers=cache_headers(etag, last_modified)
+            )
+        
+        # 多进程模式下只读进程不爬取、不写入自己的缓存副本：强制爬取转交给 owner，缓存为空时等待 owner 更新
+        if force_crawl and forward_to_owner("banner_crawl"):
+            cached_images = banner_cache.get_banner_images()
+            image_urls = [img.get('url', '') for img in cached_images if img.get('url')]
+            banner_response = BannerResponse(
+                success=True,
+                images=image_urls,
+                total=len(image_urls),
+                message=f"爬取任务已转交负责爬取的工作进程，当前返回缓存中的 {len(image_urls)} 张图片"
+            )
+            return JSONResponse(status_code=202, content=banner_response.model_dump())
+        if is_snapshot_reader():
+            return BannerResponse(
+                success=False,
+                images=[],
+                total=0,
+                message="轮播图缓存暂无数据，请稍后再试"
             )
         
         logger.info("🚀 开始爬取手机版Banner图片URL")
@@ -98,6 +135,7 @@ async def get_mobile_banners(
         
         # 更新缓存
         banner_cache.update_cache(banner_images)
+        dropped = banner_cache.get_status()["dropped_count"]
         
         logger.info(f"✅ Banner爬取完成，共获取 {len(image_urls)} 张图片")
         
@@ -105,7 +143,8 @@ async def get_mobile_banners(
             success=True,
             images=image_urls,
             total=len(image_urls),
-            message=f"获取手机版Banner图片成功，共 {len(image_urls)} 张"
+            dropped=dropped,
+            message=f"获取手机版Banner图片成功，共 {len(image_urls)} 张" + _dropped_note(dropped)
         )
         
     except HTTPException:
@@ -171,6 +210,10 @@ async def get_mobile_banners_enhanced(
             message=f"增强版Banner爬虫失败: {str(e)}"
         )
 
+def _dropped_note(dropped: int) -> str:
+    """轮播图因超出内存预算未全部缓存时附加到响应消息中的说明"""
+    return f"（超出缓存内存预算，另有 {dropped} 张未缓存）" if dropped else ""
+
 def _crawl_enhanced_banners(download_images: bool = False) -> list:
     """
     同步执行增强版Banner爬取任务
@@ -286,6 +329,21 @@ async def get_banner_status():
         logger.error(f"❌ 获取轮播图状态失败: {e}")
         raise HTTPException(status_code=500, detail=f"获取轮播图状态失败: {str(e)}")
 
+async def _owner_banner_crawl():
+    """owner 执行只读进程转交的轮播图爬取"""
+    await get_scheduler().manual_banner_crawl()
+
+
+async def _owner_banner_clear():
+    """owner 执行只读进程转交的清空轮播图缓存"""
+    original_count = get_banner_cache().clear_cache(reset_status=False)
+    logger.info(f"🗑️ 轮播图缓存已清空，原有 {original_count} 张图片")
+
+
+register_owner_action("banner_crawl", _owner_banner_crawl)
+register_owner_action("banner_clear", _owner_banner_clear)
+
+
 @router.post("/crawl")
 async def manual_banner_crawl(
     use_enhanced: bool = Query(True, description="是否使用增强版爬虫"),
@@ -293,10 +351,18 @@ async def manual_banner_crawl(
 ):
     """
     手动触发轮播图爬取任务
+    多进程模式下只读进程把任务转交给负责爬取的工作进程并返回 202
     """
     try:
         logger.info(f"🚀 手动触发轮播图爬取 - 增强版: {use_enhanced}, 下载: {download_images}")
         
+        if forward_to_owner("banner_crawl"):
+            return JSONResponse(status_code=202, content={
+                "success": True,
+                "message": "轮播图爬取任务已转交负责爬取的工作进程，请稍后查看缓存更新状态",
+                "timestamp": datetime.now().isoformat()
+            })
+        
         # 触发调度器的手动爬取任务
         scheduler = get_scheduler()
         await scheduler.manual_banner_crawl()
@@ -337,17 +403,21 @@ async def manual_banner_crawl(
 async def clear_banner_cache():
     """
     清空轮播图缓存
+    多进程模式下只读进程把操作转交给负责爬取的工作进程并返回 202
     """
     try:
+        if forward_to_owner("banner_clear"):
+            return JSONResponse(status_code=202, content={
+                "success": True,
+                "message": "清空轮播图缓存已转交负责爬取的工作进程",
+                "timestamp": datetime.now().isoformat()
+            })
+        
         banner_cache = get_banner_cache()
         
-        # 清空缓存
-        with banner_cache._cache_lock:
-            original_count = len(banner_cache._cache)
-            banner_cache._cache.clear()
-            banner_cache._last_update = None
-            banner_cache._update_count = 0
-            
+        # 清空缓存（缓存代数加一使已下发的 ETag 失效），保持当前服务状态
+        original_count = banner_cache.clear_cache(reset_status=False)
+        
         logger.info(f"🗑️ 轮播图缓存已清空，原有 {original_count} 张图片")
         
         return {
@@ -391,7 +461,8 @@ async def get_banner_cache_info():
             "summary": {
                 "total_images": len(cache_data),
                 "last_update": status.get("last_update"),
-                "update_count": status.get("update_count", 0)
+                "update_count": status.get("update_count", 0),
+                "memory": banner_cache.get_cache_info()["memory"]
             },
             "timestamp": datetime.now().isoformat()
         }
@@ -0,0 +1,90 @@
+# Copyright (c) 2025 XBXyftx
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Optional, Set
+import json
+import logging
+
+from core.cache import get_news_cache, get_banner_cache
+from core.events import get_event_broadcaster, format_event_id, RESYNC_EVENT
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+# 可订阅的事件类型
+_TOPICS = {"news", "banner"}
+
+# 客户端断线后的重连间隔（毫秒）
+_RETRY_MS = 5000
+
+
+def _parse_last_event_id(value: Optional[str]) -> Optional[str]:
+    """解析 Last-Event-ID 请求头（"<epoch>-banner.<代数>-news.<代数>"），为空时视为没有"""
+    value = (value or "").strip()
+    return value or None
+
+
+async def _event_stream(topics: Set[str], last_event_id: Optional[str]) -> AsyncIterator[bytes]:
+    """
+    先发送当前各缓存代数，之后推送更新事件与心跳
+    hello 同样带上由当前代数生成的编号，没有 Last-Event-ID 的新连接从这些代数之后开始推送，
+    发送 hello 与开始订阅之间发布的事件也不会遗漏
+    """
+    broadcaster = get_event_broadcaster()
+    epoch = broadcaster.epoch
+    positions = {"news": get_news_cache().generation, "banner": get_banner_cache().generation}
+    hello_id = format_event_id(epoch, positions)
+    hello = {"epoch": epoch, "news_generation": positions["news"], "banner_generation": positions["banner"]}
+    yield f"retry: {_RETRY_MS}\nid: {hello_id}\nevent: hello\ndata: {json.dumps(hello)}\n\n".encode("utf-8")
+
+    async for event in broadcaster.subscribe(last_event_id or hello_id):
+        if event is None:
+            yield b": keepalive\n\n"
+        elif event.event in topics or event.event == RESYNC_EVENT:
+            yield event.encode()
+
+
+@router.get("/")
+async def stream_events(
+    request: Request,
+    topics: Optional[str] = Query(None, description="只订阅指定事件，逗号分隔：news,banner（默认全部）")
+):
+    """
+    缓存更新事件流（Server-Sent Events）
+    新闻或轮播图缓存发布新代数时推送一条小事件（代数与变更计数），客户端收到后再调用
+    /api/news/changes 增量同步或重新获取轮播图，无需定时轮询；
+    连接建立时先发送 hello 事件告知当前代数，断线重连时浏览器自动带上 Last-Event-ID 补发错过的事件
+    （编号由各缓存代数组成，重连到任意工作进程都能补发）；
+    服务重启或错过的事件已超出保留范围时改为推送 resync 事件，客户端需要全量同步
+    """
+    selected = {topic.strip() for topic in topics.split(",")} & _TOPICS if topics else set(_TOPICS)
+    last_event_id = _parse_last_event_id(request.headers.get("last-event-id"))
+    logger.info(f"📡 [事件流] 新订阅: topics={sorted(selected)}, last_event_id={last_event_id}")
+
+    return StreamingResponse(
+        _event_stream(selected, last_event_id),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # 关闭 nginx 对该响应的缓冲，事件才能即时送达
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+@router.get("/stats")
+async def get_event_stats():
+    """事件广播统计：当前订阅数、已推送事件数等"""
+    return get_event_broadcaster().get_stats()
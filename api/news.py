@@ -11,28 +11,55 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from fastapi import APIRouter, Query, HTTPException, Depends
-from typing import List, Optional
+from fastapi import APIRouter, Query, HTTPException, Depends, Request
+from fastapi.responses import Response, StreamingResponse
+from typing import List, Optional, Union
 import logging
-from datetime import datetime
+from datetime import datetime, date
 
 from services.openharmony_news_crawler import OpenHarmonyNewsCrawler
 from services.news_service import get_news_service, NewsSource
-from models.news import NewsArticle, NewsResponse
+from models.news import (
+    NewsArticle, NewsResponse, SearchScope, NewsSort, NewsView, NewsSummaryResponse, NewsFormat,
+    NewsFacets, NewsChangesResponse
+)
 from core.database import get_db
 from core.scheduler import get_scheduler
 from core.cache import get_news_cache, ServiceStatus
+from core.shared_snapshot import forward_to_owner, register_owner_action
+from core.http_cache import (
+    build_etag, to_http_date, is_not_modified, cache_headers, not_modified_response, choose_encoding,
+    get_boot_id
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/news", tags=["news"])
 
-@router.get("/", response_model=NewsResponse)
+def _json_bytes_response(body: bytes, headers: Optional[dict] = None,
+                         encoding: Optional[str] = None) -> Response:
+    """直接返回预序列化（可能已预压缩）的 JSON 字节，绕过 response_model 的校验与序列化"""
+    headers = dict(headers or {})
+    headers["Vary"] = "Accept-Encoding"
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/", response_model=Union[NewsResponse, NewsSummaryResponse])
 async def get_news(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
     category: Optional[str] = Query(None, description="新闻分类"),
     search: Optional[str] = Query(None, description="搜索关键词"),
-    all: bool = Query(False, description="是否返回全部新闻不分页")
+    search_scope: SearchScope = Query(SearchScope.TITLE, description="搜索范围：title=标题和摘要，content=同时搜索正文"),
+    sort: NewsSort = Query(NewsSort.DATE, description="排序方式：date=按日期，relevance=按搜索相关度"),
+    cursor: Optional[str] = Query(None, description="分页游标（取自上一页的 next_cursor），传入时忽略 page"),
+    view: NewsView = Query(NewsView.FULL, description="返回视图：full=完整文章，summary=不含正文的列表视图"),
+    start_date: Optional[date] = Query(None, description="起始日期（含），格式 YYYY-MM-DD"),
+    end_date: Optional[date] = Query(None, description="结束日期（含），格式 YYYY-MM-DD"),
+    all: bool = Query(False, description="是否返回全部新闻不分页"),
+    format: NewsFormat = Query(NewsFormat.JSON, description="响应格式：json=单个JSON，ndjson=流式逐行导出全部匹配新闻")
 ):
     """
     获取新闻列表，支持分页、分类和搜索
@@ -42,7 +69,13 @@ async def get_news(
     - page_size: 每页数量（当all=True时忽略）
     - category: 新闻分类过滤
     - search: 搜索关键词
+    - search_scope: 搜索范围，content 时同时搜索正文中的文本和代码块
+    - sort: 排序方式，relevance 时按 BM25 相关度排序（需配合 search 使用）
+    - cursor: 游标分页，取上一页返回的 next_cursor，数据刷新后也不会重复或跳过
+    - view: summary 时只返回元数据、封面图和摘录，正文通过 /api/news/{article_id} 获取
+    - start_date/end_date: 日期区间过滤（闭区间），可与分类、搜索组合，用于增量同步某日之后的新闻
     - all: 是否返回全部新闻不分页，为true时返回所有匹配的新闻
+    - format: ndjson 时以流的形式逐行返回全部匹配的新闻（每行一篇，忽略分页参数），适合全量导出
     """
     try:
         # 从缓存获取数据
@@ -67,34 +100,85 @@ async def get_news(
                 has_prev=False
             )
         
+        # 预序列化页面可直接使用预压缩版本，压缩编码也计入 ETag（不同编码是不同的表示）
+        # 流式导出不做预压缩
+        streaming = format == NewsFormat.NDJSON
+        encoding = None if search or streaming else choose_encoding(request.headers.get("accept-encoding"))
+        
+        # 条件请求：ETag 由缓存代数 + 查询参数生成，数据未更新时直接返回 304
+        # 先读取代数再取数据，保证 ETag 不会比响应内容新
+        etag = build_etag("news", cache.generation, {
+            "page": page, "page_size": page_size, "category": category, "search": search,
+            "search_scope": search_scope.value, "sort": sort.value, "all": all,
+            "cursor": cursor, "view": view.value, "encoding": encoding, "format": format.value,
+            "start_date": start_date, "end_date": end_date
+        })
+        last_modified = to_http_date(cache_status["last_update"])
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        headers = cache_headers(etag, last_modified)
+        
+        # 流式导出：逐篇序列化并立即发送，不在内存中拼装完整响应
+        if streaming:
+            lines = cache.iter_news_ndjson(category=category, search=search,
+                                           search_scope=search_scope, sort=sort, view=view,
+                                           start_date=start_date, end_date=end_date)
+            return StreamingResponse(lines, media_type="application/x-ndjson", headers=headers)
+        
+        # 无搜索条件时优先返回预序列化好的页面
+        date_range = start_date is not None or end_date is not None
+        if not search and not date_range and not (cursor and not all):
+            body = cache.render_news_page(page=page, page_size=page_size,
+                                          category=category, all_pages=all,
+                                          encoding=encoding, view=view)
+            if body is not None:
+                return _json_bytes_response(body, headers, encoding)
+        
+        response.headers.update(headers)
+        
         # 从缓存获取数据
         if all:
             # 如果要返回全部数据，设置一个很大的page_size来获取所有数据
             result = cache.get_news(page=1, page_size=10000, 
-                                  category=category, search=search)
+                                  category=category, search=search,
+                                  search_scope=search_scope, sort=sort,
+                                  view=view, start_date=start_date, end_date=end_date)
             # 重新设置分页信息，表示这是全部数据
             result.page = 1
             result.page_size = result.total
             result.has_next = False
             result.has_prev = False
+            result.next_cursor = None
         else:
-            # 正常分页逻辑
+            # 正常分页逻辑（支持游标）
             result = cache.get_news(page=page, page_size=page_size, 
-                                  category=category, search=search)
+                                  category=category, search=search,
+                                  search_scope=search_scope, sort=sort,
+                                  cursor=cursor, view=view,
+                                  start_date=start_date, end_date=end_date)
         
+        if view == NewsView.SUMMARY:
+            # 列表视图直接序列化，避免 response_model 按联合类型逐个尝试校验
+            return _json_bytes_response(result.model_dump_json().encode("utf-8"), headers)
         return result
         
     except HTTPException:
         raise
+    except ValueError as e:
+        # 参数不合法（如游标无效）
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"获取新闻列表失败: {e}")
         raise HTTPException(status_code=500, detail="获取新闻列表失败")
 
-@router.get("/openharmony", response_model=NewsResponse)
+@router.get("/openharmony", response_model=Union[NewsResponse, NewsSummaryResponse])
 async def get_openharmony_news(
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
-    search: Optional[str] = Query(None, description="搜索关键词")
+    search: Optional[str] = Query(None, description="搜索关键词"),
+    search_scope: SearchScope = Query(SearchScope.TITLE, description="搜索范围：title=标题和摘要，content=同时搜索正文"),
+    cursor: Optional[str] = Query(None, description="分页游标（取自上一页的 next_cursor），传入时忽略 page"),
+    view: NewsView = Query(NewsView.FULL, description="返回视图：full=完整文章，summary=不含正文的列表视图")
 ):
     """
     获取OpenHarmony官网最新资讯
@@ -122,36 +206,38 @@ async def get_openharmony_news(
                 has_prev=False
             )
         
-        # 从缓存获取数据，只返回OpenHarmony来源的文章
+        # 无搜索条件时优先返回预序列化好的页面
+        if not search and not cursor:
+            body = cache.render_news_page(page=page, page_size=page_size,
+                                          category="官方动态", source="OpenHarmony", view=view)
+            if body is not None:
+                return _json_bytes_response(body)
+        
+        # 从缓存获取数据，只返回OpenHarmony来源的文章（分类+来源索引，分页前完成过滤）
         result = cache.get_news(page=page, page_size=page_size, 
-                              category="官方动态", search=search)
-        
-        # 过滤只保留OpenHarmony来源的文章
-        filtered_articles = [
-            article for article in result.articles 
-            if getattr(article, 'source', None) == 'OpenHarmony'
-        ]
-        
-        return NewsResponse(
-            articles=filtered_articles,
-            total=len(filtered_articles),
-            page=page,
-            page_size=page_size,
-            has_next=len(filtered_articles) == page_size,
-            has_prev=page > 1
-        )
+                                category="官方动态", source="OpenHarmony", search=search,
+                                search_scope=search_scope, cursor=cursor, view=view)
+        if view == NewsView.SUMMARY:
+            return _json_bytes_response(result.model_dump_json().encode("utf-8"))
+        return result
         
     except HTTPException:
         raise
+    except ValueError as e:
+        # 参数不合法（如游标无效）
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"获取OpenHarmony官网新闻失败: {e}")
         raise HTTPException(status_code=500, detail="获取OpenHarmony官网新闻失败")
 
-@router.get("/blog", response_model=NewsResponse)
+@router.get("/blog", response_model=Union[NewsResponse, NewsSummaryResponse])
 async def get_openharmony_blog(
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
-    search: Optional[str] = Query(None, description="搜索关键词")
+    search: Optional[str] = Query(None, description="搜索关键词"),
+    search_scope: SearchScope = Query(SearchScope.TITLE, description="搜索范围：title=标题和摘要，content=同时搜索正文"),
+    cursor: Optional[str] = Query(None, description="分页游标（取自上一页的 next_cursor），传入时忽略 page"),
+    view: NewsView = Query(NewsView.FULL, description="返回视图：full=完整文章，summary=不含正文的列表视图")
 ):
     """
     获取OpenHarmony技术博客文章
@@ -179,44 +265,59 @@ async def get_openharmony_blog(
                 has_prev=False
             )
         
-        # 从缓存获取数据，只返回技术博客来源的文章
+        # 无搜索条件时优先返回预序列化好的页面
+        if not search and not cursor:
+            body = cache.render_news_page(page=page, page_size=page_size,
+                                          category="技术博客", source="OpenHarmony技术博客", view=view)
+            if body is not None:
+                return _json_bytes_response(body)
+        
+        # 从缓存获取数据，只返回技术博客来源的文章（分类+来源索引，分页前完成过滤）
         result = cache.get_news(page=page, page_size=page_size, 
-                              category="技术博客", search=search)
-        
-        # 过滤只保留OpenHarmony技术博客来源的文章
-        filtered_articles = [
-            article for article in result.articles 
-            if getattr(article, 'source', None) == 'OpenHarmony技术博客'
-        ]
-        
-        return NewsResponse(
-            articles=filtered_articles,
-            total=len(filtered_articles),
-            page=page,
-            page_size=page_size,
-            has_next=len(filtered_articles) == page_size,
-            has_prev=page > 1
-        )
+                                category="技术博客", source="OpenHarmony技术博客", search=search,
+                                search_scope=search_scope, cursor=cursor, view=view)
+        if view == NewsView.SUMMARY:
+            return _json_bytes_response(result.model_dump_json().encode("utf-8"))
+        return result
         
     except HTTPException:
         raise
+    except ValueError as e:
+        # 参数不合法（如游标无效）
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"获取OpenHarmony技术博客失败: {e}")
         raise HTTPException(status_code=500, detail="获取OpenHarmony技术博客失败")
 
 
-@router.post("/crawl")
+async def _owner_crawl(source: str):
+    """owner 执行只读进程转交的手动爬取"""
+    await get_scheduler().manual_crawl(NewsSource(source))
+
+
+async def _owner_refresh():
+    """owner 执行只读进程转交的缓存刷新"""
+    await get_scheduler().initial_cache_load()
+
+
+register_owner_action("news_crawl", _owner_crawl)
+register_owner_action("news_refresh", _owner_refresh)
+
+
+@router.post("/crawl", status_code=202)
 async def crawl_news(
     source: NewsSource = Query(NewsSource.ALL, description="新闻来源"),
     limit: int = Query(10, ge=1, le=100, description="返回数量限制")
 ):
     """
     手动触发新闻爬取（会更新缓存）
+    多进程模式下只读进程把任务转交给负责爬取的工作进程，任意工作进程都返回 202
     """
     try:
-        # 获取调度器并执行手动爬取
-        scheduler = get_scheduler()
-        await scheduler.manual_crawl(source)
+        # 获取调度器并执行手动爬取（只读进程转交给 owner）
+        if not forward_to_owner("news_crawl", source=source.value):
+            scheduler = get_scheduler()
+            await scheduler.manual_crawl(source)
         
         return {
             "message": f"爬取任务已启动 - 来源: {source.value}",
@@ -229,6 +330,93 @@ async def crawl_news(
         logger.error(f"启动爬取任务失败: {e}")
         raise HTTPException(status_code=500, detail="启动爬取任务失败")
 
+@router.get("/facets", response_model=NewsFacets)
+async def get_news_facets(
+    request: Request,
+    response: Response,
+    search: Optional[str] = Query(None, description="搜索关键词（只统计命中的文章）"),
+    search_scope: SearchScope = Query(SearchScope.TITLE, description="搜索范围：title=标题和摘要，content=同时搜索正文"),
+    category: Optional[str] = Query(None, description="新闻分类"),
+    source: Optional[str] = Query(None, description="新闻来源")
+):
+    """
+    获取筛选项计数：各分类、各来源、各年月（YYYY-MM）的文章数量
+    无过滤条件时返回缓存写入时预先算好的结果，可替代客户端下载全部新闻自行统计
+    """
+    try:
+        cache = get_news_cache()
+        cache_status = cache.get_status()
+        
+        # 检查服务状态
+        if cache_status["status"] == ServiceStatus.ERROR.value:
+            raise HTTPException(
+                status_code=503, 
+                detail=f"服务暂时不可用: {cache_status.get('error_message', '未知错误')}"
+            )
+        
+        etag = build_etag("facets", cache.generation, {
+            "search": search, "search_scope": search_scope.value,
+            "category": category, "source": source
+        })
+        last_modified = to_http_date(cache_status["last_update"])
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        response.headers.update(cache_headers(etag, last_modified))
+        
+        return cache.get_facets(search=search, category=category, source=source,
+                                search_scope=search_scope)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取筛选项计数失败: {e}")
+        raise HTTPException(status_code=500, detail="获取筛选项计数失败")
+
+@router.get("/changes", response_model=NewsChangesResponse)
+async def get_news_changes(
+    request: Request,
+    response: Response,
+    since: int = Query(..., ge=0, description="上次同步得到的缓存代数（generation），首次同步先全量拉取列表"),
+    epoch: Optional[str] = Query(None, description="上次同步得到的 epoch，服务重启后不一致时要求全量同步"),
+    view: NewsView = Query(NewsView.SUMMARY, description="返回视图：summary=不含正文的列表视图，full=完整文章")
+):
+    """
+    增量同步：只返回缓存代数 since 之后新增、修改、移除的文章
+    客户端保存响应中的 generation 与 epoch，下次同步时传回；
+    resync 为 true 时说明变更日志已截断或服务已重启，需要重新全量拉取
+    """
+    try:
+        cache = get_news_cache()
+        cache_status = cache.get_status()
+        
+        # 检查服务状态
+        if cache_status["status"] == ServiceStatus.ERROR.value:
+            raise HTTPException(
+                status_code=503, 
+                detail=f"服务暂时不可用: {cache_status.get('error_message', '未知错误')}"
+            )
+        
+        boot_id = get_boot_id()
+        if epoch is not None and epoch != boot_id:
+            logger.info(f"🔁 [增量同步] epoch 不一致（{epoch} != {boot_id}），需要全量同步")
+            return NewsChangesResponse(generation=cache.generation, since=since, epoch=boot_id, resync=True)
+        
+        etag = build_etag("changes", cache.generation, {"since": since, "view": view.value})
+        last_modified = to_http_date(cache_status["last_update"])
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        response.headers.update(cache_headers(etag, last_modified))
+        
+        changes = cache.get_changes(since, view=view)
+        changes.epoch = boot_id
+        return changes
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"获取增量变更失败: {e}")
+        raise HTTPException(status_code=500, detail="获取增量变更失败")
+
 @router.get("/{article_id}", response_model=NewsArticle)
 async def get_article_detail(article_id: str):
     """
@@ -246,14 +434,13 @@ async def get_article_detail(article_id: str):
                 detail=f"服务暂时不可用: {cache_status.get('error_message', '未知错误')}"
             )
         
-        # 获取所有文章并查找指定ID
-        all_news = cache.get_news(page=1, page_size=1000)
-        for article in all_news.articles:
-            if article.id == article_id:
-                return article
+        # 通过ID哈希索引直接定位文章
+        article = cache.get_article(article_id)
+        if article is None:
+            # 如果没找到，返回404
+            raise HTTPException(status_code=404, detail="文章不存在")
         
-        # 如果没找到，返回404
-        raise HTTPException(status_code=404, detail="文章不存在")
+        return article
         
     except HTTPException:
         raise
@@ -276,12 +463,15 @@ async def get_service_status():
         
         return {
             "service_status": status_info,
+            "cache_info": cache.get_cache_info(),
             "news_sources": news_sources,
             "timestamp": datetime.now().isoformat(),
             "endpoints": {
                 "all_news": "/api/news/",
                 "openharmony_news": "/api/news/openharmony",
                 "openharmony_blog": "/api/news/blog",
+                "news_facets": "/api/news/facets",
+                "news_changes": "/api/news/changes?since={generation}",
                 "news_detail": "/api/news/{article_id}",
                 "manual_crawl": "/api/news/crawl",
                 "service_status": "/api/news/status/info",
@@ -293,18 +483,19 @@ async def get_service_status():
         logger.error(f"获取服务状态失败: {e}")
         raise HTTPException(status_code=500, detail="获取服务状态失败")
 
-@router.post("/cache/refresh")
+@router.post("/cache/refresh", status_code=202)
 async def refresh_cache():
     """
-    手动刷新缓存
+    手动刷新缓存（爬取在后台执行，多进程模式下只读进程转交给负责爬取的工作进程）
     """
     try:
-        # 获取调度器并执行初始缓存加载
-        scheduler = get_scheduler()
-        await scheduler.initial_cache_load()
+        # 获取调度器并执行初始缓存加载（只读进程转交给 owner）
+        if not forward_to_owner("news_refresh"):
+            scheduler = get_scheduler()
+            await scheduler.initial_cache_load()
         
         return {
-            "message": "缓存刷新成功",
+            "message": "缓存刷新任务已启动",
             "timestamp": datetime.now().isoformat()
         }
         
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+缓存内存报告：比较每篇文章以 pydantic 模型保存、以紧凑条目（_CachedArticle）保存、
+以及正文外置到 SQLite 后只保留元数据时的内存占用，并给出外置后读取详情的耗时
+
+用法：python benchmark_cache_memory.py [文章数]
+使用 tracemalloc 统计构建后仍然存活的内存，模拟典型公众号文章：
+十几个文本块、若干图片（头图/尾图在文章间重复），分类与来源只有少数几种取值
+"""
+import gc
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from core.blob_store import SQLiteBlobStore
+from core.cache import NewsCache, _CachedArticle
+from models.news import NewsArticle
+
+logging.disable(logging.CRITICAL)
+
+_SHARED_IMAGES = [f"https://example.com/static/banner-{i}.png" for i in range(5)]
+_CATEGORIES = [("官方动态", "OpenHarmony"), ("技术博客", "OpenHarmony技术博客")]
+
+
+def _fresh_copy(value: str) -> str:
+    """复制出一个新的字符串对象（模拟每篇文章从 JSON/HTML 中各自解析出的字符串）"""
+    return "".join(list(value))
+
+
+def make_payloads(count: int):
+    """生成爬虫输出格式的原始数据（字符串都是独立对象，与真实解析结果一致）"""
+    random.seed(7)
+    payloads = []
+    for index in range(count):
+        category, source = random.choice(_CATEGORIES)
+        content = [{"type": "image", "value": _fresh_copy(random.choice(_SHARED_IMAGES))}]
+        for block in range(15):
+            content.append({"type": "text", "value": f"第{block}段：" + "鸿蒙生态开发实践" * random.randint(3, 12)})
+            if block % 5 == 4:
+                content.append({"type": "image", "value": f"https://example.com/img/{index}-{block}.png"})
+        content.append({"type": "image", "value": _fresh_copy(random.choice(_SHARED_IMAGES))})
+        payloads.append({
+            "id": f"{index:016x}",
+            "title": f"OpenHarmony 技术文章 {index}",
+            "date": f"2024-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
+            "url": f"https://example.com/article/{index}",
+            "content": content,
+            "category": _fresh_copy(category),
+            "summary": "",
+            "source": _fresh_copy(source),
+        })
+    return payloads
+
+
+def measure(build) -> int:
+    """返回 build() 结果存活时占用的字节数"""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del result
+    return used
+
+
+def build_models(payloads):
+    return [NewsArticle(**payload) for payload in payloads]
+
+
+def build_entries(payloads):
+    # 只保留紧凑条目，中间的 pydantic 模型随即释放
+    return [_CachedArticle(NewsArticle(**payload), 20240101) for payload in payloads]
+
+
+def build_offloaded_entries(cache: NewsCache, payloads):
+    # 正文写入 SQLite，条目中只剩元数据
+    return cache._build_entries([NewsArticle(**payload) for payload in payloads])
+
+
+def measure_detail_latency(cache: NewsCache, payloads, samples: int = 500) -> float:
+    """正文外置时读取单篇详情的平均耗时（毫秒），随机访问以避开热点 LRU"""
+    cache.update_cache([NewsArticle(**payload) for payload in payloads])
+    ids = [payload["id"] for payload in random.sample(payloads, min(samples, len(payloads)))]
+    started = time.perf_counter()
+    for article_id in ids:
+        cache.get_article(article_id)
+    return (time.perf_counter() - started) / len(ids) * 1000
+
+
+def run(count: int = 2000):
+    payloads = make_payloads(count)
+    models_bytes = measure(lambda: build_models(payloads))
+    entries_bytes = measure(lambda: build_entries(payloads))
+    with tempfile.TemporaryDirectory() as directory:
+        cache = NewsCache(blob_store=SQLiteBlobStore(os.path.join(directory, "content.db")))
+        offloaded_bytes = measure(lambda: build_offloaded_entries(cache, payloads))
+        detail_ms = measure_detail_latency(cache, payloads)
+
+    print(f"📊 {count} 篇文章，每篇约 {len(payloads[0]['content'])} 个内容块")
+    print(f"  pydantic 模型:  {models_bytes / count:10.0f} 字节/篇  ({models_bytes / 1024 / 1024:.1f} MB)")
+    print(f"  紧凑条目:      {entries_bytes / count:10.0f} 字节/篇  ({entries_bytes / 1024 / 1024:.1f} MB)")
+    print(f"  正文外置:      {offloaded_bytes / count:10.0f} 字节/篇  ({offloaded_bytes / 1024 / 1024:.1f} MB)")
+    print(f"  节省:          {(1 - entries_bytes / models_bytes) * 100:9.1f}% / {(1 - offloaded_bytes / models_bytes) * 100:.1f}%")
+    print(f"  外置后详情读取: {detail_ms:9.3f} ms/篇")
+    print("  （紧凑条目已包含排序键、内容摘要、封面图与摘录等预计算数据）")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+日期解析微基准：统一解析器（core.date_utils）与此前各自实现的解析函数对比
+
+用法：python benchmark_date_parsing.py [文章数]
+模拟列表接口的典型输入：几千篇文章的日期只分布在几百个不同的日子上，格式混杂
+"""
+import random
+import re
+import sys
+import timeit
+from datetime import datetime
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from core.date_utils import parse_date, normalize_date, normalize_dates, _parse_memoized
+
+
+# ---- 此前的实现（去掉日志，仅用于对比） ----
+
+def legacy_standardize_date(date_str):
+    """原 OpenHarmonyNewsCrawler._standardize_date"""
+    if not date_str:
+        return ''
+    match = re.search(r'(\d{4})[.\-\/年](\d{1,2})[.\-\/月](\d{1,2})[日]?', str(date_str))
+    if match:
+        year, month, day = match.groups()
+        return f"{year}-{int(month):02d}-{int(day):02d}"
+    month_match = re.search(r'(\d{4})[.\-\/年](\d{1,2})[月]?', str(date_str))
+    if month_match:
+        year, month = month_match.groups()
+        return f"{year}-{int(month):02d}-01"
+    return date_str
+
+
+def legacy_format_date(date_str):
+    """原 OpenHarmonyBlogCrawler._format_date"""
+    if not date_str:
+        return datetime.now().strftime('%Y-%m-%d')
+    if '.' in date_str:
+        date_str = date_str.replace('.', '-')
+    try:
+        return datetime.strptime(date_str, '%Y-%m-%d').strftime('%Y-%m-%d')
+    except ValueError:
+        return date_str
+
+
+def legacy_parse_date_for_sorting(date_str):
+    """原 NewsCache._parse_date_for_sorting（正则部分）"""
+    if not date_str or not isinstance(date_str, str):
+        return datetime(1970, 1, 1)
+    date_str = date_str.strip()
+    date_patterns = [
+        r'(\d{4})[-./](\d{1,2})[-./](\d{1,2})',
+        r'(\d{4})年(\d{1,2})月(\d{1,2})日?',
+        r'(\d{4})年(\d{1,2})月(\d{1,2})',
+        r'(\d{1,2})[-./](\d{1,2})[-./](\d{4})',
+    ]
+    for pattern in date_patterns:
+        match = re.search(pattern, date_str)
+        if match:
+            if pattern.startswith(r'(\d{1,2})'):
+                day, month, year = match.groups()
+            else:
+                year, month, day = match.groups()
+            try:
+                return datetime(int(year), int(month), int(day))
+            except ValueError:
+                continue
+    return datetime(1970, 1, 1)
+
+
+# ---- 基准 ----
+
+def make_dates(count: int):
+    """生成格式混杂、大量重复的日期字符串"""
+    random.seed(42)
+    formats = ["{y}-{m:02d}-{d:02d}", "{y}.{m}.{d}", "{y}/{m:02d}/{d:02d}", "{y}年{m:02d}月{d:02d}日"]
+    days = [(random.randint(2019, 2025), random.randint(1, 12), random.randint(1, 28)) for _ in range(300)]
+    return [random.choice(formats).format(y=y, m=m, d=d) for y, m, d in random.choices(days, k=count)]
+
+
+def run(count: int = 5000, repeat: int = 5):
+    dates = make_dates(count)
+    cases = [
+        ("原 _standardize_date", lambda: [legacy_standardize_date(d) for d in dates]),
+        ("原 _format_date", lambda: [legacy_format_date(d) for d in dates]),
+        ("原 _parse_date_for_sorting", lambda: [legacy_parse_date_for_sorting(d) for d in dates]),
+        ("parse_date（冷启动）", lambda: (_parse_memoized.cache_clear(), [parse_date(d) for d in dates])),
+        ("normalize_date（已记忆）", lambda: [normalize_date(d) for d in dates]),
+        ("normalize_dates 批量", lambda: normalize_dates(dates)),
+    ]
+
+    print(f"📊 {count} 个日期（{len(set(dates))} 个不同值），每项取 {repeat} 次中的最好成绩")
+    for name, func in cases:
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        print(f"  {name:<28} {best * 1000:8.2f} ms  ({best / count * 1e6:6.2f} µs/个)")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
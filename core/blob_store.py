@@ -0,0 +1,154 @@
+# Copyright (c) 2025 XBXyftx
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+文章正文的外部存储（blob store）
+新闻缓存只在内存中保留元数据，正文内容块按键写入这里，详情/完整列表请求时再按需读取。
+- MemoryBlobStore：保存在进程内字典中（序列化后保存，主要用于测试）
+- SQLiteBlobStore：保存在本地 SQLite 文件中，常驻内存只剩元数据
+"""
+
+import os
+import sqlite3
+import logging
+import threading
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# SQLite 单条语句的参数个数上限较低，批量读取/删除时分块执行
+_SQLITE_BATCH_SIZE = 500
+
+
+class BlobStore:
+    """正文存储接口：键为字符串，值为已序列化的字节串"""
+
+    def put_many(self, items: Iterable[Tuple[str, bytes]]):
+        raise NotImplementedError
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, bytes]:
+        """批量读取，缺失的键不出现在结果中"""
+        raise NotImplementedError
+
+    def delete_many(self, keys: Iterable[str]):
+        raise NotImplementedError
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_many([key]).get(key)
+
+    def clear(self):
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict[str, int]:
+        raise NotImplementedError
+
+
+class MemoryBlobStore(BlobStore):
+    """进程内字典实现"""
+
+    def __init__(self):
+        self._items: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def put_many(self, items: Iterable[Tuple[str, bytes]]):
+        with self._lock:
+            self._items.update(items)
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, bytes]:
+        items = self._items
+        return {key: items[key] for key in keys if key in items}
+
+    def delete_many(self, keys: Iterable[str]):
+        with self._lock:
+            for key in keys:
+                self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"count": len(self._items), "bytes": sum(map(len, self._items.values()))}
+
+
+class SQLiteBlobStore(BlobStore):
+    """
+    SQLite 实现：单表主键查找，读取一篇正文通常在 1ms 以内
+    内容随缓存重建，启动时清空旧数据；连接在线程间共享，用锁串行化访问
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=OFF")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS blobs (key TEXT PRIMARY KEY, value BLOB NOT NULL)")
+            self._conn.execute("DELETE FROM blobs")
+            self._conn.commit()
+        logger.info(f"🗄️ 正文存储使用 SQLite: {path}")
+
+    def put_many(self, items: Iterable[Tuple[str, bytes]]):
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO blobs (key, value) VALUES (?, ?)", items)
+            self._conn.commit()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, bytes]:
+        result: Dict[str, bytes] = {}
+        keys = list(keys)
+        with self._lock:
+            for start in range(0, len(keys), _SQLITE_BATCH_SIZE):
+                chunk = keys[start:start + _SQLITE_BATCH_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM blobs WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                result.update(rows)
+        return result
+
+    def delete_many(self, keys: Iterable[str]):
+        keys = list(keys)
+        if not keys:
+            return
+        with self._lock:
+            self._conn.executemany("DELETE FROM blobs WHERE key = ?", ((key,) for key in keys))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM blobs")
+            self._conn.commit()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            count, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM blobs"
+            ).fetchone()
+        return {"count": count, "bytes": size}
+
+
+def create_blob_store(kind: str, path: str) -> Optional[BlobStore]:
+    """
+    按配置创建正文存储；kind 为 resident 时返回 None，表示正文直接常驻在缓存条目中
+    """
+    kind = (kind or "resident").lower()
+    if kind == "resident":
+        return None
+    if kind == "memory":
+        return MemoryBlobStore()
+    if kind == "sqlite":
+        return SQLiteBlobStore(path)
+    raise ValueError(f"不支持的正文存储类型: {kind}")
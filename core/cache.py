@@ -12,15 +12,34 @@
 # limitations under the License.
 
 
+import base64
+import sys
+import hashlib
+import heapq
+import itertools
 import json
 import logging
 import threading
 import time
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from functools import partial
+from operator import attrgetter
+from typing import List, Optional, Dict, Any, Callable, Iterator, Sequence, Tuple, Union
+from datetime import datetime, date
 from enum import Enum
 
-from models.news import NewsArticle, NewsResponse
+from models.news import (
+    NewsArticle, NewsContentBlock, NewsResponse, ContentType, SearchScope, NewsSort,
+    NewsView, NewsArticleSummary, NewsSummaryResponse, NewsFacets, NewsChangeSet, NewsChangesResponse
+)
+from core.config import settings
+from core.lru_cache import LRUCache
+from core.http_cache import compress_body
+from core.search_index import NgramIndex, merge_doc_ids
+from core.date_utils import parse_dates
+from core.blob_store import BlobStore, create_blob_store
+from core.memory_budget import MemoryBudget, estimate_size
+from core.events import publish_event
+from core.shared_snapshot import MappedSnapshot, MmapBlobStore, is_snapshot_reader, notify_snapshot_changed
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -28,37 +47,674 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# 列表视图摘录的最大长度（字符）
+_EXCERPT_LENGTH = 120
+
+# 正文存放在外部存储时，每次批量读取的文章数（导出、建索引时分批读取，内存占用恒定）
+_CONTENT_LOAD_BATCH = 200
+
+# 首次加载分批写入时，写入停顿多久（秒）后再在后台为最新快照构建搜索索引
+_INDEX_BUILD_DELAY = 2.0
+
+# 相关度排序时各字段的 BM25 权重
+_RELEVANCE_FIELD_WEIGHTS = {
+    "title": 3.0,
+    "summary": 1.5,
+    "content": 1.0,
+}
+
 class ServiceStatus(str, Enum):
     """服务状态枚举"""
     READY = "ready"           # 服务就绪
     PREPARING = "preparing"   # 准备中（数据更新中）
     ERROR = "error"           # 错误状态
 
+def _date_to_key(value: date) -> int:
+    """把日期压缩成 YYYYMMDD 形式的整数，整数比较即日期比较"""
+    return value.year * 10000 + value.month * 100 + value.day
+
+
+# 日期无法解析的文章使用 1970-01-01 作为日期键（排在最后），统计年月时跳过
+_UNKNOWN_DATE_KEY = 19700101
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """高度重复的短字符串（分类、来源、日期、图片URL）共享同一个对象"""
+    return sys.intern(value) if value else value
+
+
+# 正文内容块的紧凑表示：((类型, 值), ...)
+ContentBlocks = Tuple[Tuple[ContentType, str], ...]
+
+
+def _encode_content(content: ContentBlocks) -> bytes:
+    """正文内容块序列化为写入外部存储的字节串"""
+    return json.dumps([[block_type.value, value] for block_type, value in content],
+                      ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _decode_content(raw: bytes) -> ContentBlocks:
+    """从外部存储读出的字节串还原为正文内容块"""
+    return tuple((ContentType(block_type), value) for block_type, value in json.loads(raw))
+
+
+# 共享快照中每篇文章的元数据字段（sort_key/size 等可由这些字段重新算出）
+_RECORD_FIELDS = ("id", "title", "date", "url", "category", "summary", "source",
+                  "created_at", "updated_at", "cover_image", "excerpt", "date_key",
+                  "content_hash", "content_size")
+
+
+class _CachedArticle:
+    """
+    缓存条目：文章的紧凑表示 + 写入时预计算的数据
+    文章字段直接存放在带 __slots__ 的条目上（不再保留 pydantic 模型及其 __dict__），
+    正文内容块保存为 (类型, 值) 元组，分类/来源/日期/图片URL 等重复字符串经过 intern 共享；
+    只在接口边界通过 to_article / to_summary 转换为 pydantic 模型。
+    date_key 在入库时只解析一次，排序和读取时的顺序校验都直接比较整数；
+    sort_key 为 (date_key, 文章ID) 组成的全序键，同日期文章的先后也固定，供游标分页定位；
+    cover_image/excerpt 为列表视图使用的封面图与摘录，入库时生成，列表请求不再触碰正文；
+    content_hash 为文章内容摘要，完整更新时据此判断文章是否变化，同时作为正文在外部存储中的键；
+    正文移到外部存储后 content 为 None，需要时由 NewsCache 读取后传入 to_article / content_text；
+    size/content_size 为元数据与正文的估算字节数，last_read 为最近一次读取正文的读取序号，
+    超出内存预算时据此淘汰正文（正文常驻内存时淘汰后 content 同样为 None）
+    """
+    __slots__ = ("id", "title", "date", "url", "category", "summary", "source",
+                 "created_at", "updated_at", "content", "cover_image", "excerpt",
+                 "date_key", "sort_key", "content_hash", "content_size", "last_read", "size")
+
+    def __init__(self, article: NewsArticle, date_key: int, content_hash: Optional[str] = None):
+        self.id = article.id
+        self.title = article.title
+        self.date = _intern(article.date)
+        self.url = article.url
+        self.category = _intern(article.category)
+        self.summary = article.summary
+        self.source = _intern(article.source)
+        self.created_at = article.created_at
+        self.updated_at = article.updated_at
+        # 图片/视频地址常在多篇文章间重复（如公众号统一的头图），文本块不做 intern
+        self.content = tuple(
+            (block.type, block.value if block.type == ContentType.TEXT else _intern(block.value))
+            for block in article.content
+        )
+        self.cover_image, self.excerpt = self._build_summary_fields(self.summary, self.content)
+        self.date_key = date_key
+        self.sort_key = (date_key, article.id or article.url)
+        self.content_hash = content_hash or self.hash_article(article)
+        self.last_read = 0
+        self.content_size = estimate_size(self.content)
+        self.size = self._estimate_metadata_size()
+    
+    def _estimate_metadata_size(self) -> int:
+        """元数据（除正文外的所有字段）估算占用的字节数"""
+        return sys.getsizeof(self) + sum(
+            estimate_size(getattr(self, name)) for name in self.__slots__
+            if name not in ("content", "content_size", "last_read", "size")
+        )
+    
+    def to_record(self) -> Dict[str, Any]:
+        """导出到共享快照的元数据记录（不含正文，正文按 content_hash 单独存放）"""
+        record = {name: getattr(self, name) for name in _RECORD_FIELDS}
+        record["created_at"] = self.created_at.isoformat() if self.created_at else None
+        record["updated_at"] = self.updated_at.isoformat() if self.updated_at else None
+        return record
+    
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "_CachedArticle":
+        """由共享快照中的元数据记录还原条目，正文留在快照文件中（content 为 None）"""
+        entry = cls.__new__(cls)
+        for name in _RECORD_FIELDS:
+            setattr(entry, name, record[name])
+        for name in ("date", "category", "source", "cover_image"):
+            setattr(entry, name, _intern(getattr(entry, name)))
+        entry.created_at = datetime.fromisoformat(record["created_at"]) if record["created_at"] else None
+        entry.updated_at = datetime.fromisoformat(record["updated_at"]) if record["updated_at"] else None
+        entry.content = None
+        entry.sort_key = (entry.date_key, entry.id or entry.url)
+        entry.last_read = 0
+        entry.size = entry._estimate_metadata_size()
+        return entry
+    
+    def without_content(self) -> "_CachedArticle":
+        """不含正文的条目副本（正文被淘汰时替换原条目，已发布快照中的原条目保持不变）"""
+        entry = _CachedArticle.__new__(_CachedArticle)
+        for name in self.__slots__:
+            setattr(entry, name, getattr(self, name))
+        entry.content = None
+        return entry
+    
+    @staticmethod
+    def hash_article(article: NewsArticle) -> str:
+        """文章内容摘要（不含 created_at/updated_at 等时间戳字段）"""
+        payload = article.model_dump_json(exclude={"created_at", "updated_at"})
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def _build_summary_fields(summary: Optional[str],
+                              content: Tuple[Tuple[ContentType, str], ...]) -> Tuple[Optional[str], str]:
+        """列表视图字段：封面图取第一张图片，摘录优先用摘要，否则取正文开头"""
+        cover_image = next((value for block_type, value in content if block_type == ContentType.IMAGE), None)
+        
+        excerpt = (summary or "").strip()
+        if not excerpt:
+            text_parts = []
+            length = 0
+            for block_type, value in content:
+                text = value.strip() if block_type == ContentType.TEXT else ""
+                if text:
+                    text_parts.append(text)
+                    length += len(text)
+                    if length >= _EXCERPT_LENGTH:
+                        break
+            excerpt = " ".join(text_parts)
+        return cover_image, excerpt[:_EXCERPT_LENGTH]
+    
+    def to_article(self, content: Optional[ContentBlocks] = None) -> NewsArticle:
+        """
+        转换为接口使用的文章模型（数据入库时已校验过，这里跳过校验直接构造）
+        content 为从外部存储读出的正文，正文常驻内存时可省略
+        """
+        blocks = self.content if content is None else content
+        return NewsArticle.model_construct(
+            id=self.id,
+            title=self.title,
+            date=self.date,
+            url=self.url,
+            content=[NewsContentBlock.model_construct(type=block_type, value=value)
+                     for block_type, value in blocks or ()],
+            category=self.category,
+            summary=self.summary,
+            source=self.source,
+            created_at=self.created_at,
+            updated_at=self.updated_at
+        )
+    
+    def to_summary(self) -> NewsArticleSummary:
+        """转换为列表视图记录（不含正文内容块）"""
+        return NewsArticleSummary.model_construct(
+            id=self.id,
+            title=self.title,
+            date=self.date,
+            url=self.url,
+            category=self.category,
+            summary=self.summary,
+            source=self.source,
+            cover_image=self.cover_image,
+            excerpt=self.excerpt
+        )
+    
+    def content_text(self, content: Optional[ContentBlocks] = None) -> str:
+        """正文中可检索的文本：文本块与代码块"""
+        blocks = self.content if content is None else content
+        return "\n".join(
+            value for block_type, value in blocks or ()
+            if block_type in (ContentType.TEXT, ContentType.CODE)
+        )
+
+
+def _encode_cursor(sort_key: Tuple[int, str]) -> str:
+    """把排序键编码为不透明的分页游标"""
+    raw = f"{sort_key[0]}|{sort_key[1]}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[int, str]:
+    """解析分页游标，格式不合法时抛出 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        date_key, tiebreak = raw.split("|", 1)
+        return int(date_key), tiebreak
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"无效的分页游标: {cursor}") from e
+
+
+def _seek_after(entries: Sequence[_CachedArticle], sort_key: Tuple[int, str]) -> int:
+    """
+    在按 sort_key 降序排列的条目中二分查找第一个排在游标之后的位置
+    游标记录的是排序键而不是下标，数据刷新后依然能准确接上，不会重复或跳过
+    """
+    low, high = 0, len(entries)
+    while low < high:
+        middle = (low + high) // 2
+        if entries[middle].sort_key >= sort_key:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def _seek_date_below(entries: Sequence[_CachedArticle], date_key: int) -> int:
+    """在按日期降序排列的条目中二分查找第一个日期早于 date_key 的位置"""
+    low, high = 0, len(entries)
+    while low < high:
+        middle = (low + high) // 2
+        if entries[middle].date_key >= date_key:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+_FacetCounts = Tuple[Dict[str, int], Dict[str, int], Dict[int, int]]
+
+
+def _tally_facets(entries: Sequence[_CachedArticle], base: Optional[_FacetCounts] = None) -> _FacetCounts:
+    """统计条目的分类/来源/年月计数；传入 base 时在其副本上累加"""
+    categories, sources, months = (dict(counts) for counts in base) if base else ({}, {}, {})
+    for entry in entries:
+        if entry.category:
+            categories[entry.category] = categories.get(entry.category, 0) + 1
+        if entry.source:
+            sources[entry.source] = sources.get(entry.source, 0) + 1
+        if entry.date_key != _UNKNOWN_DATE_KEY:
+            month = entry.date_key // 100
+            months[month] = months.get(month, 0) + 1
+    return categories, sources, months
+
+
+def _count_facets(entries: Sequence[_CachedArticle]) -> NewsFacets:
+    """统计条目的分类/来源/年月分布"""
+    return _build_facets(len(entries), _tally_facets(entries))
+
+
+def _build_facets(total: int, counts: _FacetCounts) -> NewsFacets:
+    """由计数生成筛选项：分类和来源按数量从多到少，年月由近到远"""
+    categories, sources, months = counts
+    return NewsFacets(
+        total=total,
+        categories=dict(sorted(categories.items(), key=lambda item: item[1], reverse=True)),
+        sources=dict(sorted(sources.items(), key=lambda item: item[1], reverse=True)),
+        months={f"{month // 100:04d}-{month % 100:02d}": count
+                for month, count in sorted(months.items(), reverse=True)}
+    )
+
+
+_SORT_KEY = attrgetter("sort_key")
+
+
+def _merge_sorted(existing: Sequence[_CachedArticle],
+                  batch: Sequence[_CachedArticle]) -> Tuple[_CachedArticle, ...]:
+    """
+    把已排序的一小批条目归并进已按日期由近到远排列的序列，sort_key 相同时 existing 在前
+    每个新条目二分定位插入位置，existing 按切片整段拼接，不再逐条比较已有条目
+    """
+    parts: List[Sequence[_CachedArticle]] = []
+    start = 0
+    for entry in batch:
+        position = _seek_after(existing, entry.sort_key)
+        parts.append(existing[start:position])
+        parts.append((entry,))
+        start = position
+    parts.append(existing[start:])
+    return tuple(itertools.chain.from_iterable(parts))
+
+
+def _entries_memory_usage(entries: Sequence[_CachedArticle]) -> int:
+    """条目估算占用的字节数：元数据 + 仍在内存中的正文"""
+    return sum(entry.size + (entry.content_size if entry.content is not None else 0)
+               for entry in entries)
+
+
+def _merge_groups(groups: Dict[Any, Tuple[_CachedArticle, ...]], batch: Sequence[_CachedArticle],
+                  group_key: Callable[[_CachedArticle], Any]) -> Dict[Any, Tuple[_CachedArticle, ...]]:
+    """把已排序的新条目归并进对应分组，没有新条目的分组沿用原序列"""
+    additions: Dict[Any, List[_CachedArticle]] = {}
+    for entry in batch:
+        additions.setdefault(group_key(entry), []).append(entry)
+    merged = dict(groups)
+    for key, entries in additions.items():
+        merged[key] = _merge_sorted(groups.get(key, ()), entries)
+    return merged
+
+
+class _NewsSnapshot:
+    """
+    不可变的缓存快照
+    写入方在锁内构建新快照后整体替换引用，读取方直接拿引用、无需加锁也无需复制列表
+    构建时同时生成分类/来源二级索引，每个索引都保持与 entries 相同的日期顺序，
+    按 id/url 直接定位文章的哈希索引，以及全量的筛选项计数；
+    搜索倒排索引由写入方或后台线程调用 build_search_indexes / build_content_index 构建，
+    请求路径上从不构建：索引建好之前的搜索逐条做子串匹配，结果相同；
+    正文索引开销远大于标题/摘要索引，单独构建，通过 content_loader 分批读取正文，
+    且不在内存中保留正文副本
+    """
+    __slots__ = ("entries", "generation", "by_category", "by_source", "by_category_source",
+                 "by_id", "by_url", "facets", "_text_indexes", "_content_index", "_index_lock",
+                 "_versions", "_base_version", "_content_loader", "_facet_counts", "_memory_usage")
+
+    def __init__(self, entries: Tuple[_CachedArticle, ...] = (), generation: int = 0,
+                 previous: Optional["_NewsSnapshot"] = None,
+                 touched: Optional[Sequence[_CachedArticle]] = None,
+                 content_loader: Optional[Callable[[Sequence[_CachedArticle]], List[ContentBlocks]]] = None):
+        self.entries = entries
+        self.generation = generation  # 缓存代数，每次发布新快照递增
+        self._content_loader = content_loader or (lambda chunk: [entry.content for entry in chunk])
+        
+        # 各个分类/来源组合的数据版本：增量写入时只有涉及到的组合更新为当前代数，
+        # 其余组合沿用旧版本，下游（如预渲染页面）据此只失效真正变化的部分
+        if previous is not None and touched is not None:
+            self._base_version = previous._base_version
+            self._versions = previous._touch_versions(touched, generation)
+        else:
+            self._base_version = generation
+            self._versions: Dict[Tuple[Optional[str], Optional[str]], int] = {}
+        
+        self._build_lookups()
+        self._memory_usage: Optional[int] = None
+        self._facet_counts = _tally_facets(entries)
+        self.facets = _build_facets(len(entries), self._facet_counts)
+        self._reset_search_indexes()
+    
+    def _reset_search_indexes(self):
+        """新快照的倒排索引尚未构建"""
+        self._text_indexes: Optional[Tuple[NgramIndex, NgramIndex]] = None
+        self._content_index: Optional[NgramIndex] = None
+        self._index_lock = threading.Lock()
+    
+    def _touch_versions(self, touched: Sequence[_CachedArticle],
+                        generation: int) -> Dict[Tuple[Optional[str], Optional[str]], int]:
+        """在本快照的数据版本上，把 touched 所在的分类/来源组合更新为 generation"""
+        versions = dict(self._versions)
+        versions[(None, None)] = generation
+        for entry in touched:
+            category, source = entry.category or None, entry.source or None
+            for key in ((category, None), (None, source), (category, source)):
+                versions[key] = generation
+        return versions
+    
+    def _build_lookups(self):
+        """由 entries 构建分类/来源二级索引与 id/url 哈希索引"""
+        by_category: Dict[str, List[_CachedArticle]] = {}
+        by_source: Dict[str, List[_CachedArticle]] = {}
+        by_category_source: Dict[Tuple[str, str], List[_CachedArticle]] = {}
+        by_id: Dict[str, _CachedArticle] = {}
+        by_url: Dict[str, _CachedArticle] = {}
+        for entry in self.entries:
+            # id/url 重复时保留日期较新的一篇（entries 已按日期由近到远排列）
+            if entry.id:
+                by_id.setdefault(entry.id, entry)
+            by_url.setdefault(entry.url, entry)
+            by_category.setdefault(entry.category, []).append(entry)
+            by_source.setdefault(entry.source, []).append(entry)
+            by_category_source.setdefault((entry.category, entry.source), []).append(entry)
+        
+        self.by_category = {key: tuple(value) for key, value in by_category.items()}
+        self.by_source = {key: tuple(value) for key, value in by_source.items()}
+        self.by_category_source = {key: tuple(value) for key, value in by_category_source.items()}
+        self.by_id = by_id
+        self.by_url = by_url
+    
+    def replace_entries(self, entries: Tuple[_CachedArticle, ...]) -> "_NewsSnapshot":
+        """
+        同一代数下逐条替换条目的新快照（如正文被淘汰后的条目副本），顺序与文章数据都不变
+        数据版本与筛选项计数原样沿用，已建好的倒排索引共享，正文索引改为从新条目取回原文
+        """
+        snapshot = _NewsSnapshot.__new__(_NewsSnapshot)
+        snapshot.entries = entries
+        snapshot.generation = self.generation
+        snapshot._content_loader = self._content_loader
+        snapshot._versions = self._versions
+        snapshot._base_version = self._base_version
+        snapshot._build_lookups()
+        snapshot._memory_usage = None
+        snapshot._facet_counts = self._facet_counts
+        snapshot.facets = self.facets
+        snapshot._index_lock = threading.Lock()
+        with self._index_lock:
+            snapshot._text_indexes = self._text_indexes
+            content_index = self._content_index
+        snapshot._content_index = (content_index.with_text_loader(snapshot._load_content_texts)
+                                   if content_index is not None else None)
+        return snapshot
+    
+    def append(self, batch: Sequence[_CachedArticle], generation: int,
+               content_loader: Callable[[Sequence[_CachedArticle]], List[ContentBlocks]]) -> "_NewsSnapshot":
+        """
+        追加一批新条目后的快照（首次加载的分批写入：只新增，不修改也不移除已有条目）
+        条目序列与涉及到的分类/来源序列各做一次有序归并，没有新条目的序列原样沿用；
+        id/url 索引复制后补入新条目，筛选项在原有计数上累加，不再逐条遍历已有条目
+        """
+        batch = sorted(batch, key=_SORT_KEY, reverse=True)
+        snapshot = _NewsSnapshot.__new__(_NewsSnapshot)
+        snapshot.entries = _merge_sorted(self.entries, batch)
+        snapshot.generation = generation
+        snapshot._content_loader = content_loader
+        snapshot._base_version = self._base_version
+        snapshot._versions = self._touch_versions(batch, generation)
+        
+        snapshot.by_category = _merge_groups(self.by_category, batch, attrgetter("category"))
+        snapshot.by_source = _merge_groups(self.by_source, batch, attrgetter("source"))
+        snapshot.by_category_source = _merge_groups(self.by_category_source, batch,
+                                                    attrgetter("category", "source"))
+        # id/url 重复时保留日期较新的一篇，与完整构建时的选择一致
+        snapshot.by_id = dict(self.by_id)
+        snapshot.by_url = dict(self.by_url)
+        for entry in batch:
+            for lookup, key in ((snapshot.by_id, entry.id), (snapshot.by_url, entry.url)):
+                if not key:
+                    continue
+                current = lookup.get(key)
+                if current is None or entry.sort_key > current.sort_key:
+                    lookup[key] = entry
+        
+        snapshot._memory_usage = (self._memory_usage + _entries_memory_usage(batch)
+                                  if self._memory_usage is not None else None)
+        snapshot._facet_counts = _tally_facets(batch, self._facet_counts)
+        snapshot.facets = _build_facets(len(snapshot.entries), snapshot._facet_counts)
+        snapshot._reset_search_indexes()
+        return snapshot
+    
+    def memory_usage(self) -> int:
+        """全部条目估算占用的字节数；已发布的条目不再修改，每个快照只统计一次"""
+        if self._memory_usage is None:
+            self._memory_usage = _entries_memory_usage(self.entries)
+        return self._memory_usage
+    
+    def build_search_indexes(self) -> Tuple[NgramIndex, NgramIndex]:
+        """
+        获取（必要时构建）标题、摘要两个倒排索引，文档编号即 entries 下标
+        同一快照只构建一次，并发调用会等待同一次构建完成
+        """
+        indexes = self._text_indexes
+        if indexes is None:
+            with self._index_lock:
+                if self._text_indexes is None:
+                    self._text_indexes = (
+                        NgramIndex([entry.title for entry in self.entries]),
+                        NgramIndex([entry.summary for entry in self.entries]),
+                    )
+                indexes = self._text_indexes
+        return indexes
+    
+    def build_content_index(self) -> NgramIndex:
+        """
+        获取（必要时构建）正文倒排索引，只在有人按正文搜索过之后才需要
+        正文体积远大于标题/摘要，索引中不保留正文副本，校验候选时再通过 content_loader 取回原文
+        """
+        index = self._content_index
+        if index is None:
+            with self._index_lock:
+                if self._content_index is None:
+                    self._content_index = NgramIndex(self._iter_content_texts(self.entries),
+                                                     text_loader=self._load_content_texts)
+                index = self._content_index
+        return index
+    
+    def _iter_content_texts(self, entries: Sequence[_CachedArticle]) -> Iterator[str]:
+        """分批从外部存储读取正文并逐篇产出可检索文本"""
+        for start in range(0, len(entries), _CONTENT_LOAD_BATCH):
+            chunk = entries[start:start + _CONTENT_LOAD_BATCH]
+            for entry, content in zip(chunk, self.load_contents(chunk)):
+                yield entry.content_text(content)
+    
+    def load_contents(self, entries: Sequence[_CachedArticle]) -> List[ContentBlocks]:
+        """读取本快照中条目的正文（与 entries 一一对应），正文来源随快照一起固定"""
+        return self._content_loader(entries)
+    
+    def _load_content_texts(self, doc_ids: Sequence[int]) -> List[str]:
+        """正文索引校验候选时按文档编号取回原文"""
+        return list(self._iter_content_texts([self.entries[doc_id] for doc_id in doc_ids]))
+    
+    def has_search_indexes(self, scope: SearchScope = SearchScope.TITLE) -> bool:
+        """该搜索范围需要的倒排索引是否都已建好"""
+        if self._text_indexes is None:
+            return False
+        return scope != SearchScope.CONTENT or self._content_index is not None
+    
+    def _scan(self, field: str, query: str) -> List[int]:
+        """索引尚未建好时逐条做大小写不敏感的子串匹配，结果与倒排索引检索一致"""
+        if field == "content":
+            texts = self._iter_content_texts(self.entries)
+        else:
+            texts = (getattr(entry, field) for entry in self.entries)
+        needle = query.lower()
+        return [doc_id for doc_id, text in enumerate(texts) if needle in (text or "").lower()]
+    
+    def version_of(self, category: Optional[str] = None, source: Optional[str] = None) -> int:
+        """分类/来源组合的数据版本：该组合内的文章有增删改时才变化"""
+        return self._versions.get((category or None, source or None), self._base_version)
+    
+    def select(self, category: Optional[str] = None,
+               source: Optional[str] = None) -> Tuple[_CachedArticle, ...]:
+        """按分类/来源取出已排序的条目序列，只做一次字典查找"""
+        if category and source:
+            return self.by_category_source.get((category, source), ())
+        if category:
+            return self.by_category.get(category, ())
+        if source:
+            return self.by_source.get(source, ())
+        return self.entries
+    
+    def search(self, query: str, category: Optional[str] = None,
+               source: Optional[str] = None,
+               scope: SearchScope = SearchScope.TITLE,
+               sort: NewsSort = NewsSort.DATE) -> List[_CachedArticle]:
+        """
+        标题或摘要包含关键词（不区分大小写）的条目，默认保持日期顺序
+        scope 为 content 时同时检索正文中的文本块和代码块；
+        sort 为 relevance 时按参与检索的各字段加权的 BM25 得分排序，同分按日期，
+        索引建好之前只计入已有索引的字段（都没有时保持日期顺序）
+        """
+        text_indexes = self._text_indexes or (None, None)
+        fields: List[Tuple[str, Optional[NgramIndex]]] = [("title", text_indexes[0]),
+                                                          ("summary", text_indexes[1])]
+        if scope == SearchScope.CONTENT:
+            fields.append(("content", self._content_index))
+        doc_ids = merge_doc_ids(*(index.search(query) if index is not None else self._scan(field, query)
+                                  for field, index in fields))
+        if category:
+            doc_ids = [doc_id for doc_id in doc_ids if self.entries[doc_id].category == category]
+        if source:
+            doc_ids = [doc_id for doc_id in doc_ids if self.entries[doc_id].source == source]
+        
+        if sort == NewsSort.RELEVANCE and len(doc_ids) > 1:
+            scores = [0.0] * len(doc_ids)
+            for field, index in fields:
+                if index is None:
+                    continue
+                weight = _RELEVANCE_FIELD_WEIGHTS[field]
+                for position, score in enumerate(index.bm25_scores(query, doc_ids)):
+                    scores[position] += weight * score
+            order = sorted(range(len(doc_ids)), key=lambda position: scores[position], reverse=True)
+            doc_ids = [doc_ids[position] for position in order]
+        
+        return [self.entries[doc_id] for doc_id in doc_ids]
+
+
+class _SearchIndexBuilder:
+    """
+    后台搜索索引构建线程，倒排索引不在请求路径（事件循环）上构建
+    schedule 之后等到 delay 秒内没有新的安排再调用一次 build：首次加载分批写入期间快照频繁替换，
+    只为写入停顿时的最新快照构建；没有待办时线程退出，下次 schedule 再启动
+    """
+    
+    def __init__(self, build: Callable[[], None]):
+        self._build = build
+        self._condition = threading.Condition()
+        self._due: Optional[float] = None  # 下一次构建的时间（time.monotonic），None 表示没有待办
+        self._thread: Optional[threading.Thread] = None
+    
+    def schedule(self, delay: float = 0.0):
+        """安排一次构建；已有待办时取较晚的时间（去抖）"""
+        with self._condition:
+            due = time.monotonic() + delay
+            self._due = due if self._due is None else max(self._due, due)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="NewsSearchIndex", daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._due is not None:
+                    remaining = self._due - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if self._due is None:
+                    self._thread = None
+                    self._condition.notify_all()
+                    return
+                self._due = None
+            try:
+                self._build()
+            except Exception as e:
+                logger.error(f"❌ [搜索索引] 后台构建失败: {e}")
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待已安排的构建全部完成（测试与离线脚本使用）"""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._thread is None, timeout)
+
+
 class NewsCache:
     """新闻数据缓存管理器"""
     
-    def __init__(self):
-        self._cache: List[NewsArticle] = []
-        self._cache_lock = threading.RLock()  # 可重入锁
+    def __init__(self, blob_store: Optional[BlobStore] = None, memory_budget: Optional[int] = None,
+                 spill_store: Optional[BlobStore] = None):
+        self._snapshot = _NewsSnapshot()  # 当前快照，只会被整体替换
+        self._generation = 0  # 缓存代数，单调递增，清空缓存也不会重置
+        self._cache_lock = threading.RLock()  # 可重入锁，只用于串行化写入方
+        # 搜索结果缓存，键中带有缓存代数，数据更新后旧结果自然失效
+        self._query_cache = LRUCache(settings.news_query_cache_size)
+        # 预序列化的热点页面 JSON，同样以缓存代数为键
+        self._rendered_pages = LRUCache(settings.news_rendered_cache_size)
         self._status = ServiceStatus.READY  # 初始状态为就绪，等待数据分批写入
         self._last_update = None
         self._update_count = 0
         self._error_message = None
         self._is_updating = False  # 标记是否正在更新
         self._is_first_load = True  # 标记是否为首次加载
+        self._known_urls: set = set()  # 当前快照中所有文章的URL，写入方维护，用于分批写入去重
+        # 最近若干次写入的变更集合（按缓存代数递增），整体替换的元组，读取方无需加锁
+        self._change_log: Tuple[NewsChangeSet, ...] = ()
+        # 正文外部存储：为 None 时正文常驻在缓存条目中；否则内存中只保留元数据，
+        # 正文按需读取，详情页的热点文章另有一个小的 LRU 缓存
+        self._blob_store = blob_store
+        self._content_cache = LRUCache(settings.news_content_cache_size)
+        self._stale_content_keys: set = set()  # 上一次写入后不再引用的正文，下一次写入时删除
+        # 内存预算（字节）：超出时淘汰最久未读、日期最早的文章正文，元数据保留；
+        # 正文常驻内存时，被淘汰的正文转存到溢出存储（默认第一次淘汰时创建 SQLite 文件），读取时再取回
+        self._memory_budget = MemoryBudget(settings.news_cache_memory_budget
+                                           if memory_budget is None else memory_budget)
+        self._spill_store = spill_store
+        self._read_clock = itertools.count(1)  # 读取序号，记录文章正文最近一次被读取的先后
+        # 搜索索引在写入方或后台线程中构建；有人按正文搜索过之后，之后的快照也在后台构建正文索引
+        self._index_builder = _SearchIndexBuilder(self._build_search_indexes)
+        self._content_search_requested = False
         
     def get_status(self) -> Dict[str, Any]:
-        """获取服务状态"""
-        with self._cache_lock:
-            return {
-                "status": self._status.value,
-                "last_update": self._last_update,
-                "cache_count": len(self._cache),
-                "update_count": self._update_count,
-                "error_message": self._error_message,
-                "is_updating": self._is_updating,
-                "is_first_load": self._is_first_load  # 添加首次加载标识
-            }
+        """获取服务状态（只读取属性引用，不加锁，避免请求被写入方阻塞）"""
+        return {
+            "status": self._status.value,
+            "last_update": self._last_update,
+            "cache_count": len(self._snapshot.entries),
+            "update_count": self._update_count,
+            "error_message": self._error_message,
+            "is_updating": self._is_updating,
+            "is_first_load": self._is_first_load  # 添加首次加载标识
+        }
     
     def set_status(self, status: ServiceStatus, error_message: Optional[str] = None):
         """设置服务状态"""
@@ -66,6 +722,7 @@ class NewsCache:
             self._status = status
             self._error_message = error_message
             logger.info(f"服务状态更新: {status.value}")
+            notify_snapshot_changed()
     
     def set_updating(self, is_updating: bool):
         """设置更新状态"""
@@ -80,230 +737,640 @@ class NewsCache:
     
     def get_news(self, page: int = 1, page_size: int = 20, 
                  category: Optional[str] = None, 
-                 search: Optional[str] = None) -> NewsResponse:
-        """获取新闻数据（带分页和过滤）"""
-        with self._cache_lock:
-            if self._status == ServiceStatus.ERROR:
-                raise Exception(f"服务错误: {self._error_message}")
-            
-            # 过滤数据
-            filtered_news = self._cache.copy()
-            
-            # 分类过滤
-            if category:
-                filtered_news = [news for news in filtered_news if news.category == category]
-            
-            # 搜索过滤
-            if search:
-                search_lower = search.lower()
+                 search: Optional[str] = None,
+                 source: Optional[str] = None,
+                 search_scope: SearchScope = SearchScope.TITLE,
+                 sort: NewsSort = NewsSort.DATE,
+                 cursor: Optional[str] = None,
+                 view: NewsView = NewsView.FULL,
+                 start_date: Optional[date] = None,
+                 end_date: Optional[date] = None) -> Union[NewsResponse, NewsSummaryResponse]:
+        """
+        获取新闻数据（带分页和过滤），读取当前快照，全程无锁
+        传入 cursor 时使用游标分页：从游标对应的位置二分定位，忽略 page；
+        view 为 summary 时返回不含正文的精简记录；
+        start_date/end_date 为闭区间日期过滤，在已排序的条目上二分定位
+        """
+        if self._status == ServiceStatus.ERROR:
+            raise Exception(f"服务错误: {self._error_message}")
+        
+        by_relevance = bool(search) and sort == NewsSort.RELEVANCE
+        if by_relevance and cursor:
+            raise ValueError("相关度排序不支持游标分页")
+        
+        # 取快照引用，之后即使写入方替换了快照，本次请求看到的数据也保持一致
+        snapshot = self._snapshot
+        filtered_news = self._filter_entries(snapshot, category, search, source,
+                                             search_scope, sort, start_date, end_date)
+        return self._paginate(snapshot, filtered_news, page, page_size, cursor,
+                              with_cursor=not by_relevance, view=view)
+    
+    def iter_news_ndjson(self, category: Optional[str] = None,
+                         search: Optional[str] = None,
+                         source: Optional[str] = None,
+                         search_scope: SearchScope = SearchScope.TITLE,
+                         sort: NewsSort = NewsSort.DATE,
+                         view: NewsView = NewsView.FULL,
+                         start_date: Optional[date] = None,
+                         end_date: Optional[date] = None) -> Iterator[bytes]:
+        """
+        流式导出全部匹配的新闻，返回逐行产出 JSON（NDJSON）的迭代器
+        服务状态检查与过滤在调用时立即执行，参数错误（如日期区间颠倒）在开始发送响应之前就抛出；
+        过滤结果只是快照中条目的引用，逐篇序列化，内存占用与缓存规模无关；
+        整个导出过程使用开始时的同一个快照，期间的刷新不会造成重复或遗漏
+        """
+        if self._status == ServiceStatus.ERROR:
+            raise Exception(f"服务错误: {self._error_message}")
+        
+        snapshot = self._snapshot
+        entries = self._filter_entries(snapshot, category, search, source, search_scope, sort,
+                                       start_date, end_date)
+        return self._iter_ndjson_lines(snapshot, entries, view)
+    
+    def _iter_ndjson_lines(self, snapshot: _NewsSnapshot, entries: Sequence[_CachedArticle],
+                           view: NewsView) -> Iterator[bytes]:
+        """把已过滤的条目分批读取正文后逐行序列化"""
+        for start in range(0, len(entries), _CONTENT_LOAD_BATCH):
+            chunk = entries[start:start + _CONTENT_LOAD_BATCH]
+            if view == NewsView.SUMMARY:
+                records = [entry.to_summary() for entry in chunk]
+            else:
+                records = [entry.to_article(content)
+                           for entry, content in zip(chunk, snapshot.load_contents(chunk))]
+            for record in records:
+                yield record.model_dump_json().encode("utf-8") + b"\n"
+    
+    def get_facets(self, search: Optional[str] = None,
+                   category: Optional[str] = None,
+                   source: Optional[str] = None,
+                   search_scope: SearchScope = SearchScope.TITLE) -> NewsFacets:
+        """
+        获取筛选项计数（分类/来源/年月）
+        无过滤条件时直接返回写入快照时算好的结果；
+        有搜索关键词或分类/来源时，只对倒排索引命中（或二级索引中）的条目计数
+        """
+        if self._status == ServiceStatus.ERROR:
+            raise Exception(f"服务错误: {self._error_message}")
+        
+        snapshot = self._snapshot
+        if not (search or category or source):
+            return snapshot.facets
+        return _count_facets(self._filter_entries(snapshot, category, search, source, search_scope))
+    
+    def _filter_entries(self, snapshot: _NewsSnapshot,
+                        category: Optional[str] = None,
+                        search: Optional[str] = None,
+                        source: Optional[str] = None,
+                        search_scope: SearchScope = SearchScope.TITLE,
+                        sort: NewsSort = NewsSort.DATE,
+                        start_date: Optional[date] = None,
+                        end_date: Optional[date] = None) -> Sequence[_CachedArticle]:
+        """在指定快照上按分类/来源/关键词/日期区间过滤，返回已排序的条目序列"""
+        if start_date and end_date and start_date > end_date:
+            raise ValueError("start_date 不能晚于 end_date")
+        
+        if search:
+            # 搜索过滤：先查结果缓存，未命中时通过倒排索引求交得到候选，再按分类/来源筛选
+            query_key = (snapshot.generation, search.lower(), category, source,
+                         SearchScope(search_scope), NewsSort(sort))
+            filtered_news = self._query_cache.get(query_key)
+            if filtered_news is None:
+                if search_scope == SearchScope.CONTENT:
+                    self._content_search_requested = True
+                indexed = snapshot.has_search_indexes(search_scope)
+                filtered_news = tuple(snapshot.search(search, category, source, search_scope, sort))
+                if indexed:
+                    self._query_cache.put(query_key, filtered_news)
+                else:
+                    # 索引未建好时本次逐条匹配（相关度只计入已有索引的字段，结果不缓存），索引交给后台构建
+                    self._index_builder.schedule()
+        else:
+            # 分类/来源过滤直接使用写入时建好的二级索引
+            filtered_news = snapshot.select(category, source)
+        
+        # 🔥 改进：由于缓存写入时已经排序，这里只做轻量级验证
+        # 检查是否需要重新排序（防御性编程），直接比较入库时预计算的排序键
+        by_relevance = bool(search) and sort == NewsSort.RELEVANCE
+        if (not by_relevance and len(filtered_news) > 1
+                and filtered_news[0].sort_key < filtered_news[1].sort_key):
+            logger.info("🔄 [读取排序] 检测到顺序异常，执行重新排序")
+            filtered_news = sorted(filtered_news, key=lambda entry: entry.sort_key, reverse=True)
+        
+        if start_date or end_date:
+            start_key = _date_to_key(start_date) if start_date else None
+            end_key = _date_to_key(end_date) if end_date else None
+            if by_relevance:
+                # 相关度顺序与日期无关，只能逐条筛选
                 filtered_news = [
-                    news for news in filtered_news 
-                    if search_lower in news.title.lower() or 
-                       (news.summary and search_lower in news.summary.lower())
+                    entry for entry in filtered_news
+                    if (start_key is None or entry.date_key >= start_key)
+                    and (end_key is None or entry.date_key <= end_key)
                 ]
-            
-            # 🔥 改进：由于缓存写入时已经排序，这里只做轻量级验证
-            # 检查是否需要重新排序（防御性编程）
-            try:
-                if len(filtered_news) > 1:
-                    # 检查前两篇文章的日期顺序
-                    first_date = self._parse_date_for_sorting(filtered_news[0].date)
-                    second_date = self._parse_date_for_sorting(filtered_news[1].date)
-                    
-                    # 如果顺序不对，重新排序
-                    if first_date < second_date:
-                        logger.info("🔄 [读取排序] 检测到顺序异常，执行重新排序")
-                        filtered_news.sort(key=lambda x: self._parse_date_for_sorting(x.date), reverse=True)
-                    else:
-                        logger.debug("✅ [读取排序] 日期顺序正确，无需重新排序")
-            except Exception as e:
-                logger.warning(f"⚠️ [读取排序] 日期顺序检查失败，使用原始顺序: {e}")
-            
-            # 分页处理
-            total = len(filtered_news)
+            else:
+                # 条目按日期降序排列，日期区间对应一段连续切片：两次二分 O(log n) 定位，切片 O(k)
+                low = _seek_date_below(filtered_news, end_key + 1) if end_key is not None else 0
+                high = _seek_date_below(filtered_news, start_key) if start_key is not None else len(filtered_news)
+                filtered_news = filtered_news[low:high]
+        return filtered_news
+    
+    def _paginate(self, snapshot: _NewsSnapshot, entries: Sequence[_CachedArticle], page: int, page_size: int,
+                  cursor: Optional[str] = None, with_cursor: bool = True,
+                  view: NewsView = NewsView.FULL) -> Union[NewsResponse, NewsSummaryResponse]:
+        """
+        对已过滤、已排序的条目做分页
+        有游标时二分定位起点，深翻页与第一页开销相同；with_cursor 时返回下一页游标
+        """
+        total = len(entries)
+        if cursor:
+            start = _seek_after(entries, _decode_cursor(cursor))
+            page = start // page_size + 1
+        else:
             start = (page - 1) * page_size
-            end = start + page_size
-            paginated_news = filtered_news[start:end]
-            
-            return NewsResponse(
-                articles=paginated_news,
+        end = start + page_size
+        page_entries = entries[start:end]
+        
+        next_cursor = None
+        if with_cursor and end < total and page_entries:
+            next_cursor = _encode_cursor(page_entries[-1].sort_key)
+        
+        if view == NewsView.SUMMARY:
+            return NewsSummaryResponse(
+                articles=[entry.to_summary() for entry in page_entries],
                 total=total,
                 page=page,
                 page_size=page_size,
                 has_next=end < total,
-                has_prev=page > 1
+                has_prev=start > 0,
+                next_cursor=next_cursor
             )
+        
+        self._mark_read(page_entries)
+        return NewsResponse(
+            articles=[entry.to_article(content)
+                      for entry, content in zip(page_entries, snapshot.load_contents(page_entries))],
+            total=total,
+            page=page,
+            page_size=page_size,
+            has_next=end < total,
+            has_prev=start > 0,
+            next_cursor=next_cursor
+        )
     
-    def _parse_date_for_sorting(self, date_str: str) -> datetime:
+    def render_news_page(self, page: int = 1, page_size: int = 20,
+                         category: Optional[str] = None,
+                         source: Optional[str] = None,
+                         all_pages: bool = False,
+                         encoding: Optional[str] = None,
+                         view: NewsView = NewsView.FULL) -> Optional[bytes]:
         """
-        解析日期字符串用于排序，支持多种日期格式
-        支持格式：2024-08-31, 2024.08.31, 2024/08/31, 2024年08月31日等
+        获取预序列化好的新闻列表 JSON（仅限无搜索条件的热点页面）
+        每个缓存代数内首次请求时渲染并记忆，之后直接返回字节串，跳过 pydantic 构建与序列化；
+        指定 encoding（gzip/br）时返回对应的预压缩版本，同样每个代数只压缩一次；
+        页码超出预渲染范围时返回 None，由调用方走常规的 get_news
         """
-        try:
-            if not date_str or not isinstance(date_str, str):
-                logger.warning(f"无效的日期字符串: {date_str}")
-                return datetime(1970, 1, 1)
-            
-            # 清理日期字符串
-            date_str = date_str.strip()
-            
-            # 1. 优先使用正则表达式提取日期组件，支持更多格式
-            import re
-            
-            # 匹配 YYYY-MM-DD, YYYY.MM.DD, YYYY/MM/DD 格式（支持单数字月/日）
-            date_patterns = [
-                r'(\d{4})[-./](\d{1,2})[-./](\d{1,2})',  # 2024-08-31, 2024.08.31, 2024/08/31
-                r'(\d{4})年(\d{1,2})月(\d{1,2})日?',      # 2024年08月31日
-                r'(\d{4})年(\d{1,2})月(\d{1,2})',        # 2024年08月31
-                r'(\d{1,2})[-./](\d{1,2})[-./](\d{4})',  # 31-08-2024, 31.08.2024 (DD-MM-YYYY)
-            ]
-            
-            for pattern in date_patterns:
-                match = re.search(pattern, date_str)
-                if match:
-                    groups = match.groups()
-                    try:
-                        if len(groups) == 3:
-                            # 检查是否是DD-MM-YYYY格式
-                            if pattern.startswith(r'(\d{1,2})'):
-                                day, month, year = groups
-                            else:
-                                year, month, day = groups
-                            
-                            year = int(year)
-                            month = int(month)
-                            day = int(day)
-                            
-                            # 验证日期有效性
-                            if 1 <= month <= 12 and 1 <= day <= 31 and 1900 <= year <= 2100:
-                                parsed_date = datetime(year, month, day)
-                                logger.debug(f"✅ 日期解析成功: {date_str} -> {parsed_date.strftime('%Y-%m-%d')}")
-                                return parsed_date
-                    except (ValueError, TypeError) as e:
-                        logger.debug(f"正则匹配但转换失败: {date_str}, 错误: {e}")
-                        continue
-            
-            # 2. 如果正则匹配失败，尝试标准datetime格式
-            date_formats = [
-                '%Y-%m-%d',           # 2024-08-31
-                '%Y.%m.%d',           # 2024.08.31
-                '%Y/%m/%d',           # 2024/08/31
-                '%Y-%m-%d %H:%M:%S',  # 2024-08-31 10:30:00
-                '%Y.%m.%d %H:%M:%S',  # 2024.08.31 10:30:00
-                '%Y/%m/%d %H:%M:%S',  # 2024/08/31 10:30:00
-                '%Y年%m月%d日',        # 2024年08月31日
-                '%Y年%m月%d',          # 2024年08月31
-                '%m-%d',              # 08-31 (假设为当年)
-                '%m.%d',              # 08.31 (假设为当年)
-                '%m/%d',              # 08/31 (假设为当年)
-            ]
-            
-            for date_format in date_formats:
-                try:
-                    parsed_date = datetime.strptime(date_str, date_format)
-                    # 如果只有月日，补充当前年份
-                    if '%Y' not in date_format:
-                        parsed_date = parsed_date.replace(year=datetime.now().year)
-                    logger.debug(f"✅ strptime解析成功: {date_str} -> {parsed_date.strftime('%Y-%m-%d')}")
-                    return parsed_date
-                except ValueError:
-                    continue
-            
-            # 3. 最后的尝试：提取任何可能的数字组合
-            number_match = re.findall(r'\d+', date_str)
-            if len(number_match) >= 3:
-                try:
-                    # 假设第一个是年份（如果是4位数），否则按顺序处理
-                    nums = [int(x) for x in number_match[:3]]
-                    
-                    # 判断年份位置
-                    if nums[0] > 1900:  # 第一个数字是年份
-                        year, month, day = nums[0], nums[1], nums[2]
-                    elif nums[2] > 1900:  # 第三个数字是年份
-                        day, month, year = nums[0], nums[1], nums[2]
-                    else:
-                        # 默认当前年份
-                        year = datetime.now().year
-                        month, day = nums[0], nums[1]
-                    
-                    if 1 <= month <= 12 and 1 <= day <= 31:
-                        parsed_date = datetime(year, month, day)
-                        logger.debug(f"✅ 数字提取解析成功: {date_str} -> {parsed_date.strftime('%Y-%m-%d')}")
-                        return parsed_date
-                except (ValueError, IndexError):
-                    pass
-            
-            # 最后的fallback：返回Unix纪元时间
-            logger.warning(f"⚠️ 无法解析日期格式: '{date_str}'，使用默认时间")
-            return datetime(1970, 1, 1)
-            
-        except Exception as e:
-            logger.error(f"❌ 日期解析异常: '{date_str}', 错误: {e}")
-            return datetime(1970, 1, 1)
+        if self._status == ServiceStatus.ERROR:
+            raise Exception(f"服务错误: {self._error_message}")
+        if not all_pages and page > settings.news_prerender_pages:
+            return None
+        
+        snapshot = self._snapshot
+        # 以分类/来源组合的数据版本为键：增量更新未涉及的列表页面继续命中
+        render_key = (snapshot.version_of(category, source), category, source, NewsView(view),
+                      "all" if all_pages else (page, page_size))
+        body = self._rendered_pages.get(render_key)
+        if body is None:
+            entries = snapshot.select(category, source)
+            if all_pages:
+                response = self._paginate(snapshot, entries, 1, max(len(entries), 1), with_cursor=False, view=view)
+                response.page_size = len(entries)
+            else:
+                response = self._paginate(snapshot, entries, page, page_size, view=view)
+            body = response.model_dump_json().encode("utf-8")
+            self._rendered_pages.put(render_key, body)
+        
+        if encoding:
+            variant_key = render_key + (encoding,)
+            compressed = self._rendered_pages.get(variant_key)
+            if compressed is None:
+                compressed = compress_body(body, encoding)
+                self._rendered_pages.put(variant_key, compressed)
+                logger.info(f"🗜️ [预压缩] 生成 {encoding} 版本: {len(body)} -> {len(compressed)} 字节")
+            return compressed
+        return body
+    
+    def _publish_snapshot(self, entries: Sequence[_CachedArticle], build_search_indexes: bool = True,
+                          touched: Optional[Sequence[_CachedArticle]] = None,
+                          generation: Optional[int] = None,
+                          build_content_index: bool = False,
+                          content_store: Optional[BlobStore] = None):
+        """
+        构建并发布新快照（调用方需持有写锁），缓存代数加一
+        build_search_indexes 为 False 时（首次加载的分批写入）索引去抖后在后台线程中构建；
+        touched 为本次新增/修改/移除的条目，传入时只有它们所在的分类/来源组合版本变化；
+        generation 为载入共享快照时沿用的 owner 进程的缓存代数；
+        build_content_index 为 True 时（调用方本身不在事件循环上，如只读进程的跟随线程），
+        有人按正文搜索过的话正文索引也在发布前同步构建，而不是交给后台线程；
+        content_store 为只属于该快照的正文存储（只读进程中该快照对应的映射），随快照一起存活
+        """
+        self._generation = self._generation + 1 if generation is None else generation
+        snapshot = _NewsSnapshot(tuple(entries), self._generation,
+                                 previous=self._snapshot if touched is not None else None,
+                                 touched=touched,
+                                 content_loader=partial(self._load_contents, store=content_store))
+        self._install_snapshot(snapshot, build_search_indexes, build_content_index)
+    
+    def _install_snapshot(self, snapshot: _NewsSnapshot, build_search_indexes: bool = True,
+                          build_content_index: bool = False):
+        """替换为已构建好的快照（调用方需持有写锁），参数含义同 _publish_snapshot"""
+        if build_search_indexes:
+            # 在写入方线程中构建好标题/摘要索引再发布，刷新后的第一次搜索不必等待
+            snapshot.build_search_indexes()
+            if build_content_index and self._content_search_requested:
+                snapshot.build_content_index()
+        self._snapshot = snapshot
+        if not build_search_indexes:
+            self._index_builder.schedule(_INDEX_BUILD_DELAY)
+        elif self._content_search_requested and not snapshot.has_search_indexes(SearchScope.CONTENT):
+            # 正文索引开销大，不占用写锁，交给后台线程
+            self._index_builder.schedule()
+    
+    def _build_search_indexes(self):
+        """为当前快照构建搜索索引（后台线程）；正文索引只在有人按正文搜索过之后才构建"""
+        snapshot = self._snapshot
+        scope = SearchScope.CONTENT if self._content_search_requested else SearchScope.TITLE
+        if snapshot.has_search_indexes(scope):
+            return
+        started = time.perf_counter()
+        snapshot.build_search_indexes()
+        if scope == SearchScope.CONTENT:
+            snapshot.build_content_index()
+        logger.info(f"🔎 [搜索索引] 代数 {snapshot.generation} 的索引构建完成（{scope.value}），"
+                    f"{len(snapshot.entries)} 篇文章，耗时 {time.perf_counter() - started:.2f}s")
+    
+    @property
+    def generation(self) -> int:
+        """当前缓存代数"""
+        return self._snapshot.generation
+    
+    def get_article(self, article_id: str) -> Optional[NewsArticle]:
+        """按文章ID获取单篇文章（一次字典查找，与缓存大小无关）"""
+        if self._status == ServiceStatus.ERROR:
+            raise Exception(f"服务错误: {self._error_message}")
+        
+        snapshot = self._snapshot
+        entry = snapshot.by_id.get(article_id)
+        return self._entry_to_article(snapshot, entry) if entry else None
+    
+    def get_article_by_url(self, url: str) -> Optional[NewsArticle]:
+        """按原文URL获取单篇文章"""
+        if self._status == ServiceStatus.ERROR:
+            raise Exception(f"服务错误: {self._error_message}")
+        
+        snapshot = self._snapshot
+        entry = snapshot.by_url.get(url)
+        return self._entry_to_article(snapshot, entry) if entry else None
+    
+    def _entry_to_article(self, snapshot: _NewsSnapshot, entry: _CachedArticle) -> NewsArticle:
+        """单篇文章详情：正文在外部存储（或已被淘汰转存）时先查热点 LRU，未命中再读存储"""
+        self._mark_read((entry,))
+        content = entry.content
+        if content is None:
+            content = self._content_cache.get(entry.content_hash)
+        if content is None:
+            content = snapshot.load_contents([entry])[0]
+            self._content_cache.put(entry.content_hash, content)
+        return entry.to_article(content)
+    
+    def _load_contents(self, entries: Sequence[_CachedArticle],
+                       store: Optional[BlobStore] = None) -> List[ContentBlocks]:
+        """
+        批量取得条目的正文（与 entries 一一对应）
+        正文在内存中时直接使用；其余一次查询批量读取外部存储或溢出存储
+        （列表/导出不写入热点 LRU，避免挤掉详情页热点）；
+        store 为快照自带的正文存储，未指定时使用缓存当前的存储
+        """
+        # 每个条目的正文只读取一次，之后都使用这份引用
+        contents: List[Optional[ContentBlocks]] = [entry.content for entry in entries]
+        keys = [entry.content_hash for entry, content in zip(entries, contents) if content is None]
+        if not keys:
+            return contents
+        if store is None:
+            store = self._content_store()
+        blobs = store.get_many(keys) if store is not None else {}
+        for position, entry in enumerate(entries):
+            if contents[position] is not None:
+                continue
+            raw = blobs.get(entry.content_hash)
+            if raw is None:
+                logger.warning(f"⚠️ [正文存储] 未找到文章正文: {entry.url}")
+                contents[position] = ()
+            else:
+                contents[position] = _decode_content(raw)
+        return contents
+    
+    def _content_store(self) -> Optional[BlobStore]:
+        """不在内存中的正文所在的存储：外部存储，或正文常驻内存时的溢出存储"""
+        return self._blob_store if self._blob_store is not None else self._spill_store
+    
+    def _offload_contents(self, entries: List[_CachedArticle]):
+        """把新条目的正文写入外部存储，内存中只保留元数据（调用方需持有写锁）"""
+        if self._blob_store is None or not entries:
+            return
+        self._blob_store.put_many((entry.content_hash, _encode_content(entry.content)) for entry in entries)
+        for entry in entries:
+            entry.content = None
+    
+    def _collect_stale_contents(self, previous: _NewsSnapshot):
+        """
+        清理外部存储（或溢出存储）中不再被引用的正文（调用方需持有写锁，且已发布新快照）
+        本次写入后不再引用的正文推迟到下一次写入时才删除，仍在使用旧快照的请求可以正常读取
+        """
+        store = self._content_store()
+        if store is None:
+            return
+        live_keys = {entry.content_hash for entry in self._snapshot.entries if entry.content is None}
+        store.delete_many(self._stale_content_keys - live_keys)
+        self._stale_content_keys = {entry.content_hash for entry in previous.entries
+                                    if entry.content is None} - live_keys
+    
+    def _mark_read(self, entries: Sequence[_CachedArticle]):
+        """记录条目正文被读取（无锁；并发读取时序号先后略有出入不影响淘汰）"""
+        tick = next(self._read_clock)
+        for entry in entries:
+            entry.last_read = tick
+    
+    def _is_evicted(self, entry: _CachedArticle) -> bool:
+        """正文常驻内存时，正文是否已因超出内存预算被淘汰"""
+        return self._blob_store is None and entry.content is None
+    
+    def _enforce_memory_budget(self):
+        """
+        超出内存预算时淘汰正文（调用方需持有写锁，且已发布新快照）
+        按最近读取序号、再按日期从旧到新淘汰，直到回到预算以内；元数据始终保留，
+        被淘汰的正文转存到溢出存储，完整视图、详情与正文搜索照常从溢出存储读取，
+        下一次完整更新时预算有余量再重新载入内存；
+        已发布的条目不做修改：被淘汰的条目换成不含正文的副本，以同一代数发布替换后的快照
+        """
+        entries = self._snapshot.entries
+        usage = self._snapshot.memory_usage()
+        if not self._memory_budget.exceeded(usage):
+            return
+        
+        candidates = sorted((entry for entry in entries if entry.content is not None),
+                            key=lambda entry: (entry.last_read, entry.date_key))
+        victims: List[_CachedArticle] = []
+        freed = 0
+        for entry in candidates:
+            if not self._memory_budget.exceeded(usage - freed):
+                break
+            victims.append(entry)
+            freed += entry.content_size
+        evicted = len(victims)
+        
+        if victims:
+            # 先写入溢出存储再发布不含正文的条目，读取方任何时候都能取到正文
+            if self._spill_store is None:
+                self._spill_store = create_blob_store("sqlite", settings.news_content_spill_path)
+            self._spill_store.put_many((entry.content_hash, _encode_content(entry.content)) for entry in victims)
+            replacements = {id(entry): entry.without_content() for entry in victims}
+            self._snapshot = self._snapshot.replace_entries(
+                tuple(replacements.get(id(entry), entry) for entry in entries))
+        self._memory_budget.record_eviction(evicted, freed)
+        
+        if evicted:
+            # 预渲染页面与搜索结果缓存中还引用着带正文的旧条目，一并丢弃
+            self._rendered_pages.clear()
+            self._query_cache.clear()
+            logger.warning(f"🧹 [内存预算] 占用 {usage} 字节超出预算 {self._memory_budget.limit} 字节，"
+                           f"淘汰 {evicted} 篇文章正文（转存到溢出存储），释放约 {freed} 字节")
+        if self._memory_budget.exceeded(usage - freed):
+            logger.warning(f"⚠️ [内存预算] 仅文章元数据已超出预算（{usage - freed} 字节），请调大预算")
+    
+    def _build_entries(self, articles: List[NewsArticle],
+                       content_hashes: Optional[List[str]] = None) -> List[_CachedArticle]:
+        """
+        为新入库的文章预计算整数日期键（每篇文章只解析一次日期）
+        content_hashes 为已算好的内容摘要（与 articles 一一对应），避免重复计算
+        """
+        # 统计日期解析情况
+        parse_stats = {"success": 0, "failed": 0, "examples": []}
+        entries = []
+        
+        # 使用统一的日期解析器批量解析（有记忆，重复日期不会重复解析）
+        parsed_dates = parse_dates([article.date for article in articles])
+        for position, (article, parsed_date) in enumerate(zip(articles, parsed_dates)):
+            if parsed_date is not None:
+                parse_stats["success"] += 1
+                if len(parse_stats["examples"]) < 3:
+                    parse_stats["examples"].append(f"{article.date} -> {parsed_date.isoformat()}")
+                date_key = _date_to_key(parsed_date)
+            else:
+                parse_stats["failed"] += 1
+                date_key = _UNKNOWN_DATE_KEY
+            content_hash = content_hashes[position] if content_hashes else None
+            entries.append(_CachedArticle(article, date_key, content_hash))
+        self._offload_contents(entries)
+        
+        # 输出统计信息
+        total = len(articles)
+        success_rate = (parse_stats["success"] / total * 100) if total > 0 else 0
+        
+        logger.info(f"📊 [日期解析] 成功解析: {parse_stats['success']}/{total} ({success_rate:.1f}%)")
+        if parse_stats["failed"] > 0:
+            logger.warning(f"⚠️ [日期解析] 解析失败: {parse_stats['failed']} 篇文章")
+        
+        if parse_stats["examples"]:
+            logger.info(f"📅 [日期解析] 解析示例: {', '.join(parse_stats['examples'])}")
+        
+        return entries
     
-    def _sort_articles_by_date(self, articles: List[NewsArticle]) -> List[NewsArticle]:
+    def _sort_articles_by_date(self, entries: List[_CachedArticle]) -> List[_CachedArticle]:
         """
         按日期对文章进行排序（由近到远）
-        在数据合并时统一触发排序，确保数据一致性
+        在数据合并时统一触发排序，确保数据一致性；排序只比较预计算的整数日期键
         """
-        try:
-            if not articles:
-                return articles
-            
-            logger.info(f"🔄 [缓存排序] 开始对 {len(articles)} 篇文章进行日期排序...")
-            
-            # 统计日期解析情况
-            parse_stats = {"success": 0, "failed": 0, "examples": []}
-            
-            def sort_key_with_stats(article):
-                parsed_date = self._parse_date_for_sorting(article.date)
-                if parsed_date.year > 1970:
-                    parse_stats["success"] += 1
-                    if len(parse_stats["examples"]) < 3:
-                        parse_stats["examples"].append(f"{article.date} -> {parsed_date.strftime('%Y-%m-%d')}")
-                else:
-                    parse_stats["failed"] += 1
-                return parsed_date
-            
-            # 执行排序
-            sorted_articles = sorted(articles, key=sort_key_with_stats, reverse=True)
-            
-            # 输出统计信息
-            total = len(articles)
-            success_rate = (parse_stats["success"] / total * 100) if total > 0 else 0
-            
-            logger.info(f"✅ [缓存排序] 排序完成！")
-            logger.info(f"📊 [缓存排序] 成功解析: {parse_stats['success']}/{total} ({success_rate:.1f}%)")
-            if parse_stats["failed"] > 0:
-                logger.warning(f"⚠️ [缓存排序] 解析失败: {parse_stats['failed']} 篇文章")
-            
-            if parse_stats["examples"]:
-                logger.info(f"📅 [缓存排序] 解析示例: {', '.join(parse_stats['examples'])}")
-            
-            # 显示排序后的前几篇文章的日期
-            if sorted_articles:
-                latest_dates = [article.date for article in sorted_articles[:3]]
-                logger.info(f"📈 [缓存排序] 最新文章日期: {latest_dates}")
-            
-            return sorted_articles
-            
-        except Exception as e:
-            logger.error(f"❌ [缓存排序] 排序失败: {e}")
-            return articles  # 排序失败时返回原列表
+        if not entries:
+            return entries
+        
+        logger.info(f"🔄 [缓存排序] 开始对 {len(entries)} 篇文章进行日期排序...")
+        sorted_entries = sorted(entries, key=lambda entry: entry.sort_key, reverse=True)
+        
+        # 显示排序后的前几篇文章的日期
+        latest_dates = [entry.date for entry in sorted_entries[:3]]
+        logger.info(f"✅ [缓存排序] 排序完成！最新文章日期: {latest_dates}")
+        
+        return sorted_entries
+    
+    def _merge_entries(self, existing: Sequence[_CachedArticle],
+                       new_entries: List[_CachedArticle]) -> List[_CachedArticle]:
+        """只对新条目排序，再与已排序的现有条目归并（O(N + b log b)），不修改 existing"""
+        batch = self._sort_articles_by_date(new_entries)
+        return list(heapq.merge(existing, batch, key=lambda entry: entry.sort_key, reverse=True))
+    
+    def _record_changes(self, added: List[str], changed: List[str], removed: List[str]):
+        """
+        记录本次写入的变更集合（调用方需持有写锁，且已发布新快照）
+        每次发布快照都对应一条记录，日志中的缓存代数连续；超出长度的旧记录被丢弃；
+        同时向 SSE 订阅者推送一条只含计数的事件，客户端收到后再按代数增量同步
+        """
+        change = NewsChangeSet(
+            generation=self._generation,
+            timestamp=datetime.now().isoformat(),
+            added=added,
+            changed=changed,
+            removed=removed
+        )
+        limit = max(1, settings.news_change_log_size)
+        self._change_log = (self._change_log + (change,))[-limit:]
+        self._publish_change_event(change)
+        notify_snapshot_changed()
+    
+    @staticmethod
+    def _publish_change_event(change: NewsChangeSet):
+        """推送变更事件（只含计数）"""
+        publish_event("news", {
+            "generation": change.generation,
+            "added": len(change.added),
+            "changed": len(change.changed),
+            "removed": len(change.removed),
+            "timestamp": change.timestamp
+        })
+    
+    def get_last_changes(self) -> Optional[NewsChangeSet]:
+        """最近一次写入的变更集合（新增/修改/移除的文章URL）"""
+        change_log = self._change_log
+        return change_log[-1] if change_log else None
+    
+    def get_changes(self, since: int, view: NewsView = NewsView.SUMMARY) -> NewsChangesResponse:
+        """
+        增量同步：返回缓存代数 since 之后的变更（无锁读取）
+        窗口内同一篇文章的多次变更合并为最终状态：窗口内新增又移除的文章不返回，
+        仍在缓存中的文章按当前快照返回（view 为 summary 时不含正文）；
+        since 早于日志中最旧的记录或晚于当前代数时返回 resync，客户端需要全量同步
+        """
+        if self._status == ServiceStatus.ERROR:
+            raise Exception(f"服务错误: {self._error_message}")
+        
+        # 先取日志再取快照：快照只可能比日志新，按快照返回的内容不会旧于日志
+        change_log = self._change_log
+        snapshot = self._snapshot
+        latest = change_log[-1].generation if change_log else snapshot.generation
+        if since > latest or (since < latest and (not change_log or change_log[0].generation > since + 1)):
+            logger.info(f"🔁 [增量同步] since={since} 不在变更日志范围内（当前代数 {latest}），需要全量同步")
+            return NewsChangesResponse(generation=latest, since=since, resync=True)
+        
+        first_added: set = set()  # 窗口内第一次出现即为新增的文章（客户端此前没有）
+        present: Dict[str, bool] = {}  # 文章URL -> 窗口结束时是否仍在缓存中
+        for change in change_log:
+            if change.generation <= since:
+                continue
+            for url in change.added:
+                if url not in present:
+                    first_added.add(url)
+                present[url] = True
+            for url in change.changed:
+                present[url] = True
+            for url in change.removed:
+                present[url] = False
+        
+        upserts: List[_CachedArticle] = []
+        removed: List[str] = []
+        for url, is_present in present.items():
+            entry = snapshot.by_url.get(url) if is_present else None
+            if entry is not None:
+                upserts.append(entry)
+            elif url not in first_added:
+                removed.append(url)
+        upserts.sort(key=lambda entry: entry.sort_key, reverse=True)
+        
+        if view == NewsView.SUMMARY:
+            records = [entry.to_summary() for entry in upserts]
+        else:
+            records = [entry.to_article(content)
+                       for entry, content in zip(upserts, snapshot.load_contents(upserts))]
+        return NewsChangesResponse(
+            generation=latest,
+            since=since,
+            added=[record for entry, record in zip(upserts, records) if entry.url in first_added],
+            changed=[record for entry, record in zip(upserts, records) if entry.url not in first_added],
+            removed=removed
+        )
     
     def update_cache(self, news_data: List[NewsArticle]):
-        """更新缓存数据（完全替换）"""
+        """
+        更新缓存数据（完全替换语义，按差异写入）
+        按 URL + 内容摘要与当前快照比对：未变化的文章沿用原有条目（日期键、列表记录等都不再计算），
+        只有新增/修改的文章重新构建并归并进已排序序列；完全没有变化时不发布新快照，
+        缓存代数不变，预渲染页面、搜索结果缓存和 ETag 都继续有效；
+        正文曾因内存预算被淘汰的文章，在预算有余量时重新载入（不计入变更集合）；
+        替换前旧快照一直有效，更新期间只标记 is_updating，服务状态不改为准备中，读取方照常拿到数据
+        """
         with self._cache_lock:
             try:
-                # 设置更新状态为True，状态变为准备中
-                self.set_updating(True)
+                self._is_updating = True
+                notify_snapshot_changed()
                 
-                # 🔥 关键改进：在数据合并时触发日期排序
                 logger.info(f"🔄 [完整更新] 开始更新缓存，原始数据: {len(news_data)} 篇文章")
-                sorted_news_data = self._sort_articles_by_date(news_data.copy())
+                current = self._snapshot
                 
-                # 更新缓存
-                self._cache = sorted_news_data
+                # 按URL去重并与当前快照比对
+                seen_urls = set()
+                fresh_articles: List[NewsArticle] = []
+                fresh_hashes: List[str] = []
+                unchanged: set = set()  # 沿用的旧条目（按对象标识）
+                evicted_matches: List[Tuple[_CachedArticle, NewsArticle, str]] = []  # 未变化但正文已被淘汰
+                added: List[str] = []
+                changed: List[str] = []
+                for article in news_data:
+                    if article.url in seen_urls:
+                        continue
+                    seen_urls.add(article.url)
+                    content_hash = _CachedArticle.hash_article(article)
+                    old_entry = current.by_url.get(article.url)
+                    if old_entry is not None and old_entry.content_hash == content_hash:
+                        if self._is_evicted(old_entry):
+                            evicted_matches.append((old_entry, article, content_hash))
+                        else:
+                            unchanged.add(id(old_entry))
+                        continue
+                    (added if old_entry is None else changed).append(article.url)
+                    fresh_articles.append(article)
+                    fresh_hashes.append(content_hash)
+                
+                # 预算有余量时重新载入被淘汰的正文（最近读过、日期较新的优先），其余继续沿用；
+                # 余量按沿用条目与这些条目的元数据估算，新文章挤占的部分由写入后的预算检查处理
+                headroom = self._memory_budget.headroom(
+                    _entries_memory_usage([entry for entry in current.entries if id(entry) in unchanged])
+                    + sum(old_entry.size for old_entry, _, _ in evicted_matches)
+                )
+                evicted_matches.sort(key=lambda match: (match[0].last_read, match[0].date_key), reverse=True)
+                for old_entry, article, content_hash in evicted_matches:
+                    if old_entry.content_size <= headroom:
+                        headroom -= old_entry.content_size
+                        fresh_articles.append(article)
+                        fresh_hashes.append(content_hash)
+                    else:
+                        unchanged.add(id(old_entry))
+                
+                kept_entries = [entry for entry in current.entries if id(entry) in unchanged]
+                removed_entries = [entry for entry in current.entries if id(entry) not in unchanged]
+                removed = [entry.url for entry in removed_entries if entry.url not in seen_urls]
+                
+                if fresh_articles or removed_entries:
+                    fresh_entries = self._build_entries(fresh_articles, fresh_hashes) if fresh_articles else []
+                    merged_entries = self._merge_entries(kept_entries, fresh_entries)
+                    
+                    # 整体替换快照引用，正在读取旧快照的请求不受影响；
+                    # 只有涉及到的分类/来源组合的数据版本变化
+                    self._publish_snapshot(merged_entries, touched=fresh_entries + removed_entries)
+                    self._collect_stale_contents(current)
+                    self._enforce_memory_budget()
+                    self._known_urls = seen_urls
+                    self._record_changes(added, changed, removed)
+                    logger.info(f"🧮 [完整更新] 新增 {len(added)} 篇，修改 {len(changed)} 篇，"
+                                f"移除 {len(removed)} 篇，沿用 {len(kept_entries)} 篇")
+                else:
+                    logger.info(f"✅ [完整更新] {len(kept_entries)} 篇文章均无变化，沿用当前快照")
                 self._last_update = datetime.now().isoformat()
                 self._update_count += 1
                 
@@ -312,10 +1379,14 @@ class NewsCache:
                     self._is_first_load = False
                     logger.info("🏁 首次完整加载完成，后续更新将使用完整替换模式")
                 
-                # 设置更新状态为False，状态变为就绪
-                self.set_updating(False)
+                # 更新完成；此前处于准备中（如清空后）或错误状态时恢复为就绪
+                self._is_updating = False
+                if self._status != ServiceStatus.READY:
+                    self.set_status(ServiceStatus.READY)
+                else:
+                    notify_snapshot_changed()
                 
-                logger.info(f"🔄 缓存完整更新成功，共 {len(news_data)} 条新闻")
+                logger.info(f"🔄 缓存完整更新成功，共 {len(self._snapshot.entries)} 条新闻")
                 
             except Exception as e:
                 error_msg = f"缓存更新失败: {str(e)}"
@@ -336,32 +1407,36 @@ class NewsCache:
                     logger.warning("⚠️ 非首次加载，忽略分批写入，等待完整更新")
                     return
                 
-                # 获取现有文章的URL集合，用于去重
-                existing_urls = {article.url for article in self._cache}
-                
-                # 过滤掉重复的文章
-                unique_articles = [
-                    article for article in new_articles 
-                    if article.url not in existing_urls
-                ]
+                # 过滤掉重复的文章：URL集合随写入持续维护，不再每批从头重建（批次内部同样去重）
+                unique_articles = []
+                for article in new_articles:
+                    if article.url not in self._known_urls:
+                        self._known_urls.add(article.url)
+                        unique_articles.append(article)
                 
                 if unique_articles:
-                    # 追加新文章
-                    self._cache.extend(unique_articles)
+                    # 在当前快照的基础上追加：只对本批次排序并归并，索引与计数增量更新，
+                    # 不修改读取方持有的旧快照
+                    batch_entries = self._build_entries(unique_articles)
+                    self._generation += 1
+                    snapshot = self._snapshot.append(batch_entries, self._generation, self._load_contents)
+                    merged_entries = snapshot.entries
+                    logger.info(f"🔄 [分批更新] 归并 {len(unique_articles)} 篇新文章，保持日期顺序")
                     
-                    # 🔥 关键改进：分批写入后立即触发排序，保持数据一致性
-                    logger.info(f"🔄 [分批更新] 追加 {len(unique_articles)} 篇文章后触发排序")
-                    self._cache = self._sort_articles_by_date(self._cache)
+                    # 首次加载期间批次频繁，倒排索引等写入停顿后在后台为最新快照构建
+                    self._install_snapshot(snapshot, build_search_indexes=False)
+                    self._enforce_memory_budget()
+                    self._record_changes([article.url for article in unique_articles], [], [])
                     
                     self._last_update = datetime.now().isoformat()
                     
                     # 🔥 关键修改：如果缓存中有文章了，就设置状态为READY
-                    if len(self._cache) > 0 and self._status == ServiceStatus.PREPARING:
+                    if len(merged_entries) > 0 and self._status == ServiceStatus.PREPARING:
                         logger.info("🎉 缓存中已有数据，状态设为就绪，用户可以开始查看文章")
                         self.set_status(ServiceStatus.READY)
                     
                     logger.info(f"📝 [首次加载] 增量追加 {len(unique_articles)} 篇新文章到缓存（跳过 {len(new_articles) - len(unique_articles)} 篇重复）")
-                    logger.info(f"📊 [首次加载] 缓存总数: {len(self._cache)} 篇文章")
+                    logger.info(f"📊 [首次加载] 缓存总数: {len(merged_entries)} 篇文章")
                 else:
                     logger.info(f"📝 [首次加载] 本批次 {len(new_articles)} 篇文章全部为重复，跳过")
                 
@@ -370,22 +1445,123 @@ class NewsCache:
                 logger.error(error_msg)
                 raise
     
-    def get_cache_info(self) -> Dict[str, Any]:
-        """获取缓存信息"""
+    def to_shared_state(self) -> Tuple[Dict[str, Any], Iterator[Tuple[str, bytes]]]:
+        """
+        导出共享快照的内容（owner 进程，无锁读取当前快照）
+        返回状态与元数据记录，以及逐篇产出 (内容摘要, 正文字节串) 的迭代器（分批读取正文）
+        """
+        snapshot = self._snapshot
+        state = {
+            "generation": snapshot.generation,
+            "status": self._status.value,
+            "error_message": self._error_message,
+            "last_update": self._last_update,
+            "update_count": self._update_count,
+            "is_updating": self._is_updating,
+            "is_first_load": self._is_first_load,
+            "change_log": [change.model_dump() for change in self._change_log],
+            "articles": [entry.to_record() for entry in snapshot.entries]
+        }
+        
+        def iter_blobs() -> Iterator[Tuple[str, bytes]]:
+            entries = snapshot.entries
+            for start in range(0, len(entries), _CONTENT_LOAD_BATCH):
+                chunk = entries[start:start + _CONTENT_LOAD_BATCH]
+                for entry, content in zip(chunk, snapshot.load_contents(chunk)):
+                    yield entry.content_hash, _encode_content(content or ())
+        
+        return state, iter_blobs()
+    
+    def load_shared_state(self, state: Dict[str, Any], snapshot_file: MappedSnapshot):
+        """
+        载入 owner 进程导出的共享快照（只读进程，在跟随线程中调用）
+        条目只含元数据，正文通过 MmapBlobStore 从映射的快照文件中读取；
+        搜索索引在跟随线程中建好后才替换快照，请求路径上不会为新快照解码正文建索引；
+        沿用 owner 的缓存代数与变更日志，ETag 与增量同步在各进程间一致；
+        新快照通过自己的 MmapBlobStore 持有对应的映射，仍在使用旧快照的请求照常读取旧正文，
+        代数未变（只有状态变化）时不切换映射也不重建快照
+        """
+        entries = [_CachedArticle.from_record(record) for record in state["articles"]]
+        change_log = tuple(NewsChangeSet(**change) for change in state["change_log"])
         with self._cache_lock:
-            return {
-                "cache_size": len(self._cache),
-                "last_update": self._last_update,
-                "update_count": self._update_count,
-                "status": self._status.value,
-                "error_message": self._error_message,
-                "is_updating": self._is_updating
+            previous_generation = self._snapshot.generation
+            if state["generation"] != previous_generation:
+                content_store = None
+                if isinstance(self._blob_store, MmapBlobStore):
+                    self._blob_store.swap(snapshot_file)
+                    content_store = MmapBlobStore(snapshot_file)
+                self._publish_snapshot(entries, generation=state["generation"], build_content_index=True,
+                                       content_store=content_store)
+            self._change_log = change_log
+            self._status = ServiceStatus(state["status"])
+            self._error_message = state["error_message"]
+            self._last_update = state["last_update"]
+            self._update_count = state["update_count"]
+            self._is_updating = state["is_updating"]
+            self._is_first_load = state["is_first_load"]
+        
+        # 本进程的 SSE 订阅者同样收到 owner 的变更事件
+        for change in change_log:
+            if change.generation > previous_generation:
+                self._publish_change_event(change)
+    
+    def resume_generation(self, generation: int):
+        """接续此前导出的缓存代数（owner 进程重启时调用），发布一个空快照并跳过一代"""
+        with self._cache_lock:
+            if generation >= self._generation:
+                self._generation = generation + 1
+                self._publish_snapshot([])
+    
+    def get_cache_info(self) -> Dict[str, Any]:
+        """获取缓存信息（无锁读取）"""
+        change_log = self._change_log
+        last_changes = change_log[-1] if change_log else None
+        return {
+            "cache_size": len(self._snapshot.entries),
+            "generation": self._snapshot.generation,
+            "last_update": self._last_update,
+            "update_count": self._update_count,
+            "status": self._status.value,
+            "error_message": self._error_message,
+            "is_updating": self._is_updating,
+            "query_cache": self._query_cache.get_stats(),
+            "rendered_pages": self._rendered_pages.get_stats(),
+            "search_index": {
+                "title_summary": self._snapshot.has_search_indexes(SearchScope.TITLE),
+                "content": self._snapshot.has_search_indexes(SearchScope.CONTENT),
+                "content_requested": self._content_search_requested
+            },
+            "memory": {
+                **self._memory_budget.get_stats(self._snapshot.memory_usage()),
+                "spilled": self._spill_store.get_stats() if self._spill_store else None
+            },
+            "content_store": {
+                "type": type(self._blob_store).__name__,
+                **self._blob_store.get_stats(),
+                "hot_cache": self._content_cache.get_stats()
+            } if self._blob_store else None,
+            "last_changes": {
+                "generation": last_changes.generation,
+                "added": len(last_changes.added),
+                "changed": len(last_changes.changed),
+                "removed": len(last_changes.removed)
+            } if last_changes else None,
+            "change_log": {
+                "size": len(change_log),
+                "max_size": max(1, settings.news_change_log_size),
+                "oldest_generation": change_log[0].generation if change_log else None
             }
+        }
     
     def clear_cache(self):
         """清空缓存"""
         with self._cache_lock:
-            self._cache.clear()
+            previous = self._snapshot
+            removed = [entry.url for entry in previous.entries]
+            self._publish_snapshot([])
+            self._collect_stale_contents(previous)
+            self._known_urls = set()
+            self._record_changes([], [], removed)
             self._last_update = None
             self._update_count = 0
             self.set_updating(True)  # 清空时设为准备中
@@ -398,13 +1574,23 @@ def get_news_cache() -> NewsCache:
     """获取新闻缓存实例"""
     global _news_cache
     if _news_cache is None:
-        _news_cache = NewsCache()
+        _news_cache = _create_news_cache()
     return _news_cache
 
+def _create_news_cache() -> NewsCache:
+    """
+    按配置创建新闻缓存（正文常驻内存或存放在外部存储）
+    多进程运行时的只读进程不创建正文存储（SQLite 存储启动时会清空 owner 的数据），正文从共享快照读取
+    """
+    if is_snapshot_reader():
+        return NewsCache(blob_store=MmapBlobStore())
+    return NewsCache(blob_store=create_blob_store(settings.news_content_store,
+                                                  settings.news_content_store_path))
+
 def init_cache():
     """初始化缓存"""
     global _news_cache, _banner_cache
-    _news_cache = NewsCache()
+    _news_cache = _create_news_cache()
     _banner_cache = BannerCache()
     logger.info("新闻缓存初始化完成")
     logger.info("轮播图缓存初始化完成")
@@ -413,7 +1599,7 @@ def init_cache():
 class BannerCache:
     """轮播图缓存管理器"""
     
-    def __init__(self):
+    def __init__(self, memory_budget: Optional[int] = None):
         self._cache: List[Dict[str, Any]] = []
         self._cache_lock = threading.RLock()
         self._status = ServiceStatus.PREPARING  # 初始状态为准备中，等待首次爬取
@@ -422,6 +1608,11 @@ class BannerCache:
         self._error_message = None
         self._is_updating = False
         self._first_load_completed = False  # 标记是否完成首次加载
+        self._generation = 0  # 缓存代数，每次写入递增，用于生成 ETag
+        # 内存预算（字节）：轮播图按展示顺序保留，超出预算的靠后图片不写入缓存
+        self._memory_budget = MemoryBudget(settings.banner_cache_memory_budget
+                                           if memory_budget is None else memory_budget)
+        self._dropped_count = 0  # 最近一次写入时因超出内存预算未缓存的图片数
         
     def get_status(self) -> Dict[str, Any]:
         """获取轮播图服务状态"""
@@ -433,7 +1624,8 @@ class BannerCache:
                 "update_count": self._update_count,
                 "error_message": self._error_message,
                 "is_updating": self._is_updating,
-                "first_load_completed": self._first_load_completed
+                "first_load_completed": self._first_load_completed,
+                "dropped_count": self._dropped_count
             }
     
     def set_status(self, status: ServiceStatus, error_message: Optional[str] = None):
@@ -442,6 +1634,7 @@ class BannerCache:
             self._status = status
             self._error_message = error_message
             logger.info(f"轮播图服务状态更新: {status.value}")
+            notify_snapshot_changed()
     
     def set_updating(self, is_updating: bool):
         """设置更新状态"""
@@ -470,9 +1663,12 @@ class BannerCache:
                 self.set_updating(True)
                 
                 # 更新缓存
-                self._cache = banner_data.copy()
+                self._cache = self._fit_memory_budget(banner_data)
                 self._last_update = datetime.now().isoformat()
                 self._update_count += 1
+                self._generation += 1
+                publish_event("banner", {"generation": self._generation, "count": len(self._cache)})
+                notify_snapshot_changed()
                 
                 # 标记首次加载完成
                 if not self._first_load_completed:
@@ -496,6 +1692,25 @@ class BannerCache:
                 logger.error(error_msg)
                 raise
     
+    def _fit_memory_budget(self, banner_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """按展示顺序保留预算以内的轮播图（调用方需持有锁），丢弃的张数记入 dropped_count"""
+        kept: List[Dict[str, Any]] = []
+        usage = 0
+        self._dropped_count = 0
+        for index, item in enumerate(banner_data):
+            size = estimate_size(item)
+            if self._memory_budget.exceeded(usage + size):
+                dropped = banner_data[index:]
+                freed = sum(estimate_size(rest) for rest in dropped)
+                self._memory_budget.record_eviction(len(dropped), freed)
+                self._dropped_count = len(dropped)
+                logger.warning(f"🧹 [内存预算] 轮播图超出预算 {self._memory_budget.limit} 字节，"
+                               f"丢弃靠后的 {len(dropped)} 张图片")
+                break
+            kept.append(item)
+            usage += size
+        return kept
+    
     def get_cache_info(self) -> Dict[str, Any]:
         """获取轮播图缓存信息"""
         with self._cache_lock:
@@ -505,17 +1720,70 @@ class BannerCache:
                 "update_count": self._update_count,
                 "status": self._status.value,
                 "error_message": self._error_message,
-                "is_updating": self._is_updating
+                "is_updating": self._is_updating,
+                "memory": self._memory_budget.get_stats(sum(estimate_size(item) for item in self._cache))
+            }
+    
+    @property
+    def generation(self) -> int:
+        """当前缓存代数"""
+        return self._generation
+    
+    def to_shared_state(self) -> Dict[str, Any]:
+        """导出共享快照中的轮播图状态（owner 进程）"""
+        with self._cache_lock:
+            return {
+                "generation": self._generation,
+                "status": self._status.value,
+                "error_message": self._error_message,
+                "last_update": self._last_update,
+                "update_count": self._update_count,
+                "is_updating": self._is_updating,
+                "first_load_completed": self._first_load_completed,
+                "dropped_count": self._dropped_count,
+                "images": list(self._cache)
             }
     
-    def clear_cache(self):
-        """清空轮播图缓存"""
+    def load_shared_state(self, state: Dict[str, Any]):
+        """载入 owner 进程导出的轮播图状态（只读进程），代数变化时推送事件"""
         with self._cache_lock:
-            self._cache.clear()
+            changed = state["generation"] != self._generation
+            self._cache = state["images"]
+            self._generation = state["generation"]
+            self._status = ServiceStatus(state["status"])
+            self._error_message = state["error_message"]
+            self._last_update = state["last_update"]
+            self._update_count = state["update_count"]
+            self._is_updating = state["is_updating"]
+            self._first_load_completed = state["first_load_completed"]
+            self._dropped_count = state["dropped_count"]
+        if changed:
+            publish_event("banner", {"generation": state["generation"], "count": len(state["images"])})
+    
+    def resume_generation(self, generation: int):
+        """接续此前导出的缓存代数（owner 进程重启时调用）"""
+        with self._cache_lock:
+            self._generation = max(self._generation, generation + 1)
+    
+    def clear_cache(self, reset_status: bool = True) -> int:
+        """
+        清空轮播图缓存，返回清空前的图片数
+        缓存代数加一使已下发的 ETag 失效，并推送事件、通知共享快照导出；
+        reset_status 为 False 时保持当前服务状态（手动清空接口），否则设为准备中
+        """
+        with self._cache_lock:
+            cleared_count = len(self._cache)
+            self._cache = []
+            self._generation += 1
             self._last_update = None
             self._update_count = 0
-            self.set_updating(True)
-            logger.info("轮播图缓存已清空")
+            self._dropped_count = 0
+            publish_event("banner", {"generation": self._generation, "count": 0})
+            notify_snapshot_changed()
+            if reset_status:
+                self.set_updating(True)
+            logger.info(f"轮播图缓存已清空，原有 {cleared_count} 张图片")
+            return cleared_count
 
 
 # 全局轮播图缓存实例
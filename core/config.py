@@ -44,6 +44,25 @@ class Settings(BaseSettings):
     # 缓存配置
     enable_cache: bool = True
     cache_initial_load: bool = True  # 是否在启动时加载缓存
+    news_query_cache_size: int = 256  # 搜索结果LRU缓存的最大条目数
+    news_prerender_pages: int = 5     # 每个分类预序列化的前N页
+    news_rendered_cache_size: int = 64  # 预序列化页面LRU缓存的最大条目数
+    news_content_store: str = "resident"  # 文章正文存放位置：resident（常驻内存）/ sqlite / memory
+    news_content_store_path: str = "./data/news_content.db"  # sqlite 正文存储文件路径
+    news_content_cache_size: int = 128  # 正文外置时，详情页热点文章正文的LRU缓存条目数
+    news_change_log_size: int = 200  # 增量同步保留的最近写入次数，更早的客户端需要全量同步
+    news_cache_memory_budget: int = 256 * 1024 * 1024  # 新闻缓存条目（元数据+常驻正文）的内存预算（字节），0 表示不限制
+    banner_cache_memory_budget: int = 4 * 1024 * 1024   # 轮播图缓存的内存预算（字节），0 表示不限制
+    news_content_spill_path: str = "./data/news_spill.db"  # 正文常驻内存时，超出预算被淘汰的正文转存的 sqlite 文件路径
+    
+    # 多进程配置：workers > 1 时由一个进程负责爬取，其余进程映射它导出的共享快照
+    workers: int = 1                                          # uvicorn 工作进程数
+    shared_snapshot_path: str = "./data/news_snapshot.bin"    # 共享快照文件路径（同目录下还有 .lock 锁文件）
+    shared_snapshot_poll_interval: float = 1.0                # 只读进程检查快照文件的间隔（秒）
+    
+    # 事件推送配置（Server-Sent Events）
+    sse_keepalive_interval: float = 15.0  # 心跳间隔（秒），防止代理断开空闲连接
+    sse_history_size: int = 64            # 保留的最近事件数，断线重连时按 Last-Event-ID 补发
     
     # 日志配置
     log_level: str = "INFO"
@@ -0,0 +1,147 @@
+# Copyright (c) 2025 XBXyftx
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+统一的日期解析与标准化
+爬虫入库时的格式统一和缓存排序都使用这里的同一套规则，正则在模块加载时编译一次；
+同一个日期字符串在列表接口和缓存中会反复出现，解析结果按字符串做 LRU 记忆；
+只有月日格式（如 08-31）与当前年份有关，记忆中只保存 (月, 日)，年份每次调用时再取
+"""
+
+import re
+import logging
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# 解析结果记忆的最大条目数（每天一个日期，足够覆盖多年的数据）
+DATE_CACHE_SIZE = 4096
+
+# 校验月日格式是否存在时使用的闰年（2月29日视为有效，实际年份在取值时再校验）
+_LEAP_YEAR = 2000
+
+# 可接受的年份范围，超出视为无效
+_MIN_YEAR = 1900
+_MAX_YEAR = 2100
+
+# 按优先级排列：完整的年月日 > 日月年 > 年月（取当月1日） > 月日（取当年）
+# 2024-08-31, 2024.8.31, 2024/08/31, 2024年08月31日, 2024-08-31 10:30:00
+_YEAR_MONTH_DAY = re.compile(r"(\d{4})\s*[-./年]\s*(\d{1,2})\s*[-./月]\s*(\d{1,2})")
+# 31-08-2024, 31.08.2024, 31/08/2024
+_DAY_MONTH_YEAR = re.compile(r"(?<!\d)(\d{1,2})[-./](\d{1,2})[-./](\d{4})(?!\d)")
+# 2025年9月, 2025-09, 2025.9
+_YEAR_MONTH = re.compile(r"(\d{4})\s*[-./年]\s*(\d{1,2})(?!\d)")
+# 08-31, 8.31, 08/31
+_MONTH_DAY = re.compile(r"^(\d{1,2})[-./](\d{1,2})$")
+# 兜底：任意分隔的数字
+_DIGITS = re.compile(r"\d+")
+
+
+def _make_date(year: int, month: int, day: int) -> Optional[date]:
+    """组装日期，年份越界或日期不存在（如2月30日）时返回 None"""
+    if not _MIN_YEAR <= year <= _MAX_YEAR:
+        return None
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _parse_text(text: str) -> Union[date, Tuple[int, int], None]:
+    """
+    按优先级依次尝试各个格式；匹配到某个格式但日期本身无效（如 2024-02-30）时直接判为无法解析
+    月日格式返回 (月, 日)，由调用方按当前年份组装
+    """
+    match = _YEAR_MONTH_DAY.search(text)
+    if match:
+        return _make_date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+
+    match = _DAY_MONTH_YEAR.search(text)
+    if match:
+        return _make_date(int(match.group(3)), int(match.group(2)), int(match.group(1)))
+
+    match = _YEAR_MONTH.search(text)
+    if match:
+        return _make_date(int(match.group(1)), int(match.group(2)), 1)
+
+    match = _MONTH_DAY.match(text)
+    if match:
+        month, day = int(match.group(1)), int(match.group(2))
+        return (month, day) if _make_date(_LEAP_YEAR, month, day) else None
+
+    # 兜底：取前三个数字，四位数在首位按年月日，在末位按日月年
+    numbers = [int(number) for number in _DIGITS.findall(text)[:3]]
+    if len(numbers) == 3 and numbers[0] > _MIN_YEAR:
+        return _make_date(numbers[0], numbers[1], numbers[2])
+    if len(numbers) == 3 and numbers[2] > _MIN_YEAR:
+        return _make_date(numbers[2], numbers[1], numbers[0])
+    return None
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_memoized(date_str: str) -> Union[date, Tuple[int, int], None]:
+    """按字符串记忆的解析结果（月日格式只记忆月和日）"""
+    parsed = _parse_text(date_str.strip())
+    if parsed is None:
+        # 有记忆，同一个无法解析的字符串只会告警一次
+        logger.warning(f"⚠️ 无法解析日期格式: '{date_str}'")
+    return parsed
+
+
+def parse_date(date_str: Optional[str]) -> Optional[date]:
+    """
+    把各种格式的日期字符串解析为 date，无法解析时返回 None（结果按字符串记忆）
+    支持：2024-08-31 / 2024.8.31 / 2024/08/31 / 2024年08月31日 / 带时间的写法 /
+    31-08-2024（日月年）/ 2025年9月（取当月1日）/ 08-31（取当年）
+    """
+    if not date_str or not isinstance(date_str, str):
+        return None
+
+    parsed = _parse_memoized(date_str)
+    if isinstance(parsed, tuple):
+        # 年份不进入记忆：长期运行的进程跨年后，月日格式要按新的年份解析
+        return _make_date(datetime.now().year, *parsed)
+    return parsed
+
+
+def normalize_date(date_str: Optional[str]) -> str:
+    """
+    标准化为 YYYY-MM-DD 格式
+    空值返回空字符串，无法解析时保持原样（交给调用方决定如何处理）
+    """
+    if not date_str:
+        return ""
+    parsed = parse_date(date_str)
+    return parsed.isoformat() if parsed else date_str
+
+
+def parse_dates(date_strs: Iterable[Optional[str]]) -> List[Optional[date]]:
+    """批量解析：同一批次中重复的字符串只解析一次"""
+    resolved = {}
+    results = []
+    for date_str in date_strs:
+        if date_str not in resolved:
+            resolved[date_str] = parse_date(date_str)
+        results.append(resolved[date_str])
+    return results
+
+
+def normalize_dates(date_strs: Iterable[Optional[str]]) -> List[str]:
+    """批量标准化（如一整页列表接口数据），与逐个调用 normalize_date 结果一致"""
+    date_strs = list(date_strs)
+    return [
+        parsed.isoformat() if parsed else (date_str or "")
+        for date_str, parsed in zip(date_strs, parse_dates(date_strs))
+    ]
@@ -0,0 +1,264 @@
+# Copyright (c) 2025 XBXyftx
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+缓存更新事件广播（Server-Sent Events）
+新闻/轮播图缓存发布新代数时调用 publish_event，事件经 call_soon_threadsafe 交给事件循环，
+爬虫线程中写入缓存也是安全的；事件循环中只有一个共享的 Future，所有订阅者等待同一个 Future，
+新事件或心跳到来时一次性唤醒，空闲连接不各自持有队列或定时器；
+事件编号由启动标识（多进程运行时各工作进程相同）与各事件类型的缓存代数组成，如 "<epoch>-banner.3-news.12"，
+不依赖进程内的序号，断线后重连到任意工作进程都能按代数补发；
+重启前的编号或错过的事件已滚出历史时推送 resync 事件，而不是按无关的编号补发
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+
+from core.config import settings
+from core.http_cache import get_boot_id
+
+logger = logging.getLogger(__name__)
+
+# 心跳唤醒的标记（Future 结果），订阅者据此输出注释行保持连接
+_HEARTBEAT = "heartbeat"
+
+# 无法按 Last-Event-ID 补发时推送的事件，客户端收到后重新全量同步（如 /api/news/changes 返回 resync）
+RESYNC_EVENT = "resync"
+
+
+def format_event_id(epoch: str, positions: Dict[str, int]) -> str:
+    """由启动标识与各事件类型的缓存代数生成事件编号（事件类型按名称排序）"""
+    return "-".join([epoch] + [f"{topic}.{generation}" for topic, generation in sorted(positions.items())])
+
+
+def parse_event_id(value: str) -> Optional[Tuple[str, Dict[str, int]]]:
+    """解析事件编号，返回 (启动标识, 各事件类型的缓存代数)；格式不对时返回 None"""
+    epoch, *parts = value.split("-")
+    positions: Dict[str, int] = {}
+    for part in parts:
+        topic, _, generation = part.rpartition(".")
+        if not topic or not generation.isdecimal():
+            return None
+        positions[topic] = int(generation)
+    return (epoch, positions) if epoch else None
+
+
+class ServerEvent:
+    """
+    一条已编号的事件：seq 为进程内递增的序号（只用于订阅者在本进程内的迭代），
+    positions 为该事件发布后各事件类型的缓存代数，id 由启动标识与 positions 组成
+    """
+    __slots__ = ("epoch", "seq", "event", "data", "positions")
+
+    def __init__(self, epoch: str, seq: int, event: str, data: Dict[str, Any], positions: Dict[str, int]):
+        self.epoch = epoch
+        self.seq = seq
+        self.event = event
+        self.data = data
+        self.positions = positions
+
+    @property
+    def generation(self) -> Optional[int]:
+        """事件对应的缓存代数（不带代数的事件为 None）"""
+        generation = self.data.get("generation")
+        return generation if isinstance(generation, int) else None
+
+    @property
+    def id(self) -> str:
+        return format_event_id(self.epoch, self.positions)
+
+    def encode(self) -> bytes:
+        """按 SSE 格式编码（id / event / data 三行 + 空行）"""
+        payload = json.dumps(self.data, ensure_ascii=False, separators=(",", ":"))
+        return f"id: {self.id}\nevent: {self.event}\ndata: {payload}\n\n".encode("utf-8")
+
+
+class EventBroadcaster:
+    """
+    单个事件循环内的事件广播器
+    最近的事件保存在有界的历史中，断线重连的客户端按 Last-Event-ID 中各事件类型的代数补发错过的事件；
+    除 bind_loop/publish 外的方法都只能在事件循环线程中调用
+    """
+
+    def __init__(self, history_size: int = 64, keepalive_interval: float = 15.0, epoch: Optional[str] = None):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._epoch = epoch or get_boot_id()  # 编号前缀，各工作进程相同，重启后不同
+        self._history: Deque[ServerEvent] = deque(maxlen=max(1, history_size))
+        self._last_id = 0
+        self._positions: Dict[str, int] = {}  # 各事件类型最新的缓存代数
+        # 各事件类型可补发的下限：代数不高于它的事件已滚出历史（或早于本进程开始记录）
+        self._floors: Dict[str, int] = {}
+        self._waiter: Optional[asyncio.Future] = None
+        self._keepalive_interval = keepalive_interval
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._subscribers = 0
+        self._published = 0
+        self._dropped = 0  # 事件循环未启动时丢弃的事件数
+
+    @property
+    def epoch(self) -> str:
+        """事件编号的前缀（启动标识）"""
+        return self._epoch
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop):
+        """绑定事件循环并启动心跳（在应用启动时、事件循环线程中调用）"""
+        self._loop = loop
+        if self._heartbeat_task is None and self._keepalive_interval > 0:
+            self._heartbeat_task = loop.create_task(self._heartbeat())
+        logger.info("📡 事件广播已绑定事件循环")
+
+    async def close(self):
+        """停止心跳（应用关闭时调用），正在等待的订阅者随之结束"""
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        self._wake(None)
+        self._loop = None
+
+    def publish(self, event: str, data: Dict[str, Any]):
+        """发布事件，任意线程均可调用；事件循环未绑定时（如离线脚本、测试）直接丢弃"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            self._dropped += 1
+            return
+        try:
+            loop.call_soon_threadsafe(self._dispatch, event, data)
+        except RuntimeError:
+            # 事件循环正在关闭
+            self._dropped += 1
+
+    def _dispatch(self, event: str, data: Dict[str, Any]):
+        """在事件循环线程中编号、记入历史并唤醒所有订阅者"""
+        self._last_id += 1
+        self._published += 1
+        if len(self._history) == self._history.maxlen:
+            dropped = self._history[0]
+            if dropped.generation is not None:
+                self._floors[dropped.event] = max(self._floors.get(dropped.event, 0), dropped.generation)
+        server_event = ServerEvent(self._epoch, self._last_id, event, data, self._positions)
+        generation = server_event.generation
+        if generation is not None:
+            self._floors.setdefault(event, generation - 1)
+            # 已发出的事件引用旧的 positions，这里替换为新字典而不是原地修改
+            positions = dict(self._positions)
+            positions[event] = generation
+            self._positions = server_event.positions = positions
+        self._history.append(server_event)
+        self._wake(event)
+
+    def _wake(self, reason: Optional[str]):
+        """唤醒等待中的订阅者，下一次等待使用新的 Future"""
+        waiter, self._waiter = self._waiter, None
+        if waiter is not None and not waiter.done():
+            waiter.set_result(reason)
+
+    async def _heartbeat(self):
+        """定时唤醒订阅者输出心跳，整个进程只有这一个定时器"""
+        while True:
+            await asyncio.sleep(self._keepalive_interval)
+            self._wake(_HEARTBEAT)
+
+    def _pending_after(self, last_id: int):
+        """历史中序号大于 last_id 的事件"""
+        return [event for event in self._history if event.seq > last_id]
+
+    def _resume_point(self, last_event_id: Optional[str]) -> Tuple[int, Dict[str, int], Optional[str]]:
+        """
+        根据客户端的 Last-Event-ID 决定补发范围，返回 (起始序号, 客户端已收到的各类型代数, 需要全量同步的原因)
+        补发时从历史开头按代数筛选：只推送代数高于客户端已收到代数的事件；
+        编号格式不对或来自重启前（启动标识不同）、错过的事件已滚出历史时无法补发，
+        从当前位置开始推送新事件并要求全量同步；
+        客户端的代数高于本进程（刚从领先的工作进程切换过来）时不算错误，等本进程跟上后照常推送
+        """
+        if last_event_id is None:
+            return self._last_id, dict(self._positions), None
+        parsed = parse_event_id(last_event_id)
+        if parsed is None or parsed[0] != self._epoch:
+            return self._last_id, dict(self._positions), "epoch"
+        seen = parsed[1]
+        for topic, floor in self._floors.items():
+            if topic in seen and seen[topic] < floor:
+                return self._last_id, dict(self._positions), "expired"
+        return 0, seen, None
+
+    async def subscribe(self, last_event_id: Optional[str] = None) -> AsyncIterator[Optional[ServerEvent]]:
+        """
+        订阅事件：逐个产出新事件，心跳时产出 None
+        传入 last_event_id 时先补发历史中之后的事件，无法补发时先产出一个 resync 事件；
+        事件类型的代数不高于客户端已收到的代数时跳过（未出现在编号中的类型全部推送）；
+        广播器关闭时结束
+        """
+        last_id, seen, resync_reason = self._resume_point(last_event_id)
+        self._subscribers += 1
+        try:
+            if resync_reason is not None:
+                logger.info(f"🔁 [事件流] Last-Event-ID={last_event_id} 无法补发（{resync_reason}），要求全量同步")
+                yield ServerEvent(self._epoch, last_id, RESYNC_EVENT, {"reason": resync_reason}, seen)
+            while True:
+                pending = self._pending_after(last_id)
+                if pending:
+                    for event in pending:
+                        last_id = event.seq
+                        generation = event.generation
+                        if generation is not None:
+                            if generation <= seen.get(event.event, -1):
+                                continue
+                            seen[event.event] = generation
+                        yield event
+                    continue
+                if self._loop is None:
+                    return
+                if self._waiter is None:
+                    self._waiter = self._loop.create_future()
+                # shield：单个订阅者断开（任务被取消）不会取消其他人共享的 Future
+                reason = await asyncio.shield(self._waiter)
+                if reason is None:
+                    return
+                if reason == _HEARTBEAT:
+                    yield None
+        finally:
+            self._subscribers -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """广播统计"""
+        return {
+            "subscribers": self._subscribers,
+            "published": self._published,
+            "dropped": self._dropped,
+            "epoch": self._epoch,
+            "last_event_id": format_event_id(self._epoch, self._positions),
+            "history_size": len(self._history),
+            "bound": self._loop is not None
+        }
+
+
+# 全局广播器实例
+_broadcaster: Optional[EventBroadcaster] = None
+
+
+def get_event_broadcaster() -> EventBroadcaster:
+    """获取事件广播器实例"""
+    global _broadcaster
+    if _broadcaster is None:
+        _broadcaster = EventBroadcaster(settings.sse_history_size, settings.sse_keepalive_interval)
+    return _broadcaster
+
+
+def publish_event(event: str, data: Dict[str, Any]):
+    """发布缓存更新事件（任意线程均可调用）"""
+    data.setdefault("timestamp", datetime.now().isoformat())
+    get_event_broadcaster().publish(event, data)
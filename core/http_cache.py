@@ -0,0 +1,151 @@
+# Copyright (c) 2025 XBXyftx
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+HTTP 缓存相关支持
+- 条件请求（ETag / If-None-Match / Last-Modified）：ETag 由缓存代数 + 查询参数生成，
+  缓存未更新时客户端可直接得到 304，无需任何过滤和序列化
+- 预压缩：热点响应按 Accept-Encoding 选择 gzip / brotli 版本，每个缓存代数只压缩一次
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import secrets
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+# brotli 为可选依赖，未安装时只提供 gzip 版本
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+GZIP_COMPRESS_LEVEL = 9
+BROTLI_QUALITY = 9
+
+# 进程启动标识：重启后缓存代数会从头计数，加入该标识避免新旧进程的 ETag 误匹配；
+# 多进程运行时由 run.py 通过环境变量 APP_BOOT_ID 统一下发，各工作进程生成的 ETag 一致
+_BOOT_ID = os.environ.get("APP_BOOT_ID") or secrets.token_hex(4)
+
+
+def get_boot_id() -> str:
+    """进程启动标识（增量同步接口据此让客户端在服务重启后重新全量同步）"""
+    return _BOOT_ID
+
+
+def build_etag(namespace: str, generation: int, params: Optional[Dict[str, Any]] = None) -> str:
+    """根据缓存代数和查询参数生成强 ETag"""
+    normalized = sorted((key, str(value)) for key, value in (params or {}).items() if value is not None)
+    digest = hashlib.sha1(repr(normalized).encode("utf-8")).hexdigest()[:16]
+    return f'"{namespace}-{_BOOT_ID}-{generation}-{digest}"'
+
+
+def to_http_date(last_update: Optional[str]) -> Optional[str]:
+    """把缓存中记录的 ISO 格式更新时间转换为 HTTP 日期（GMT）"""
+    if not last_update:
+        return None
+    try:
+        moment = datetime.fromisoformat(last_update)
+    except ValueError:
+        logger.warning(f"⚠️ 无法解析缓存更新时间: {last_update}")
+        return None
+    return format_datetime(moment.astimezone(timezone.utc).replace(microsecond=0), usegmt=True)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 使用弱比较：忽略 W/ 前缀"""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in candidates)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[str]) -> bool:
+    """
+    判断客户端缓存是否仍然有效
+    按 RFC 7232：存在 If-None-Match 时只比较 ETag，否则才比较 If-Modified-Since
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def cache_headers(etag: str, last_modified: Optional[str]) -> Dict[str, str]:
+    """条件请求相关的响应头；no-cache 要求客户端每次都带上校验头重新验证"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+    return headers
+
+
+def not_modified_response(etag: str, last_modified: Optional[str]) -> Response:
+    """304 响应（无响应体）"""
+    return Response(status_code=304, headers=cache_headers(etag, last_modified))
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    根据 Accept-Encoding 选择预压缩版本：优先 br，其次 gzip，都不接受时返回 None
+    支持 q 值（q=0 表示明确拒绝）与通配符 *
+    """
+    if not accept_encoding:
+        return None
+
+    preferences: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        parts = item.strip().split(";")
+        name = parts[0].strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in parts[1:]:
+            key, _, value = param.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        preferences[name] = quality
+
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and not BROTLI_AVAILABLE:
+            continue
+        if preferences.get(encoding, preferences.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    """按指定编码压缩响应体（mtime 固定为 0，保证同一内容的压缩结果稳定）"""
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_COMPRESS_LEVEL, mtime=0)
+    raise ValueError(f"不支持的压缩编码: {encoding}")
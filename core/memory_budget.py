@@ -0,0 +1,78 @@
+# Copyright (c) 2025 XBXyftx
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+缓存内存预算
+按条目估算占用字节数，超出预算时由各缓存自行决定淘汰哪些数据，这里只负责估算与统计
+"""
+
+import sys
+from typing import Any, Dict
+
+
+def estimate_size(value: Any) -> int:
+    """
+    估算对象及其包含的字符串/容器占用的字节数（sys.getsizeof 逐层累加）
+    被多个对象共享的字符串（如 intern 过的分类名）会重复计入，结果偏保守
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, (tuple, list, set, frozenset)):
+        size += sum(estimate_size(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(estimate_size(key) + estimate_size(item) for key, item in value.items())
+    return size
+
+
+class MemoryBudget:
+    """
+    字节预算与淘汰统计
+    limit_bytes 为 0 表示不限制；计数只在缓存的写锁内修改，读取统计无需加锁
+    """
+
+    def __init__(self, limit_bytes: int):
+        self._limit = max(0, limit_bytes)
+        self._evictions = 0       # 触发淘汰的次数
+        self._evicted_items = 0   # 累计淘汰的条目数
+        self._evicted_bytes = 0   # 累计释放的字节数（估算）
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    def exceeded(self, usage_bytes: int) -> bool:
+        """当前占用是否超出预算"""
+        return 0 < self._limit < usage_bytes
+
+    def headroom(self, usage_bytes: int) -> int:
+        """距离预算上限还剩多少字节，不限制时视为无限"""
+        if self._limit == 0:
+            return sys.maxsize
+        return max(0, self._limit - usage_bytes)
+
+    def record_eviction(self, items: int, freed_bytes: int):
+        """记录一次淘汰"""
+        if items:
+            self._evictions += 1
+            self._evicted_items += items
+            self._evicted_bytes += freed_bytes
+
+    def get_stats(self, usage_bytes: int) -> Dict[str, Any]:
+        """预算使用情况（usage_bytes 由缓存按当前数据统计后传入）"""
+        return {
+            "limit_bytes": self._limit,
+            "usage_bytes": usage_bytes,
+            "usage_ratio": round(usage_bytes / self._limit, 4) if self._limit else None,
+            "evictions": self._evictions,
+            "evicted_items": self._evicted_items,
+            "evicted_bytes": self._evicted_bytes
+        }
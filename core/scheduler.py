@@ -22,6 +22,7 @@ from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 from .cache import get_news_cache, get_banner_cache, ServiceStatus
+from .shared_snapshot import is_snapshot_reader
 from services.news_service import get_news_service, NewsSource
 
 logger = logging.getLogger(__name__)
@@ -71,6 +72,9 @@ class TaskScheduler:
     
     def _run_crawler_in_thread(self, task_name: str, source: NewsSource = NewsSource.ALL):
         """在线程中执行爬虫任务"""
+        if is_snapshot_reader():
+            logger.warning(f"⏭️ {task_name} - 当前为只读工作进程，爬取由负责爬取的进程执行")
+            return
         try:
             logger.info(f"🚀 开始执行{task_name} - 来源: {source.value}")
             
@@ -136,6 +140,9 @@ class TaskScheduler:
     
     def _run_banner_crawler_in_thread(self, task_name: str):
         """在线程中执行轮播图爬虫任务"""
+        if is_snapshot_reader():
+            logger.warning(f"⏭️ {task_name} - 当前为只读工作进程，爬取由负责爬取的进程执行")
+            return
         try:
             logger.info(f"🖼️ 开始执行{task_name}")
             
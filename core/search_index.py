@@ -0,0 +1,265 @@
+# Copyright (c) 2025 XBXyftx
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+中文友好的倒排索引
+
+- 中文（CJK）连续片段按单字 + 二元组（bigram）建索引
+- 英文/数字连续片段按整词建索引，词表另建三元组（trigram）索引，查询片段只是词的一部分时据此展开
+查询时先用倒排表求交得到候选文档，再对候选做一次子串校验，
+因此结果与原来的 `query in text.lower()` 语义完全一致，而开销只与候选数量相关。
+索引同时保存词频和文档长度，可对命中结果按 BM25 计算相关度。
+"""
+
+import re
+import copy
+import math
+import logging
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 字母数字连续片段（不含下划线），CJK 字符也会被包含在内，需要再拆分
+_ALNUM_RUN = re.compile(r"[^\W_]+")
+# CJK 统一表意文字（含扩展A区与兼容区）
+_CJK_RUN = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+")
+
+# BM25 参数
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_KIND_WORD = "word"
+_KIND_CJK = "cjk"
+
+# 词表三元组的长度与词尾标记（词由字母数字组成，不会出现该字符），带上词尾后后缀查询也能用三元组定位
+_GRAM_SIZE = 3
+_WORD_END = "$"
+
+
+def _iter_runs(text: str) -> Iterator[Tuple[str, str, int, int]]:
+    """
+    把已转小写的文本拆成 (类型, 片段, 起始位置, 结束位置)
+    类型为 word（英文/数字整词）或 cjk（中文连续片段）
+    """
+    for match in _ALNUM_RUN.finditer(text):
+        run = match.group()
+        base = match.start()
+        cursor = 0
+        for cjk in _CJK_RUN.finditer(run):
+            if cjk.start() > cursor:
+                yield _KIND_WORD, run[cursor:cjk.start()], base + cursor, base + cjk.start()
+            yield _KIND_CJK, cjk.group(), base + cjk.start(), base + cjk.end()
+            cursor = cjk.end()
+        if cursor < len(run):
+            yield _KIND_WORD, run[cursor:], base + cursor, base + len(run)
+
+
+def _cjk_terms(run: str) -> List[str]:
+    """中文片段的索引项：单字 + 相邻二元组"""
+    terms = list(run)
+    terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return terms
+
+
+def _grams(text: str) -> Set[str]:
+    """文本中所有长度为 _GRAM_SIZE 的片段（去重）"""
+    return {text[i:i + _GRAM_SIZE] for i in range(len(text) - _GRAM_SIZE + 1)}
+
+
+def _contains(sorted_ids: List[int], doc_id: int) -> bool:
+    """在升序倒排表中二分查找文档"""
+    index = bisect_left(sorted_ids, doc_id)
+    return index < len(sorted_ids) and sorted_ids[index] == doc_id
+
+
+class NgramIndex:
+    """
+    单个文本字段的倒排索引（构建后只读）
+    文档编号即构建时传入序列的下标，倒排表按编号升序保存；
+    同时记录词频与文档长度，供 BM25 相关度打分使用。
+    默认在内存中保留一份小写文本用于候选校验；传入 text_loader 时不保留文本，
+    校验时再按文档编号批量取回原文（适合正文这类体积大、存放在外部存储中的字段）
+    """
+
+    def __init__(self, texts: Iterable[Optional[str]],
+                 text_loader: Optional[Callable[[Sequence[int]], List[str]]] = None):
+        self._text_loader = text_loader
+        self._postings: Dict[str, List[int]] = {}
+        self._frequencies: Dict[str, List[int]] = {}
+        self._lengths: List[int] = []
+
+        haystacks = []
+        for doc_id, text in enumerate(texts):
+            haystack = (text or "").lower()
+            if text_loader is None:
+                haystacks.append(haystack)
+            counts: Dict[str, int] = {}
+            for kind, run, _, _ in _iter_runs(haystack):
+                terms = _cjk_terms(run) if kind == _KIND_CJK else [run]
+                for term in terms:
+                    counts[term] = counts.get(term, 0) + 1
+            for term, count in counts.items():
+                self._postings.setdefault(term, []).append(doc_id)
+                self._frequencies.setdefault(term, []).append(count)
+            self._lengths.append(sum(counts.values()))
+
+        self._haystacks: Optional[Tuple[str, ...]] = tuple(haystacks) if text_loader is None else None
+        self._size = len(self._lengths)
+
+        # 语料统计：平均文档长度在构建时算好，查询时直接使用
+        self._average_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+
+        # 英文词表按字典序排列，用于前缀查询；三元组 -> 词表下标，用于子串与后缀查询
+        self._vocabulary: List[str] = sorted(
+            term for term in self._postings if not _CJK_RUN.match(term)
+        )
+        self._vocabulary_grams: Dict[str, List[int]] = {}
+        for position, token in enumerate(self._vocabulary):
+            for gram in _grams(token + _WORD_END):
+                self._vocabulary_grams.setdefault(gram, []).append(position)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def with_text_loader(self, text_loader: Callable[[Sequence[int]], List[str]]) -> "NgramIndex":
+        """共享倒排表、只替换原文来源的索引副本（文档编号与文本都不变时使用）"""
+        index = copy.copy(self)
+        index._text_loader = text_loader
+        return index
+
+    def _expand_word(self, word: str, left_bounded: bool, right_bounded: bool) -> List[str]:
+        """
+        查询中的英文片段可能对应的索引词
+        片段两侧在查询里都有其他字符时，文本中的词必然与它完全相同；
+        只有右侧有字符时必然是词的后缀，只有左侧有字符时必然是前缀，都没有时是子串
+        """
+        if left_bounded and right_bounded:
+            return [word] if word in self._postings else []
+
+        if right_bounded:
+            return self._match_vocabulary(word + _WORD_END, lambda token: token.endswith(word))
+        if left_bounded:
+            tokens = []
+            index = bisect_left(self._vocabulary, word)
+            while index < len(self._vocabulary) and self._vocabulary[index].startswith(word):
+                tokens.append(self._vocabulary[index])
+                index += 1
+            return tokens
+        return self._match_vocabulary(word, lambda token: word in token)
+
+    def _match_vocabulary(self, fragment: str, predicate: Callable[[str], bool]) -> List[str]:
+        """
+        词表中满足 predicate 的词：先对片段的三元组求交得到候选词，再逐个校验
+        片段不足一个三元组（单个字母的子串查询等）时没有可用的约束，只能遍历词表
+        """
+        grams = _grams(fragment)
+        if not grams:
+            return [token for token in self._vocabulary if predicate(token)]
+        postings = sorted((self._vocabulary_grams.get(gram, []) for gram in grams), key=len)
+        positions = set(postings[0])
+        for posting in postings[1:]:
+            if not positions:
+                break
+            positions.intersection_update(posting)
+        return [self._vocabulary[position] for position in sorted(positions)
+                if predicate(self._vocabulary[position])]
+
+    def _plan(self, query: str) -> List[List[str]]:
+        """
+        把已转小写的查询拆成若干约束组：文档必须命中每一组中的至少一个索引词
+        中文片段的每个二元组（单字片段则为该字）各自成组，英文片段展开为一组候选词
+        """
+        groups: List[List[str]] = []
+        for kind, run, start, end in _iter_runs(query):
+            if kind == _KIND_CJK:
+                terms = [run] if len(run) == 1 else [run[i:i + 2] for i in range(len(run) - 1)]
+                groups.extend([term] for term in terms)
+            else:
+                groups.append(self._expand_word(run, start > 0, end < len(query)))
+        return groups
+
+    def _group_postings(self, group: List[str]) -> List[int]:
+        """一组索引词的倒排表并集"""
+        if len(group) == 1:
+            return self._postings.get(group[0], [])
+        doc_ids = set()
+        for term in group:
+            doc_ids.update(self._postings.get(term, ()))
+        return sorted(doc_ids)
+
+    def _candidates(self, query: str) -> Optional[List[int]]:
+        """根据倒排表求交得到候选文档；查询中没有可索引字符时返回 None"""
+        groups = self._plan(query)
+        if not groups:
+            return None
+
+        constraints = sorted((self._group_postings(group) for group in groups), key=len)
+        candidates = constraints[0]
+        for posting in constraints[1:]:
+            if not candidates:
+                break
+            candidates = [doc_id for doc_id in candidates if _contains(posting, doc_id)]
+        return candidates
+
+    def search(self, query: str) -> List[int]:
+        """返回字段文本（转小写后）包含 query 的文档编号，按编号升序"""
+        query = query.lower()
+        candidates = self._candidates(query)
+        if candidates is None:
+            candidates = range(self._size)
+
+        haystacks = self._haystacks
+        if haystacks is None:
+            candidates = list(candidates)
+            texts = self._text_loader(candidates) if candidates else []
+            return [doc_id for doc_id, text in zip(candidates, texts) if query in text.lower()]
+        return [doc_id for doc_id in candidates if query in haystacks[doc_id]]
+
+    def bm25_scores(self, query: str, doc_ids: Sequence[int]) -> List[float]:
+        """
+        计算指定文档在本字段上的 BM25 得分（与 doc_ids 一一对应）
+        只对命中的文档逐个二分查词频，开销与结果数量相关而与语料规模无关
+        """
+        scores = [0.0] * len(doc_ids)
+        total_docs = self._size
+        if not total_docs or not self._average_length:
+            return scores
+
+        terms = {term for group in self._plan(query.lower()) for term in group}
+        for term in terms:
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            frequencies = self._frequencies[term]
+            document_frequency = len(posting)
+            idf = math.log(1 + (total_docs - document_frequency + 0.5) / (document_frequency + 0.5))
+            for position, doc_id in enumerate(doc_ids):
+                index = bisect_left(posting, doc_id)
+                if index == len(posting) or posting[index] != doc_id:
+                    continue
+                frequency = frequencies[index]
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[doc_id] / self._average_length)
+                scores[position] += idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+        return scores
+
+
+def merge_doc_ids(*results: List[int]) -> List[int]:
+    """合并多个字段的检索结果（去重并保持升序）"""
+    non_empty = [result for result in results if result]
+    if len(non_empty) == 1:
+        return non_empty[0]
+    merged = set()
+    for result in non_empty:
+        merged.update(result)
+    return sorted(merged)
@@ -0,0 +1,499 @@
+# Copyright (c) 2025 XBXyftx
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+多工作进程共享的缓存快照文件
+uvicorn 以多个工作进程运行时，由抢到文件锁的一个进程（owner）负责爬取并维护缓存，
+每次缓存发布新代数后把快照写入临时文件再原子改名；其余只读进程（reader）定时检查文件，
+变化时 mmap 映射新文件，载入文章元数据，正文直接从映射中按需读取（多个进程共享同一份页缓存）。
+
+文件格式：MAGIC(8字节) | 正文数据区 | 头部 JSON | 头部长度(8字节小端)
+头部放在末尾，导出时正文边写边记录位置，只需顺序写一遍；
+头部包含新闻/轮播图缓存状态、文章元数据记录，以及正文在数据区中的位置 [内容摘要, 偏移, 长度]
+
+爬取、刷新、清空缓存等写操作只能在 owner 中执行：reader 收到这类请求时在请求目录中写入一个请求文件，
+owner 的后台线程定时取走并执行，执行结果随下一次导出的快照回到各个 reader
+"""
+
+import asyncio
+import json
+import mmap
+import os
+import struct
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+from core.config import settings
+from core.blob_store import BlobStore
+from core.http_cache import get_boot_id
+
+# 文件锁只在 POSIX 系统上可用，不可用时只能以单进程运行
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"NIOHSNP1"
+_LENGTH_FORMAT = "<Q"
+_LENGTH_SIZE = struct.calcsize(_LENGTH_FORMAT)
+
+# 缓存连续写入（如首次加载分批写入）时，等待片刻合并为一次导出
+_EXPORT_DEBOUNCE = 0.5
+
+
+class SnapshotRole:
+    """当前进程在共享快照中的角色"""
+    STANDALONE = "standalone"  # 单进程：不读写共享快照
+    OWNER = "owner"            # 负责爬取并导出快照
+    READER = "reader"          # 只读：载入 owner 导出的快照
+
+
+_role = SnapshotRole.STANDALONE
+_lock_file = None  # owner 持有的锁文件，进程退出时锁自动释放
+_exporter: Optional["SnapshotExporter"] = None
+_follower: Optional["SnapshotFollower"] = None
+_request_poller: Optional["OwnerRequestPoller"] = None
+
+# 可以交给 owner 执行的写操作：名称 -> 处理函数（协程函数，参数为请求中的 params），由接口模块注册
+_owner_actions: Dict[str, Callable[..., Awaitable[Any]]] = {}
+
+
+def write_snapshot_file(path: str, header: Dict[str, Any], blobs: Iterable[Tuple[str, bytes]]) -> int:
+    """
+    写入快照文件：先写同目录下的临时文件并 fsync，再原子改名覆盖
+    blobs 为 (内容摘要, 正文字节串)，相同摘要只写一次；返回写入的字节数
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as output:
+            output.write(SNAPSHOT_MAGIC)
+            locations = []
+            offset = len(SNAPSHOT_MAGIC)
+            seen = set()
+            for key, raw in blobs:
+                if key in seen:
+                    continue
+                seen.add(key)
+                output.write(raw)
+                locations.append((key, offset, len(raw)))
+                offset += len(raw)
+            
+            header_bytes = json.dumps(dict(header, blobs=locations), ensure_ascii=False,
+                                      separators=(",", ":"), default=str).encode("utf-8")
+            output.write(header_bytes)
+            output.write(struct.pack(_LENGTH_FORMAT, len(header_bytes)))
+            output.flush()
+            os.fsync(output.fileno())
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return offset + len(header_bytes) + _LENGTH_SIZE
+
+
+class MappedSnapshot:
+    """
+    以只读 mmap 映射的快照文件
+    文件被新快照改名覆盖后，已建立的映射仍指向旧文件内容，最后一个引用释放时才解除映射
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as snapshot_file:
+            stat = os.fstat(snapshot_file.fileno())
+            self.identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            self._mmap = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError(f"不是有效的快照文件: {path}")
+        header_end = len(self._mmap) - _LENGTH_SIZE
+        (header_length,) = struct.unpack_from(_LENGTH_FORMAT, self._mmap, header_end)
+        self.header: Dict[str, Any] = json.loads(self._mmap[header_end - header_length:header_end])
+        self._blobs = {key: (offset, length) for key, offset, length in self.header.pop("blobs")}
+
+    @property
+    def size(self) -> int:
+        return len(self._mmap)
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """读取一篇正文（只复制这一段，其余内容留在页缓存中）"""
+        location = self._blobs.get(key)
+        if location is None:
+            return None
+        offset, length = location
+        return self._mmap[offset:offset + length]
+
+
+class MmapBlobStore(BlobStore):
+    """
+    只读进程的正文存储：从映射的快照文件中读取
+    缓存为每个载入的快照各建一个只引用该映射的实例，映射随使用它的快照一起存活，
+    仍在使用旧快照的请求无论之后切换了多少次都能读到旧正文
+    """
+
+    def __init__(self, snapshot: Optional[MappedSnapshot] = None):
+        self._current = snapshot
+
+    def swap(self, snapshot: MappedSnapshot):
+        """切换到新映射的快照（旧映射由仍引用它的快照保持）"""
+        self._current = snapshot
+
+    def put_many(self, items: Iterable[Tuple[str, bytes]]):
+        raise NotImplementedError("只读进程不写入正文，正文由负责爬取的进程导出")
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, bytes]:
+        snapshot = self._current
+        result: Dict[str, bytes] = {}
+        if snapshot is None:
+            return result
+        for key in keys:
+            raw = snapshot.get(key)
+            if raw is not None:
+                result[key] = raw
+        return result
+
+    def delete_many(self, keys: Iterable[str]):
+        """映射只读，旧正文随旧映射一起释放"""
+
+    def clear(self):
+        """映射只读，旧正文随旧映射一起释放"""
+
+    def get_stats(self) -> Dict[str, int]:
+        current = self._current
+        return {"count": len(current) if current else 0, "bytes": current.size if current else 0}
+
+
+class SnapshotExporter:
+    """owner 进程的后台导出线程：收到通知后合并短时间内的多次写入，导出一次快照"""
+
+    def __init__(self, path: str, news_cache, banner_cache):
+        self._path = path
+        self._news_cache = news_cache
+        self._banner_cache = banner_cache
+        self._pending = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self.exports = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="SnapshotExporter", daemon=True)
+        self._thread.start()
+        self.request()  # 启动时先导出一次（空缓存），只读进程不会继续使用上次运行留下的文件
+
+    def stop(self):
+        self._stopping = True
+        self._pending.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def request(self):
+        """请求导出（任意线程均可调用，立即返回）"""
+        self._pending.set()
+
+    def _run(self):
+        while True:
+            self._pending.wait()
+            if self._stopping:
+                return
+            time.sleep(_EXPORT_DEBOUNCE)
+            self._pending.clear()
+            try:
+                self.export()
+            except Exception as e:
+                logger.error(f"❌ [共享快照] 导出失败: {e}", exc_info=True)
+
+    def export(self) -> int:
+        """导出当前缓存状态，返回写入的字节数"""
+        started = time.perf_counter()
+        news_state, blobs = self._news_cache.to_shared_state()
+        header = {
+            "boot_id": get_boot_id(),
+            "written_at": datetime.now().isoformat(),
+            "news": news_state,
+            "banner": self._banner_cache.to_shared_state()
+        }
+        size = write_snapshot_file(self._path, header, blobs)
+        self.exports += 1
+        logger.info(f"📤 [共享快照] 导出第 {news_state['generation']} 代，{len(news_state['articles'])} 篇文章，"
+                    f"{size} 字节，耗时 {(time.perf_counter() - started) * 1000:.1f} ms")
+        return size
+
+
+class SnapshotFollower:
+    """只读进程的后台线程：定时检查快照文件，变化时映射并载入"""
+
+    def __init__(self, path: str, news_cache, banner_cache, poll_interval: float = 1.0):
+        self._path = path
+        self._news_cache = news_cache
+        self._banner_cache = banner_cache
+        self._poll_interval = poll_interval
+        self._identity = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.loads = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="SnapshotFollower", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        while True:
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"❌ [共享快照] 载入失败: {e}", exc_info=True)
+            if self._stopped.wait(self._poll_interval):
+                return
+
+    def poll(self) -> bool:
+        """检查快照文件，有新快照时载入并返回 True"""
+        try:
+            stat = os.stat(self._path)
+        except FileNotFoundError:
+            return False
+        if (stat.st_ino, stat.st_mtime_ns, stat.st_size) == self._identity:
+            return False
+
+        snapshot = MappedSnapshot(self._path)
+        self._identity = snapshot.identity
+        if snapshot.header.get("boot_id") != get_boot_id():
+            # 上次运行留下的文件，等待本次的 owner 导出
+            logger.info("⏳ [共享快照] 快照文件来自上一次运行，等待新的快照")
+            return False
+
+        self._news_cache.load_shared_state(snapshot.header["news"], snapshot)
+        self._banner_cache.load_shared_state(snapshot.header["banner"])
+        self.loads += 1
+        logger.info(f"📥 [共享快照] 载入第 {snapshot.header['news']['generation']} 代，"
+                    f"{len(snapshot.header['news']['articles'])} 篇文章")
+        return True
+
+
+def _requests_dir(path: str) -> str:
+    """快照文件旁存放写操作请求文件的目录"""
+    return f"{path}.requests"
+
+
+def write_owner_request(path: str, action: str, params: Dict[str, Any]) -> str:
+    """
+    写入一个交给 owner 执行的请求文件（先写临时文件再原子改名），返回请求文件路径
+    文件名由操作名称与参数组成，owner 取走之前重复提交的同一请求只保留一份
+    """
+    directory = _requests_dir(path)
+    os.makedirs(directory, exist_ok=True)
+    name = "-".join([action] + [str(value) for _, value in sorted(params.items())])
+    request_path = os.path.join(directory, f"{name}.json")
+    temp_path = f"{request_path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as output:
+        json.dump({"boot_id": get_boot_id(), "action": action, "params": params,
+                   "requested_at": datetime.now().isoformat(), "pid": os.getpid()}, output, ensure_ascii=False)
+    os.replace(temp_path, request_path)
+    return request_path
+
+
+class OwnerRequestPoller:
+    """owner 进程的后台线程：定时取走 reader 写入的请求文件，交给已注册的处理函数执行"""
+
+    def __init__(self, path: str, poll_interval: float = 1.0, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self._directory = _requests_dir(path)
+        self._poll_interval = poll_interval
+        self._loop = loop  # 处理函数在该事件循环中执行；没有事件循环时（离线脚本、测试）在本线程中执行
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.handled = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="OwnerRequestPoller", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        while not self._stopped.wait(self._poll_interval):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"❌ [共享快照] 处理写操作请求失败: {e}", exc_info=True)
+
+    def poll(self) -> int:
+        """取走并执行当前所有请求文件，返回执行的请求数；上一次运行留下的请求直接丢弃"""
+        try:
+            names = sorted(name for name in os.listdir(self._directory) if name.endswith(".json"))
+        except FileNotFoundError:
+            return 0
+        handled = 0
+        for name in names:
+            request_path = os.path.join(self._directory, name)
+            try:
+                with open(request_path, "r", encoding="utf-8") as request_file:
+                    request = json.load(request_file)
+                os.remove(request_path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ [共享快照] 无法读取写操作请求 {name}: {e}")
+                continue
+            if request.get("boot_id") != get_boot_id():
+                logger.info(f"⏭️ [共享快照] 丢弃上一次运行留下的写操作请求: {request.get('action')}")
+                continue
+            handler = _owner_actions.get(request.get("action"))
+            if handler is None:
+                logger.warning(f"⚠️ [共享快照] 未知的写操作请求: {request.get('action')}")
+                continue
+            logger.info(f"📨 [共享快照] 执行工作进程 {request.get('pid')} 转交的写操作: "
+                        f"{request['action']} {request['params']}")
+            self._execute(handler(**request["params"]), request["action"])
+            handled += 1
+        self.handled += handled
+        return handled
+
+    def _execute(self, coroutine: Awaitable[Any], action: str):
+        """在事件循环中执行处理函数（不等待完成），失败时记录日志"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            asyncio.run(coroutine)
+            return
+        future = asyncio.run_coroutine_threadsafe(coroutine, loop)
+
+        def report(done):
+            if not done.cancelled() and done.exception() is not None:
+                logger.error(f"❌ [共享快照] 写操作 {action} 执行失败: {done.exception()}")
+
+        future.add_done_callback(report)
+
+
+def register_owner_action(action: str, handler: Callable[..., Awaitable[Any]]):
+    """注册可以交给 owner 执行的写操作（接口模块导入时调用）"""
+    _owner_actions[action] = handler
+
+
+def forward_to_owner(action: str, **params) -> bool:
+    """
+    写操作的角色检查：只读进程不在本进程执行（它的缓存副本不会被导出，写入后缓存代数还会与 owner 冲突），
+    而是写入请求文件交给 owner 执行并返回 True，调用方随即返回 202；其余角色返回 False，由调用方直接执行
+    """
+    if not is_snapshot_reader():
+        return False
+    write_owner_request(settings.shared_snapshot_path, action, params)
+    logger.info(f"📮 [共享快照] 写操作 {action} {params} 已转交负责爬取的工作进程")
+    return True
+
+
+def init_snapshot_role() -> str:
+    """
+    确定当前进程的角色（需在创建缓存之前调用）
+    单进程运行时为 standalone；多进程时抢到锁文件的进程为 owner，其余为 reader
+    """
+    global _role, _lock_file
+    if settings.workers <= 1:
+        _role = SnapshotRole.STANDALONE
+        return _role
+    if not FCNTL_AVAILABLE:
+        logger.warning("⚠️ 当前系统不支持文件锁，无法共享缓存快照，按单进程方式运行")
+        _role = SnapshotRole.STANDALONE
+        return _role
+
+    lock_path = f"{settings.shared_snapshot_path}.lock"
+    os.makedirs(os.path.dirname(os.path.abspath(lock_path)), exist_ok=True)
+    lock_file = open(lock_path, "a")
+    try:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        _role = SnapshotRole.READER
+    else:
+        _lock_file = lock_file
+        _role = SnapshotRole.OWNER
+    logger.info(f"🧩 [共享快照] 工作进程 {os.getpid()} 角色: {_role}")
+    return _role
+
+
+def get_snapshot_role() -> str:
+    """当前进程的角色"""
+    return _role
+
+
+def is_snapshot_reader() -> bool:
+    """当前进程是否为只读进程（不爬取，只载入共享快照）"""
+    return _role == SnapshotRole.READER
+
+
+
+def start_shared_snapshot(news_cache, banner_cache):
+    """
+    按角色启动导出线程与写操作请求线程，或跟随线程（standalone 时什么也不做）
+    需在事件循环中调用：owner 转交来的写操作在该事件循环中执行
+    """
+    global _exporter, _follower, _request_poller
+    if _role == SnapshotRole.OWNER:
+        _resume_generations(news_cache, banner_cache)
+        _exporter = SnapshotExporter(settings.shared_snapshot_path, news_cache, banner_cache)
+        _exporter.start()
+        _request_poller = OwnerRequestPoller(settings.shared_snapshot_path, settings.shared_snapshot_poll_interval,
+                                             asyncio.get_running_loop())
+        _request_poller.start()
+    elif _role == SnapshotRole.READER:
+        _follower = SnapshotFollower(settings.shared_snapshot_path, news_cache, banner_cache,
+                                     settings.shared_snapshot_poll_interval)
+        _follower.start()
+
+
+def _resume_generations(news_cache, banner_cache):
+    """
+    owner 进程被重启时（同一次运行），缓存代数接着上一个 owner 导出的快照继续递增，
+    避免新旧数据使用相同的代数（ETag 误匹配）；中间跳过一代，增量同步的客户端会收到 resync
+    """
+    try:
+        previous = MappedSnapshot(settings.shared_snapshot_path)
+    except (FileNotFoundError, ValueError):
+        return
+    if previous.header.get("boot_id") != get_boot_id():
+        return
+    news_cache.resume_generation(previous.header["news"]["generation"])
+    banner_cache.resume_generation(previous.header["banner"]["generation"])
+    logger.info(f"🔁 [共享快照] 接续上一个 owner 的缓存代数: {previous.header['news']['generation']}")
+
+
+def stop_shared_snapshot():
+    """停止后台线程"""
+    global _exporter, _follower, _request_poller
+    if _request_poller is not None:
+        _request_poller.stop()
+        _request_poller = None
+    if _exporter is not None:
+        _exporter.stop()
+        _exporter = None
+    if _follower is not None:
+        _follower.stop()
+        _follower = None
+
+
+def notify_snapshot_changed():
+    """缓存发布了新代数（只有 owner 会导出，其余角色忽略）"""
+    exporter = _exporter
+    if exporter is not None:
+        exporter.request()
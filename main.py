@@ -22,10 +22,14 @@ from core.config import settings
 from core.logging_config import setup_logging
 from core.database import init_database
 from core.scheduler import start_scheduler, stop_scheduler, get_scheduler
-from core.cache import init_cache, get_news_cache
+from core.cache import init_cache, get_news_cache, get_banner_cache
+from core.events import get_event_broadcaster
+from core.shared_snapshot import (
+    init_snapshot_role, is_snapshot_reader, start_shared_snapshot, stop_shared_snapshot
+)
 
 # 导入API路由
-from api import news, banner
+from api import news, banner, events
 
 # 设置日志
 setup_logging()
@@ -76,6 +80,7 @@ async def global_exception_handler(request: Request, exc: Exception):
 # 注册路由
 app.include_router(news.router)
 app.include_router(banner.router)
+app.include_router(events.router)
 
 # 根路径
 @app.get("/")
@@ -156,7 +161,8 @@ async def api_health_check():
                 "banner_images": "/api/banner/",
                 "download_banners": "/api/banner/download",
                 "banner_urls": "/api/banner/urls",
-                "banner_status": "/api/banner/status"
+                "banner_status": "/api/banner/status",
+                "events": "/api/events/"
             }
         }
     except Exception as e:
@@ -173,6 +179,9 @@ async def api_health_check():
 async def startup_event():
     logger.info("应用启动中...")
     
+    # 绑定事件广播：此后缓存在任意线程中写入都会推送给 SSE 订阅者
+    get_event_broadcaster().bind_loop(asyncio.get_running_loop())
+    
     # 初始化数据库
     try:
         init_database()
@@ -181,14 +190,22 @@ async def startup_event():
         logger.error(f"数据库初始化失败: {e}")
         raise
     
+    # 确定工作进程角色（需在创建缓存之前）：多进程时只有一个进程爬取，其余进程载入共享快照
+    role = init_snapshot_role()
+    
     # 初始化缓存
     try:
         init_cache()
+        start_shared_snapshot(get_news_cache(), get_banner_cache())
         logger.info("缓存初始化完成")
     except Exception as e:
         logger.error(f"缓存初始化失败: {e}")
         raise
     
+    if is_snapshot_reader():
+        logger.info(f"应用启动完成（只读工作进程，角色: {role}）")
+        return
+    
     # 启动定时任务调度器
     if settings.enable_scheduler:
         try:
@@ -214,8 +231,12 @@ async def startup_event():
 async def shutdown_event():
     logger.info("应用关闭中...")
     
-    # 停止定时任务调度器
-    if settings.enable_scheduler:
+    # 结束所有事件流连接
+    await get_event_broadcaster().close()
+    stop_shared_snapshot()
+    
+    # 停止定时任务调度器（只读工作进程没有启动调度器）
+    if settings.enable_scheduler and not is_snapshot_reader():
         try:
             stop_scheduler()
             logger.info("定时任务调度器已停止")
@@ -25,5 +25,6 @@ class BannerResponse(BaseModel):
     success: bool = Field(..., description="是否成功")
     images: List[str] = Field(default=[], description="图片URL列表")
     total: int = Field(0, description="图片总数")
+    dropped: int = Field(0, description="因超出缓存内存预算未缓存的图片数")
     message: str = Field(..., description="响应消息")
     timestamp: str = Field(default_factory=lambda: datetime.now().isoformat(), description="响应时间")
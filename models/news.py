@@ -12,7 +12,7 @@
 # limitations under the License.
 
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 from datetime import datetime
 from enum import Enum
 
@@ -22,6 +22,22 @@ class ContentType(str, Enum):
     VIDEO = "video"
     CODE = "code"
 
+class SearchScope(str, Enum):
+    TITLE = "title"      # 标题 + 摘要（默认）
+    CONTENT = "content"  # 标题 + 摘要 + 正文（文本/代码块）
+
+class NewsSort(str, Enum):
+    DATE = "date"            # 按日期由近到远（默认）
+    RELEVANCE = "relevance"  # 按搜索相关度（BM25），仅在有搜索关键词时生效
+
+class NewsView(str, Enum):
+    FULL = "full"        # 完整文章（含正文内容块，默认）
+    SUMMARY = "summary"  # 列表视图：只含元数据、封面图和摘录
+
+class NewsFormat(str, Enum):
+    JSON = "json"      # 单个 JSON 响应（默认）
+    NDJSON = "ndjson"  # 流式导出：每行一篇文章的 JSON
+
 class NewsContentBlock(BaseModel):
     type: ContentType
     value: str
@@ -45,6 +61,53 @@ class NewsResponse(BaseModel):
     page_size: int
     has_next: bool = Field(False, description="是否有下一页")
     has_prev: bool = Field(False, description="是否有上一页")
+    next_cursor: Optional[str] = Field(None, description="下一页游标（按日期排序时提供）")
+
+class NewsArticleSummary(BaseModel):
+    """文章列表的精简记录：不含正文内容块，详情通过文章ID获取"""
+    id: Optional[str] = None
+    title: str
+    date: str
+    url: str
+    category: Optional[str] = None
+    summary: Optional[str] = None
+    source: Optional[str] = None
+    cover_image: Optional[str] = Field(None, description="封面图URL（正文中的第一张图片）")
+    excerpt: str = Field(..., description="摘录：优先使用摘要，否则取正文开头")
+
+class NewsSummaryResponse(BaseModel):
+    articles: List[NewsArticleSummary]
+    total: int
+    page: int
+    page_size: int
+    has_next: bool = Field(False, description="是否有下一页")
+    has_prev: bool = Field(False, description="是否有上一页")
+    next_cursor: Optional[str] = Field(None, description="下一页游标（按日期排序时提供）")
+
+class NewsFacets(BaseModel):
+    """筛选项计数：各分类、来源、年月的文章数量"""
+    total: int
+    categories: Dict[str, int] = Field(default_factory=dict, description="分类 -> 文章数")
+    sources: Dict[str, int] = Field(default_factory=dict, description="来源 -> 文章数")
+    months: Dict[str, int] = Field(default_factory=dict, description="年月（YYYY-MM，由近到远） -> 文章数")
+
+class NewsChangeSet(BaseModel):
+    """一次缓存写入的变更集合（均为文章URL）"""
+    generation: int = Field(..., description="写入后的缓存代数")
+    timestamp: str = Field(..., description="写入时间（ISO格式）")
+    added: List[str] = Field(default_factory=list, description="新增文章")
+    changed: List[str] = Field(default_factory=list, description="内容有变化的文章")
+    removed: List[str] = Field(default_factory=list, description="被移除的文章")
+
+class NewsChangesResponse(BaseModel):
+    """增量同步：某个缓存代数之后的文章变更（同一篇文章只给出最终状态）"""
+    generation: int = Field(..., description="本次结果对应的缓存代数，下次同步时作为 since 传入")
+    since: int = Field(..., description="请求的起始缓存代数")
+    epoch: Optional[str] = Field(None, description="服务进程标识，下次同步时原样传回；变化说明服务已重启")
+    resync: bool = Field(False, description="变更日志已截断或代数不连续，客户端需要重新全量同步")
+    added: List[Union[NewsArticle, NewsArticleSummary]] = Field(default_factory=list, description="新增文章")
+    changed: List[Union[NewsArticle, NewsArticleSummary]] = Field(default_factory=list, description="内容有变化的文章")
+    removed: List[str] = Field(default_factory=list, description="被移除文章的URL")
 
 class SearchRequest(BaseModel):
     keyword: str
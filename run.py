@@ -17,6 +17,7 @@ NowInOpenHarmony 后端服务启动脚本
 
 import uvicorn
 import os
+import secrets
 import sys
 import socket
 import subprocess
@@ -29,6 +30,7 @@ sys.path.insert(0, str(project_root))
 
 from core.config import settings
 from core.logging_config import setup_logging
+from core.shared_snapshot import FCNTL_AVAILABLE
 
 def get_local_ip_addresses():
     """
@@ -217,6 +219,16 @@ def main():
     host = os.getenv("HOST", "0.0.0.0")
     port = int(os.getenv("PORT", "8001"))
     reload = os.getenv("RELOAD", "false").lower() == "true" or settings.debug
+    workers = max(1, settings.workers)
+    if workers > 1 and reload:
+        print("⚠️  热重载模式不支持多进程，按单进程运行")
+        workers = 1
+    if workers > 1 and not FCNTL_AVAILABLE:
+        print("⚠️  当前系统不支持文件锁，无法共享缓存快照，按单进程运行")
+        workers = 1
+    if workers > 1:
+        # 各工作进程使用同一个启动标识，ETag 与增量同步的 epoch 在进程间一致
+        os.environ.setdefault("APP_BOOT_ID", secrets.token_hex(4))
     
     # 显示启动信息和所有可访问的IP地址
     print_startup_info(host, port)
@@ -225,6 +237,7 @@ def main():
     print(f"  绑定地址: {host}")
     print(f"  端口: {port}")
     print(f"  调试模式: {reload}")
+    print(f"  工作进程数: {workers}" + ("（一个进程负责爬取，其余进程共享其缓存快照）" if workers > 1 else ""))
     print(f"  日志级别: {settings.log_level}")
     print("=" * 60)
     
@@ -234,6 +247,7 @@ def main():
         host=host,
         port=port,
         reload=reload,
+        workers=workers,
         log_level=settings.log_level.lower(),
         access_log=True
     )
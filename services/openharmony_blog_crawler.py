@@ -22,6 +22,8 @@ from urllib.parse import urljoin
 from datetime import datetime
 from typing import List, Dict, Optional, Callable
 
+from core.date_utils import normalize_date, normalize_dates
+
 logger = logging.getLogger(__name__)
 
 class OpenHarmonyBlogCrawler:
@@ -92,10 +94,11 @@ class OpenHarmonyBlogCrawler:
                     logger.info(f"📋 [OpenHarmony博客] 第 {page_num} 页无数据，停止获取")
                     break
                 
-                # 处理文章数据
-                for article in articles:
+                # 处理文章数据（整页日期一次性标准化）
+                page_dates = normalize_dates(article.get("startTime", "") for article in articles)
+                for article, formatted_date in zip(articles, page_dates):
                     try:
-                        article_info = self._extract_article_info(article)
+                        article_info = self._extract_article_info(article, formatted_date)
                         if article_info:
                             all_articles.append(article_info)
                     except Exception as e:
@@ -114,7 +117,8 @@ class OpenHarmonyBlogCrawler:
         logger.info(f"✅ [OpenHarmony博客] 共获取到 {len(all_articles)} 篇有效文章信息")
         return all_articles
 
-    def _extract_article_info(self, article_data: Dict) -> Optional[Dict]:
+    def _extract_article_info(self, article_data: Dict,
+                              formatted_date: Optional[str] = None) -> Optional[Dict]:
         """从API响应中提取文章信息"""
         try:
             # 提取基本信息
@@ -128,8 +132,8 @@ class OpenHarmonyBlogCrawler:
                 logger.warning(f"⚠️ [OpenHarmony博客] 文章缺少必要字段: title={title}, url={url}")
                 return None
             
-            # 处理日期格式
-            formatted_date = self._format_date(start_time)
+            # 处理日期格式（调用方已批量标准化时直接使用）
+            formatted_date = formatted_date or self._format_date(start_time)
             
             return {
                 "title": title,
@@ -143,27 +147,10 @@ class OpenHarmonyBlogCrawler:
             return None
 
     def _format_date(self, date_str: str) -> str:
-        """格式化日期字符串"""
-        try:
-            if not date_str:
-                return datetime.now().strftime('%Y-%m-%d')
-            
-            # 处理常见的日期格式
-            if '.' in date_str:
-                # 格式: 2024.06.06
-                date_str = date_str.replace('.', '-')
-            
-            # 尝试解析日期
-            try:
-                parsed_date = datetime.strptime(date_str, '%Y-%m-%d')
-                return parsed_date.strftime('%Y-%m-%d')
-            except ValueError:
-                # 如果解析失败，返回原始字符串
-                return date_str
-                
-        except Exception as e:
-            logger.warning(f"⚠️ [OpenHarmony博客] 日期格式化失败: {date_str}, 错误: {e}")
+        """格式化日期字符串：没有日期时使用当天，无法解析时返回原始字符串"""
+        if not date_str:
             return datetime.now().strftime('%Y-%m-%d')
+        return normalize_date(date_str)
 
     def parse_article_content(self, article_url: str) -> List[Dict]:
         """
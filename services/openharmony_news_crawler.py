@@ -19,6 +19,8 @@ import time
 from urllib.parse import urljoin
 from datetime import datetime
 
+from core.date_utils import normalize_date, normalize_dates
+
 class OpenHarmonyNewsCrawler:
     def __init__(self):
         self.base_url = "https://old.openharmony.cn"
@@ -68,13 +70,11 @@ class OpenHarmonyNewsCrawler:
 
             # 处理本页数据
             page_count = 0
-            for item in data:
+            # 整页日期一次性标准化（同一页中重复的日期只解析一次）
+            standardized_dates = normalize_dates(item.get("startTime", "") for item in data)
+            for item, standardized_date in zip(data, standardized_dates):
                 url = item.get("url")
                 title = item.get("title", "")
-                date = item.get("startTime", "")
-
-                # 标准化日期格式
-                standardized_date = self._standardize_date(date)
 
                 if url and url not in all_infos:
                     all_infos[url] = {"title": title, "date": standardized_date}
@@ -167,34 +167,8 @@ class OpenHarmonyNewsCrawler:
         return result_data
 
     def _standardize_date(self, date_str):
-        """标准化日期格式，将多种日期格式统一为YYYY-MM-DD格式"""
-        if not date_str:
-            return ''
-
-        try:
-            # 匹配多种日期格式：2025.9.13, 2025-9-13, 2025/9/13, 2025年9月13日
-            date_pattern = r'(\d{4})[.\-\/年](\d{1,2})[.\-\/月](\d{1,2})[日]?'
-            match = re.search(date_pattern, str(date_str))
-
-            if match:
-                year, month, day = match.groups()
-                # 格式化为统一的YYYY-MM-DD格式
-                return f"{year}-{int(month):02d}-{int(day):02d}"
-            else:
-                # 尝试直接解析日期字符串
-                # 处理只有年月的情况
-                month_pattern = r'(\d{4})[.\-\/年](\d{1,2})[月]?'
-                month_match = re.search(month_pattern, str(date_str))
-                if month_match:
-                    year, month = month_match.groups()
-                    return f"{year}-{int(month):02d}-01"  # 默认设置为当月第一天
-
-                # 如果都无法匹配，返回原始字符串并记录日志
-                print(f"⚠️ 无法解析日期格式: {date_str}，保持原样")
-                return date_str
-        except Exception as e:
-            print(f"❌ 日期标准化失败: {date_str}, 错误: {e}")
-            return date_str
+        """标准化日期格式，将多种日期格式统一为YYYY-MM-DD格式（无法解析时保持原样）"""
+        return normalize_date(str(date_str) if date_str else '')
 
     def _format_article(self, article):
         """将文章格式化为统一的新闻格式"""
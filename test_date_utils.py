@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+统一日期解析器（core.date_utils）离线测试
+"""
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+import core.date_utils as date_utils
+from core.date_utils import parse_date, normalize_date, normalize_dates, parse_dates
+
+
+def test_parse_supported_formats():
+    """各爬虫和缓存此前分别支持的格式都由同一个解析器处理"""
+    expected = date(2024, 8, 31)
+    for text in ["2024-08-31", "2024.8.31", "2024/08/31", "2024年08月31日", "2024年8月31",
+                 "2024-08-31 10:30:00", " 2024.08.31 ", "31-08-2024", "31.08.2024"]:
+        assert parse_date(text) == expected, text
+
+    assert parse_date("2025年9月") == date(2025, 9, 1)
+    assert parse_date("08-31") == date(datetime.now().year, 8, 31)
+
+
+def test_parse_invalid_dates():
+    """无效日期返回 None，完整日期无效时不退化为年月"""
+    for text in [None, "", "无效日期", "2024-02-30", "2024-13-01", "1800-01-01"]:
+        assert parse_date(text) is None, text
+
+
+def test_month_day_follows_current_year():
+    """月日格式按调用时的当前年份解析，记忆的结果不会把跨年后的文章留在上一年"""
+    class FakeDatetime(datetime):
+        year = 2024
+
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(cls.year, 12, 31, 23, 59)
+
+    original = date_utils.datetime
+    date_utils.datetime = FakeDatetime
+    try:
+        assert parse_date("08-31") == date(2024, 8, 31)
+        FakeDatetime.year = 2025
+        assert parse_date("08-31") == date(2025, 8, 31)
+        assert parse_date("02-29") is None  # 2025 年没有 2月29日
+        FakeDatetime.year = 2028
+        assert parse_date("02-29") == date(2028, 2, 29)
+        assert parse_date("13-01") is None
+    finally:
+        date_utils.datetime = original
+
+
+def test_normalize_keeps_unparseable_and_batches():
+    """标准化无法解析时保持原样；批量接口与逐个调用结果一致"""
+    assert normalize_date("2024.6.6") == "2024-06-06"
+    assert normalize_date("无效日期") == "无效日期"
+    assert normalize_date("") == ""
+
+    values = ["2024.6.6", "2024.6.6", None, "无效日期", "2023年1月2日"]
+    assert normalize_dates(values) == ["2024-06-06", "2024-06-06", "", "无效日期", "2023-01-02"]
+    assert parse_dates(values) == [date(2024, 6, 6), date(2024, 6, 6), None, None, date(2023, 1, 2)]
+
+
+if __name__ == "__main__":
+    test_parse_supported_formats()
+    test_parse_invalid_dates()
+    test_month_day_follows_current_year()
+    test_normalize_keeps_unparseable_and_batches()
+    print("[SUCCESS] 日期解析测试全部通过")
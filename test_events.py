@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+缓存更新事件广播（core.events）离线测试
+"""
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from core.events import EventBroadcaster, format_event_id, parse_event_id
+from core.http_cache import get_boot_id
+
+
+async def _collect(broadcaster: EventBroadcaster, count: int, last_event_id=None):
+    """收集前 count 个事件（跳过心跳）"""
+    events = []
+    async for event in broadcaster.subscribe(last_event_id):
+        if event is not None:
+            events.append(event)
+            if len(events) == count:
+                break
+    return events
+
+
+def test_thread_publish_fans_out_to_all_subscribers():
+    """爬虫线程发布的事件经事件循环一次唤醒所有订阅者，编号由启动标识与各类型的缓存代数组成"""
+    async def scenario():
+        broadcaster = EventBroadcaster(history_size=8, keepalive_interval=0)
+        broadcaster.bind_loop(asyncio.get_running_loop())
+        assert broadcaster.epoch == get_boot_id()
+        subscribers = [asyncio.ensure_future(_collect(broadcaster, 2)) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert broadcaster.get_stats()["subscribers"] == 3
+
+        def crawler():
+            broadcaster.publish("news", {"generation": 1})
+            broadcaster.publish("banner", {"generation": 1})
+        thread = threading.Thread(target=crawler)
+        thread.start()
+        thread.join()
+
+        results = await asyncio.wait_for(asyncio.gather(*subscribers), timeout=1)
+        epoch = broadcaster.epoch
+        for events in results:
+            assert [(event.id, event.event) for event in events] == [
+                (f"{epoch}-news.1", "news"), (f"{epoch}-banner.1-news.1", "banner")]
+        assert events[0].encode() == f'id: {epoch}-news.1\nevent: news\ndata: {{"generation":1}}\n\n'.encode()
+        assert broadcaster.get_stats()["last_event_id"] == f"{epoch}-banner.1-news.1"
+        await broadcaster.close()
+        assert broadcaster.get_stats()["subscribers"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_event_id_round_trip():
+    """事件编号按类型名称排序，解析结果与生成时一致，格式不对时返回 None"""
+    assert format_event_id("abcd", {"news": 12, "banner": 3}) == "abcd-banner.3-news.12"
+    assert parse_event_id("abcd-banner.3-news.12") == ("abcd", {"banner": 3, "news": 12})
+    assert parse_event_id("abcd") == ("abcd", {})
+    assert parse_event_id("abcd-3") is None
+    assert parse_event_id("abcd-news.x") is None
+
+
+def test_replay_after_last_event_id_and_heartbeat():
+    """按 Last-Event-ID 中的代数补发错过的事件；没有事件时心跳产出 None"""
+    async def scenario():
+        broadcaster = EventBroadcaster(history_size=8, keepalive_interval=0.01)
+        broadcaster.bind_loop(asyncio.get_running_loop())
+        for generation in range(1, 4):
+            broadcaster.publish("news", {"generation": generation})
+        broadcaster.publish("banner", {"generation": 1})
+        await asyncio.sleep(0)
+
+        epoch = broadcaster.epoch
+        replayed = await asyncio.wait_for(_collect(broadcaster, 3, last_event_id=f"{epoch}-news.1"), timeout=1)
+        assert [(event.event, event.generation) for event in replayed] == [("news", 2), ("news", 3), ("banner", 1)]
+
+        stream = broadcaster.subscribe()
+        assert await asyncio.wait_for(stream.__anext__(), timeout=1) is None
+        await stream.aclose()
+        await broadcaster.close()
+
+    asyncio.run(scenario())
+
+
+def test_resume_on_another_worker():
+    """各工作进程的编号只取决于代数：在一个进程收到的编号可以在另一个进程补发；客户端领先时等待本进程跟上"""
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        first = EventBroadcaster(history_size=8, keepalive_interval=0, epoch="boot")
+        second = EventBroadcaster(history_size=8, keepalive_interval=0, epoch="boot")
+        first.bind_loop(loop)
+        second.bind_loop(loop)
+        # 第二个进程稍晚载入共享快照，多收到一条轮播图事件
+        for broadcaster in (first, second):
+            for generation in range(1, 3):
+                broadcaster.publish("news", {"generation": generation})
+        second.publish("banner", {"generation": 5})
+        await asyncio.sleep(0)
+
+        last_event_id = (await asyncio.wait_for(_collect(first, 1, last_event_id="boot-news.1"), timeout=1))[0].id
+        assert last_event_id == "boot-news.2"
+        replayed = await asyncio.wait_for(_collect(second, 1, last_event_id=last_event_id), timeout=1)
+        assert [(event.event, event.generation) for event in replayed] == [("banner", 5)]
+
+        # 客户端的代数高于本进程：不要求全量同步，已收到的代数跳过
+        stream = first.subscribe("boot-banner.5-news.3")
+        first.publish("news", {"generation": 3})
+        first.publish("news", {"generation": 4})
+        live = await asyncio.wait_for(stream.__anext__(), timeout=1)
+        assert (live.event, live.generation) == ("news", 4)
+        await stream.aclose()
+        await first.close()
+        await second.close()
+
+    asyncio.run(scenario())
+
+
+def test_unknown_last_event_id_requests_resync():
+    """重启前的编号、格式不对或已滚出历史的编号不按编号补发，而是先推送 resync 再推送新事件"""
+    async def scenario():
+        broadcaster = EventBroadcaster(history_size=2, keepalive_interval=0)
+        broadcaster.bind_loop(asyncio.get_running_loop())
+        for generation in range(1, 5):
+            broadcaster.publish("news", {"generation": generation})
+        await asyncio.sleep(0)
+        epoch = broadcaster.epoch
+
+        generation = 10
+        for last_event_id, reason in (("deadbeef-news.3", "epoch"), ("3", "epoch"),
+                                      (f"{epoch}-3", "epoch"), (f"{epoch}-news.1", "expired")):
+            current_id = broadcaster.get_stats()["last_event_id"]
+            stream = broadcaster.subscribe(last_event_id)
+            resync = await asyncio.wait_for(stream.__anext__(), timeout=1)
+            assert (resync.event, resync.data["reason"], resync.id) == ("resync", reason, current_id)
+            generation += 1
+            broadcaster.publish("news", {"generation": generation})
+            live = await asyncio.wait_for(stream.__anext__(), timeout=1)
+            assert live.event == "news" and live.data == {"generation": generation}
+            await stream.aclose()
+
+        # 仍在历史范围内的编号照常补发
+        replayed = await asyncio.wait_for(_collect(broadcaster, 1, last_event_id=f"{epoch}-news.{generation - 1}"),
+                                          timeout=1)
+        assert replayed[0].id == f"{epoch}-news.{generation}"
+        await broadcaster.close()
+
+    asyncio.run(scenario())
+
+
+def test_publish_without_loop_is_dropped():
+    """离线脚本中没有事件循环时发布事件不会报错"""
+    broadcaster = EventBroadcaster()
+    broadcaster.publish("news", {"generation": 1})
+    assert broadcaster.get_stats()["dropped"] == 1
+
+
+if __name__ == "__main__":
+    test_thread_publish_fans_out_to_all_subscribers()
+    test_event_id_round_trip()
+    test_replay_after_last_event_id_and_heartbeat()
+    test_resume_on_another_worker()
+    test_unknown_last_event_id_requests_resync()
+    test_publish_without_loop_is_dropped()
+    print("[SUCCESS] 事件广播测试全部通过")
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+HTTP 缓存（core.http_cache）与条件请求接口离线测试，不依赖网络
+"""
+import gzip
+import sys
+import threading
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+import core.cache as cache_module
+import core.http_cache as http_cache
+from api import news, banner
+from core.cache import NewsCache, BannerCache
+from core.memory_budget import estimate_size
+from core.http_cache import (
+    build_etag, _etag_matches, is_not_modified, get_boot_id, choose_encoding, compress_body
+)
+from models.news import NewsArticle
+
+
+def make_request(**headers) -> Request:
+    """构造只带请求头的 Request（下划线写法转换为连字符）"""
+    raw_headers = [(name.replace("_", "-").encode("latin-1"), value.encode("latin-1"))
+                   for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw_headers})
+
+
+def make_client() -> TestClient:
+    """只挂载新闻与轮播图路由的测试应用（不启动调度器），缓存替换为带测试数据的新实例"""
+    cache_module._news_cache = NewsCache()
+    cache_module._news_cache.update_cache([
+        NewsArticle(id=f"article-{i}", title=f"测试文章 {i}", date=f"2024-01-{i + 1:02d}",
+                    url=f"https://example.com/article/{i}",
+                    content=[{"type": "text", "value": f"正文 {i}"}],
+                    category="官方动态", source="OpenHarmony")
+        for i in range(3)
+    ])
+    cache_module._banner_cache = BannerCache()
+    cache_module._banner_cache.update_cache([{"url": "https://example.com/banner.png"}])
+
+    app = FastAPI()
+    app.include_router(news.router)
+    app.include_router(banner.router)
+    return TestClient(app)
+
+
+def test_build_etag_depends_on_generation_and_params():
+    """ETag 含启动标识与缓存代数，参数顺序无关、值为 None 的参数忽略"""
+    etag = build_etag("news", 3, {"page": 1, "category": None, "search": "鸿蒙"})
+    assert etag.startswith(f'"news-{get_boot_id()}-3-') and etag.endswith('"')
+    assert etag == build_etag("news", 3, {"search": "鸿蒙", "page": 1})
+    assert etag != build_etag("news", 4, {"page": 1, "search": "鸿蒙"})
+    assert etag != build_etag("news", 3, {"page": 2, "search": "鸿蒙"})
+    assert etag != build_etag("facets", 3, {"page": 1, "search": "鸿蒙"})
+
+
+def test_etag_matching_weak_list_and_wildcard():
+    """If-None-Match 弱比较：忽略 W/ 前缀，支持逗号分隔的多个标签与 *"""
+    etag = '"news-abc-1-0123"'
+    assert _etag_matches(etag, etag)
+    assert _etag_matches(f"W/{etag}", etag)
+    assert _etag_matches(f'"other", W/{etag}', etag)
+    assert _etag_matches(" * ", etag)
+    assert not _etag_matches('"news-abc-2-0123"', etag)
+    assert not _etag_matches("news-abc-1-0123", etag)
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    """同时带有两个校验头时只比较 ETag；没有 If-None-Match 时才比较修改时间"""
+    etag = '"news-abc-1-0123"'
+    last_modified = "Mon, 01 Jan 2024 00:00:00 GMT"
+    later = "Tue, 02 Jan 2024 00:00:00 GMT"
+    earlier = "Sun, 31 Dec 2023 00:00:00 GMT"
+
+    assert is_not_modified(make_request(if_none_match=etag), etag, last_modified)
+    assert not is_not_modified(make_request(if_none_match='"stale"', if_modified_since=later),
+                               etag, last_modified)
+    assert is_not_modified(make_request(if_modified_since=later), etag, last_modified)
+    assert is_not_modified(make_request(if_modified_since=last_modified), etag, last_modified)
+    assert not is_not_modified(make_request(if_modified_since=earlier), etag, last_modified)
+    assert not is_not_modified(make_request(if_modified_since="not a date"), etag, last_modified)
+    assert not is_not_modified(make_request(if_modified_since=later), etag, None)
+    assert not is_not_modified(make_request(), etag, last_modified)
+
+
+def test_news_list_not_modified_until_cache_changes():
+    """新闻列表带上 ETag 再次请求得到 304；缓存写入新数据后 ETag 变化，返回 200"""
+    client = make_client()
+    first = client.get("/api/news/", params={"page_size": 2})
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+
+    cached = client.get("/api/news/", params={"page_size": 2}, headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.content == b""
+    assert cached.headers["etag"] == etag
+    other_page = client.get("/api/news/", params={"page_size": 1}, headers={"If-None-Match": etag})
+    assert other_page.status_code == 200
+
+    # NDJSON 导出的参数错误在开始发送流之前返回 400
+    invalid = client.get("/api/news/", params={"format": "ndjson", "start_date": "2024-02-01",
+                                               "end_date": "2024-01-01"})
+    assert invalid.status_code == 400
+
+    cache_module._news_cache.update_cache([
+        NewsArticle(id="article-9", title="新文章", date="2024-02-01", url="https://example.com/article/9",
+                    content=[{"type": "text", "value": "正文 9"}], category="官方动态", source="OpenHarmony")
+    ])
+    refreshed = client.get("/api/news/", params={"page_size": 2}, headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200 and refreshed.headers["etag"] != etag
+
+
+def test_banner_not_modified_until_cleared():
+    """轮播图带上 ETag 再次请求得到 304；清空缓存使已下发的 ETag 失效"""
+    client = make_client()
+    first = client.get("/api/banner/mobile")
+    assert first.status_code == 200
+    assert first.json()["images"] == ["https://example.com/banner.png"]
+    etag = first.headers["etag"]
+
+    cached = client.get("/api/banner/mobile", headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.headers["etag"] == etag
+
+    generation = cache_module._banner_cache.generation
+    cleared = client.delete("/api/banner/cache/clear")
+    assert cleared.json()["cleared_count"] == 1
+    assert cache_module._banner_cache.generation == generation + 1
+    assert cache_module._banner_cache.get_status()["status"] == "ready"
+
+    cache_module._banner_cache.update_cache([{"url": "https://example.com/banner.png"}])
+    refreshed = client.get("/api/banner/mobile", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200 and refreshed.headers["etag"] != etag
+
+
+def test_banner_memory_budget_drops_and_reports():
+    """轮播图超出内存预算时按展示顺序丢弃靠后的图片，内存统计与接口响应都报告丢弃数量"""
+    client = make_client()
+    banners = [{"url": f"https://example.com/banner-{i}.png"} for i in range(3)]
+    budget = estimate_size(banners[0]) + estimate_size(banners[1])
+    cache_module._banner_cache = BannerCache(memory_budget=budget)
+    cache_module._banner_cache.update_cache(banners)
+
+    memory = cache_module._banner_cache.get_cache_info()["memory"]
+    assert memory["limit_bytes"] == budget and memory["usage_bytes"] <= budget
+    assert memory["evictions"] == 1 and memory["evicted_items"] == 1
+    assert memory["evicted_bytes"] == estimate_size(banners[2])
+    assert cache_module._banner_cache.get_status()["dropped_count"] == 1
+
+    response = client.get("/api/banner/mobile").json()
+    assert response["images"] == [banner["url"] for banner in banners[:2]]
+    assert response["dropped"] == 1 and "另有 1 张未缓存" in response["message"]
+
+    # 预算以内的写入不再报告丢弃
+    cache_module._banner_cache.update_cache(banners[:1])
+    response = client.get("/api/banner/mobile").json()
+    assert response["dropped"] == 0 and "未缓存" not in response["message"]
+
+
+def test_news_served_while_update_cache_running():
+    """完整更新进行中旧快照依然有效：列表接口照常返回数据，而不是准备中的空列表"""
+    client = make_client()
+    cache = cache_module._news_cache
+    building = threading.Event()
+    release = threading.Event()
+    build_entries = cache._build_entries
+
+    def slow_build_entries(*args, **kwargs):
+        building.set()
+        release.wait(5)
+        return build_entries(*args, **kwargs)
+
+    cache._build_entries = slow_build_entries
+    articles = [NewsArticle(id=f"article-{i}", title=f"测试文章 {i}", date=f"2024-01-{i + 1:02d}",
+                            url=f"https://example.com/article/{i}",
+                            content=[{"type": "text", "value": f"正文 {i}"}],
+                            category="官方动态", source="OpenHarmony") for i in range(4)]
+    writer = threading.Thread(target=cache.update_cache, args=(articles,))
+    writer.start()
+    try:
+        assert building.wait(5)
+        assert cache.get_status()["is_updating"]
+        for path in ("/api/news/", "/api/news/openharmony"):
+            during = client.get(path, params={"search": "测试"})
+            assert during.status_code == 200 and during.json()["total"] == 3, path
+        assert client.get("/api/news/").json()["total"] == 3
+    finally:
+        release.set()
+        writer.join()
+    assert client.get("/api/news/").json()["total"] == 4
+    assert not cache.get_status()["is_updating"]
+
+
+def test_choose_encoding_quality_and_wildcard():
+    """优先 br 其次 gzip；q=0 表示明确拒绝，* 覆盖未列出的编码"""
+    assert choose_encoding(None) is None
+    assert choose_encoding("") is None
+    assert choose_encoding("identity") is None
+    assert choose_encoding("gzip") == "gzip"
+    assert choose_encoding("gzip, deflate, br") == "br"
+    assert choose_encoding("br;q=0, gzip") == "gzip"
+    assert choose_encoding("br;q=0, gzip;q=0") is None
+    assert choose_encoding("GZIP;Q=0.5") == "gzip"
+    assert choose_encoding("gzip;q=invalid") is None
+    assert choose_encoding("*") == "br"
+    assert choose_encoding("*, br;q=0") == "gzip"
+    assert choose_encoding("*;q=0, gzip") == "gzip"
+    assert choose_encoding("*;q=0") is None
+
+
+def test_choose_encoding_without_brotli():
+    """未安装 brotli 时即使客户端偏好 br 也只提供 gzip"""
+    original = http_cache.BROTLI_AVAILABLE
+    http_cache.BROTLI_AVAILABLE = False
+    try:
+        assert choose_encoding("br, gzip") == "gzip"
+        assert choose_encoding("br") is None
+        assert choose_encoding("*") == "gzip"
+    finally:
+        http_cache.BROTLI_AVAILABLE = original
+
+
+def test_compress_body_is_stable():
+    """同一内容的压缩结果字节一致（ETag 不随压缩时间变化），不支持的编码报错"""
+    body = b'{"articles": []}' * 100
+    assert compress_body(body, "gzip") == compress_body(body, "gzip")
+    assert gzip.decompress(compress_body(body, "gzip")) == body
+    if http_cache.BROTLI_AVAILABLE:
+        import brotli
+        assert brotli.decompress(compress_body(body, "br")) == body
+    try:
+        compress_body(body, "deflate")
+        assert False, "不支持的编码应当报错"
+    except ValueError:
+        pass
+
+
+def test_prerendered_page_sends_encoding_headers():
+    """预渲染页面按 Accept-Encoding 返回预压缩版本，带 Content-Encoding、Vary 与按编码区分的 ETag"""
+    client = make_client()
+    plain = client.get("/api/news/", headers={"Accept-Encoding": "identity"})
+    assert plain.status_code == 200
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["vary"] == "Accept-Encoding"
+
+    compressed = client.get("/api/news/", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["vary"] == "Accept-Encoding"
+    assert compressed.headers["etag"] != plain.headers["etag"]
+    assert compressed.json() == plain.json()
+
+    # 不同编码的 ETag 互不匹配，gzip 的 ETag 不能让只接受原文的客户端得到 304
+    revalidated = client.get("/api/news/", headers={"Accept-Encoding": "gzip",
+                                                    "If-None-Match": compressed.headers["etag"]})
+    assert revalidated.status_code == 304
+    mismatched = client.get("/api/news/", headers={"Accept-Encoding": "identity",
+                                                   "If-None-Match": compressed.headers["etag"]})
+    assert mismatched.status_code == 200
+
+
+if __name__ == "__main__":
+    test_build_etag_depends_on_generation_and_params()
+    test_etag_matching_weak_list_and_wildcard()
+    test_if_none_match_takes_precedence_over_if_modified_since()
+    test_news_list_not_modified_until_cache_changes()
+    test_banner_not_modified_until_cleared()
+    test_banner_memory_budget_drops_and_reports()
+    test_news_served_while_update_cache_running()
+    test_choose_encoding_quality_and_wildcard()
+    test_choose_encoding_without_brotli()
+    test_compress_body_is_stable()
+    test_prerendered_page_sends_encoding_headers()
+    print("[SUCCESS] HTTP 缓存测试全部通过")
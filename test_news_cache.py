@@ -0,0 +1,585 @@
+#!/usr/bin/env python3
+"""
+新闻缓存（NewsCache）离线测试，不依赖网络
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+from datetime import date
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from core.cache import NewsCache, ServiceStatus, _NewsSnapshot
+from core.config import settings
+from core.blob_store import SQLiteBlobStore, MemoryBlobStore
+from core.search_index import NgramIndex
+from models.news import NewsArticle, SearchScope, NewsSort, NewsView
+
+
+def make_article(index: int, date: str, category: str = "官方动态",
+                 source: str = "OpenHarmony", title: str = None,
+                 summary: str = "", content: list = None) -> NewsArticle:
+    """构造一篇测试文章"""
+    return NewsArticle(
+        id=f"article-{index}",
+        title=title or f"测试文章 {index}",
+        date=date,
+        url=f"https://example.com/article/{index}",
+        content=content or [{"type": "text", "value": f"正文 {index}"}],
+        category=category,
+        summary=summary,
+        source=source
+    )
+
+
+def test_date_keys_sort_mixed_formats():
+    """不同日期格式在入库时统一转换为整数键并按由近到远排序"""
+    cache = NewsCache()
+    cache.update_cache([
+        make_article(1, "2024.08.31"),
+        make_article(2, "2024年09月01日"),
+        make_article(3, "2023-12-25"),
+        make_article(4, "无效日期"),
+    ])
+
+    result = cache.get_news(page=1, page_size=10)
+    assert [article.id for article in result.articles] == [
+        "article-2", "article-1", "article-3", "article-4"
+    ]
+
+
+def test_append_to_cache_keeps_order_and_dedups():
+    """首次加载分批写入时保持日期顺序，并按URL去重"""
+    cache = NewsCache()
+    cache.append_to_cache([make_article(1, "2024-01-01"), make_article(2, "2024-03-01")])
+    cache.append_to_cache([make_article(3, "2024-02-01"), make_article(1, "2024-01-01")])
+
+    result = cache.get_news(page=1, page_size=10)
+    assert [article.id for article in result.articles] == ["article-2", "article-3", "article-1"]
+    assert result.total == 3
+
+
+def test_append_batches_merge_and_defer_search_index():
+    """分批写入逐批归并保持顺序，批次内重复也去重，倒排索引不在搜索请求中构建，而是交给后台线程"""
+    cache = NewsCache()
+    dates = ["2024-03-01", "2023-05-06", "2024-01-15", "2022-12-31", "2024-07-04", "2023-11-11"]
+    articles = [make_article(i, date, title=f"鸿蒙 {i}") for i, date in enumerate(dates)]
+    cache.append_to_cache(articles[:3] + [articles[0]])
+    cache.append_to_cache(articles[3:])
+
+    snapshot = cache._snapshot
+    assert snapshot._text_indexes is None
+    keys = [entry.sort_key for entry in snapshot.entries]
+    assert keys == sorted(keys, reverse=True) and len(keys) == 6
+    assert cache.get_news(search="鸿蒙").total == 6
+    assert cache.get_news(search="鸿蒙", sort=NewsSort.RELEVANCE).total == 6
+    assert snapshot._text_indexes is None
+    assert cache.get_cache_info()["query_cache"]["size"] == 0  # 逐条匹配的结果不缓存
+
+    assert cache._index_builder.wait(10)
+    assert snapshot._text_indexes is not None and snapshot._content_index is None
+    assert cache.get_news(search="鸿蒙").total == 6
+
+
+def test_append_builds_snapshot_incrementally():
+    """分批追加在上一快照的基础上增量构建，二级索引、id 索引、筛选项与内存占用和完整构建一致"""
+    cache = NewsCache()
+    batches = [
+        [make_article(1, "2024-03-01", category="技术博客"), make_article(2, "2023-05-06", source="鸿蒙社区")],
+        [make_article(3, "2024-01-15"), make_article(4, "2024-03-01", category="技术博客"),
+         make_article(5, "2022-12-31", source="鸿蒙社区")],
+        [make_article(6, "2024-07-04", category="技术博客", source="鸿蒙社区"), make_article(7, "未知日期")],
+    ]
+    # 不同 URL、相同 ID 的两篇文章：保留日期较新的一篇
+    duplicate = make_article(8, "2024-08-01")
+    duplicate.id = "article-3"
+    batches.append([duplicate])
+    previous = cache._snapshot
+    for batch in batches:
+        cache.append_to_cache(batch)
+        snapshot = cache._snapshot
+        assert snapshot is not previous and snapshot.generation == previous.generation + 1
+        previous = snapshot
+
+    full = _NewsSnapshot(snapshot.entries, snapshot.generation)
+    keys = [entry.sort_key for entry in snapshot.entries]
+    assert keys == sorted(keys, reverse=True) and len(keys) == 8
+    for name in ("by_category", "by_source", "by_category_source", "by_id", "by_url"):
+        assert getattr(snapshot, name) == getattr(full, name), name
+    assert snapshot.by_id["article-3"].url == "https://example.com/article/8"
+    assert snapshot.facets == full.facets
+    assert snapshot.memory_usage() == full.memory_usage()
+    # 未涉及的分类/来源组合沿用原有数据版本
+    assert snapshot.version_of("技术博客") < snapshot.generation
+    assert snapshot.version_of("官方动态") == snapshot.generation
+
+
+def test_get_news_not_blocked_by_writer_lock():
+    """写入方持有锁时，读取方依然可以无锁读取当前快照"""
+    cache = NewsCache()
+    cache.update_cache([make_article(1, "2024-01-01")])
+
+    lock_held = threading.Event()
+    release = threading.Event()
+
+    def hold_writer_lock():
+        with cache._cache_lock:
+            lock_held.set()
+            release.wait(5)
+
+    writer = threading.Thread(target=hold_writer_lock)
+    writer.start()
+    try:
+        assert lock_held.wait(5)
+        result = cache.get_news(page=1, page_size=10)
+        assert result.total == 1
+        assert cache.get_status()["cache_count"] == 1
+    finally:
+        release.set()
+        writer.join()
+
+
+def test_category_source_index_totals():
+    """分类+来源索引在分页前过滤，total 与 has_next 反映真实数量"""
+    cache = NewsCache()
+    articles = [make_article(i, f"2024-01-{i + 1:02d}") for i in range(5)]
+    articles += [
+        make_article(10 + i, f"2024-02-{i + 1:02d}", category="技术博客", source="OpenHarmony技术博客")
+        for i in range(3)
+    ]
+    cache.update_cache(articles)
+
+    official = cache.get_news(page=1, page_size=2, category="官方动态", source="OpenHarmony")
+    assert official.total == 5
+    assert official.has_next
+    assert [article.id for article in official.articles] == ["article-4", "article-3"]
+
+    blog = cache.get_news(page=2, page_size=2, category="技术博客", source="OpenHarmony技术博客")
+    assert blog.total == 3
+    assert not blog.has_next
+    assert [article.id for article in blog.articles] == ["article-10"]
+
+
+def test_get_article_by_id_and_url():
+    """按 id/url 直接定位文章，不受缓存大小影响"""
+    cache = NewsCache()
+    cache.update_cache([make_article(i, "2024-01-01") for i in range(1500)])
+
+    article = cache.get_article("article-1499")
+    assert article is not None and article.id == "article-1499"
+    assert cache.get_article_by_url("https://example.com/article/7").id == "article-7"
+    assert cache.get_article("missing") is None
+
+
+def test_search_keeps_substring_semantics():
+    """倒排索引检索与原来的大小写不敏感子串匹配结果一致"""
+    cache = NewsCache()
+    cache.update_cache([
+        make_article(1, "2024-01-03", title="OpenHarmony 5.0 正式发布"),
+        make_article(2, "2024-01-02", title="鸿蒙生态大会", summary="ArkTS开发实践分享"),
+        make_article(3, "2024-01-01", title="社区周报", summary="本周 openharmony 社区动态",
+                     category="技术博客", source="OpenHarmony技术博客"),
+    ])
+
+    def search_ids(query, **filters):
+        return [article.id for article in cache.get_news(search=query, **filters).articles]
+
+    assert search_ids("harmony") == ["article-1", "article-3"]
+    assert search_ids("式发") == ["article-1"]
+    assert search_ids("ts开发") == ["article-2"]
+    assert search_ids("社区") == ["article-3"]
+    assert search_ids("harmony", category="技术博客") == ["article-3"]
+    assert search_ids("5.0 正") == ["article-1"]
+    assert search_ids("不存在的词") == []
+
+
+def test_search_index_vocabulary_trigrams():
+    """英文片段的子串/后缀查询通过词表三元组展开，结果与逐词匹配一致"""
+    words = ["openharmony", "harmonyos", "harmony", "arkts", "arkui", "kits", "ts", "a", "mony"]
+    index = NgramIndex(words)
+    for fragment in ("harmony", "rmo", "ark", "mony", "ts", "s", "ny", "xyz", "a"):
+        assert sorted(index._expand_word(fragment, False, False)) == \
+            sorted(word for word in words if fragment in word), fragment
+        assert sorted(index._expand_word(fragment, True, False)) == \
+            sorted(word for word in words if word.startswith(fragment)), fragment
+        assert sorted(index._expand_word(fragment, False, True)) == \
+            sorted(word for word in words if word.endswith(fragment)), fragment
+    assert index.search("armony") == [0, 1, 2]
+    assert index.search("ts") == [3, 5, 6]
+
+
+def test_content_scope_search():
+    """search_scope=content 时同时检索正文文本块和代码块，默认范围不检索正文，也不构建正文索引"""
+    cache = NewsCache()
+    article = make_article(1, "2024-01-01", content=[
+        {"type": "text", "value": "分布式软总线介绍"},
+        {"type": "code", "value": "import router from '@ohos.router'"},
+        {"type": "image", "value": "https://example.com/softbus.png"},
+    ])
+    cache.update_cache([article, make_article(2, "2024-01-02")])
+
+    assert cache.get_news(search="软总线").total == 0
+    assert cache._snapshot._content_index is None
+    assert cache.get_news(search="软总线", search_scope=SearchScope.CONTENT).total == 1
+    assert cache._index_builder.wait(10)
+    assert cache._snapshot._content_index is not None
+    assert cache._snapshot._content_index._haystacks is None
+    assert cache.get_news(search="@ohos.router", search_scope=SearchScope.CONTENT).total == 1
+    assert cache.get_news(search="softbus.png", search_scope=SearchScope.CONTENT).total == 0
+
+
+def test_relevance_sort():
+    """sort=relevance 时标题命中的文章排在只有正文命中的文章之前"""
+    cache = NewsCache()
+    cache.update_cache([
+        make_article(1, "2024-01-03", title="社区周报",
+                     content=[{"type": "text", "value": "本周分布式数据管理有新进展"}]),
+        make_article(2, "2024-01-01", title="分布式数据管理详解", summary="分布式数据管理入门"),
+        make_article(3, "2024-01-02", title="版本发布说明"),
+    ])
+
+    by_date = cache.get_news(search="分布式", search_scope=SearchScope.CONTENT)
+    assert [article.id for article in by_date.articles] == ["article-1", "article-2"]
+
+    by_relevance = cache.get_news(search="分布式", search_scope=SearchScope.CONTENT,
+                                  sort=NewsSort.RELEVANCE)
+    assert [article.id for article in by_relevance.articles] == ["article-2", "article-1"]
+
+
+def test_query_cache_hits_and_generation_invalidation():
+    """相同搜索命中结果缓存；写入新数据后缓存代数递增，旧结果不再命中"""
+    cache = NewsCache()
+    cache.update_cache([make_article(1, "2024-01-01", title="鸿蒙开发")])
+    generation = cache.generation
+
+    assert cache.get_news(search="鸿蒙").total == 1
+    assert cache.get_news(search="鸿蒙", page=2).total == 1
+    stats = cache.get_cache_info()["query_cache"]
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+    cache.update_cache([make_article(1, "2024-01-01", title="鸿蒙开发"),
+                        make_article(2, "2024-01-02", title="鸿蒙生态")])
+    assert cache.generation == generation + 1
+    assert cache.get_news(search="鸿蒙").total == 2
+
+
+def test_render_news_page_memoized_per_generation():
+    """预序列化页面与常规响应内容一致，同一代数内只渲染一次"""
+    cache = NewsCache()
+    cache.update_cache([make_article(i, f"2024-01-{i + 1:02d}") for i in range(5)])
+
+    body = cache.render_news_page(page=1, page_size=2)
+    assert json.loads(body) == cache.get_news(page=1, page_size=2).model_dump(mode="json")
+    assert cache.render_news_page(page=1, page_size=2) is body
+    assert json.loads(cache.render_news_page(all_pages=True))["total"] == 5
+    assert cache.render_news_page(page=100, page_size=2) is None
+
+    cache.update_cache([make_article(9, "2024-02-01")])
+    assert json.loads(cache.render_news_page(page=1, page_size=2))["total"] == 1
+
+
+def test_cursor_pagination_stable_across_refresh():
+    """游标分页在数据刷新（插入更新的文章）后既不重复也不跳过"""
+    cache = NewsCache()
+    articles = [make_article(i, f"2024-01-{i + 1:02d}") for i in range(6)]
+    cache.update_cache(articles)
+
+    first = cache.get_news(page=1, page_size=2)
+    assert [article.id for article in first.articles] == ["article-5", "article-4"]
+    assert first.next_cursor
+
+    # 两次翻页之间插入一篇更新的文章
+    cache.update_cache(articles + [make_article(99, "2024-02-01")])
+    second = cache.get_news(page_size=2, cursor=first.next_cursor)
+    assert [article.id for article in second.articles] == ["article-3", "article-2"]
+    assert second.has_prev and second.has_next
+
+    last = cache.get_news(page_size=2, cursor=second.next_cursor)
+    assert [article.id for article in last.articles] == ["article-1", "article-0"]
+    assert last.next_cursor is None and not last.has_next
+
+    try:
+        cache.get_news(cursor="not-a-cursor")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("无效游标应抛出 ValueError")
+
+
+def test_summary_view_omits_content():
+    """列表视图返回封面图与摘录，不包含正文内容块"""
+    cache = NewsCache()
+    cache.update_cache([
+        make_article(1, "2024-01-02", content=[
+            {"type": "text", "value": "第一段正文"},
+            {"type": "image", "value": "https://example.com/cover.png"},
+            {"type": "text", "value": "第二段正文"},
+        ]),
+        make_article(2, "2024-01-01", summary="已有摘要"),
+    ])
+
+    result = cache.get_news(view=NewsView.SUMMARY)
+    first, second = result.articles
+    assert first.cover_image == "https://example.com/cover.png"
+    assert first.excerpt == "第一段正文 第二段正文"
+    assert second.cover_image is None and second.excerpt == "已有摘要"
+    assert "content" not in json.loads(cache.render_news_page(view=NewsView.SUMMARY))["articles"][0]
+
+
+def test_ndjson_export_streams_snapshot():
+    """NDJSON 导出逐行产出全部匹配文章，导出过程中刷新缓存不影响本次结果"""
+    cache = NewsCache()
+    cache.update_cache([make_article(i, f"2024-01-{i + 1:02d}") for i in range(3)])
+
+    lines = cache.iter_news_ndjson()
+    first = json.loads(next(lines))
+    cache.update_cache([make_article(9, "2024-02-01")])
+    rest = [json.loads(line) for line in lines]
+    assert [first["id"]] + [item["id"] for item in rest] == ["article-2", "article-1", "article-0"]
+
+    summaries = [json.loads(line) for line in cache.iter_news_ndjson(view=NewsView.SUMMARY)]
+    assert summaries[0]["id"] == "article-9" and "content" not in summaries[0]
+
+    # 参数错误与服务错误在调用时立即抛出，而不是在开始发送流之后
+    try:
+        cache.iter_news_ndjson(start_date=date(2024, 2, 1), end_date=date(2024, 1, 1))
+        assert False, "日期区间颠倒应当立即报错"
+    except ValueError:
+        pass
+    cache.set_status(ServiceStatus.ERROR, "测试错误")
+    try:
+        cache.iter_news_ndjson()
+        assert False, "服务错误时应当立即报错"
+    except Exception as e:
+        assert "测试错误" in str(e)
+
+
+def test_date_range_filter():
+    """start_date/end_date 闭区间过滤，可与分类、搜索和相关度排序组合"""
+    cache = NewsCache()
+    articles = [make_article(i, f"2024-01-{i + 1:02d}", title=f"鸿蒙 {i}") for i in range(10)]
+    articles.append(make_article(99, "无效日期"))
+    cache.update_cache(articles)
+
+    def range_ids(**kwargs):
+        return [article.id for article in cache.get_news(page_size=50, **kwargs).articles]
+
+    assert range_ids(start_date=date(2024, 1, 3), end_date=date(2024, 1, 5)) == [
+        "article-4", "article-3", "article-2"
+    ]
+    assert range_ids(start_date=date(2024, 1, 9)) == ["article-9", "article-8"]
+    assert range_ids(end_date=date(2024, 1, 2)) == ["article-1", "article-0", "article-99"]
+    assert range_ids(search="鸿蒙", sort=NewsSort.RELEVANCE,
+                     start_date=date(2024, 1, 10)) == ["article-9"]
+    assert cache.get_news(start_date=date(2025, 1, 1)).total == 0
+
+    try:
+        cache.get_news(start_date=date(2024, 2, 1), end_date=date(2024, 1, 1))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("起始日期晚于结束日期应抛出 ValueError")
+
+
+def test_facet_counts():
+    """筛选项计数在写入时算好，搜索时只统计命中文章"""
+    cache = NewsCache()
+    cache.update_cache([
+        make_article(1, "2024-01-05", title="鸿蒙发布"),
+        make_article(2, "2024-01-20", title="社区周报"),
+        make_article(3, "2024-02-01", title="鸿蒙开发", category="技术博客", source="OpenHarmony技术博客"),
+        make_article(4, "无效日期"),
+    ])
+
+    facets = cache.get_facets()
+    assert facets.total == 4
+    assert facets.categories == {"官方动态": 3, "技术博客": 1}
+    assert facets.sources == {"OpenHarmony": 3, "OpenHarmony技术博客": 1}
+    assert list(facets.months.items()) == [("2024-02", 1), ("2024-01", 2)]
+    assert cache.get_facets() is facets
+
+    narrowed = cache.get_facets(search="鸿蒙")
+    assert narrowed.total == 2
+    assert narrowed.categories == {"官方动态": 1, "技术博客": 1}
+
+
+def test_update_cache_diffs_and_records_changes():
+    """完整更新按URL与内容比对：沿用未变化的条目，记录变更集合，只失效涉及的分类页面"""
+    cache = NewsCache()
+    official = [make_article(i, f"2024-01-{i + 1:02d}") for i in range(3)]
+    blogs = [make_article(10 + i, f"2024-02-{i + 1:02d}", category="技术博客",
+                          source="OpenHarmony技术博客") for i in range(2)]
+    cache.update_cache(official + blogs)
+    generation = cache.generation
+    entries = cache._snapshot.entries
+    official_page = cache.render_news_page(category="官方动态", source="OpenHarmony")
+
+    # 数据完全相同：不发布新快照
+    cache.update_cache(official + blogs)
+    assert cache.generation == generation and cache._snapshot.entries is entries
+
+    # 修改一篇博客、删除一篇博客、新增一篇博客
+    edited = make_article(10, "2024-02-01", title="改过的标题", category="技术博客",
+                          source="OpenHarmony技术博客")
+    added = make_article(20, "2024-03-01", category="技术博客", source="OpenHarmony技术博客")
+    cache.update_cache(official + [edited, added])
+
+    changes = cache.get_last_changes()
+    assert changes.generation == generation + 1
+    assert changes.added == [added.url]
+    assert changes.changed == [edited.url]
+    assert changes.removed == [blogs[1].url]
+    assert cache.get_article("article-0") == official[0]
+    assert [article.id for article in cache.get_news(page_size=10).articles] == [
+        "article-20", "article-10", "article-2", "article-1", "article-0"
+    ]
+    assert cache.render_news_page(category="官方动态", source="OpenHarmony") is official_page
+    assert json.loads(cache.render_news_page(category="技术博客"))["total"] == 2
+
+
+def test_compact_entries_round_trip():
+    """紧凑条目转换回模型后与原文章序列化结果完全一致，重复字符串共享同一对象"""
+    cache = NewsCache()
+    article = make_article(1, "2024-01-01", summary="摘要", content=[
+        {"type": "text", "value": "正文"},
+        {"type": "image", "value": "https://example.com/a.png"},
+        {"type": "code", "value": "print(1)"},
+    ])
+    other = make_article(2, "2024-01-01", category="".join(["官方", "动态"]))
+    cache.update_cache([article, other])
+
+    assert cache.get_article("article-1").model_dump_json() == article.model_dump_json()
+    first, second = cache._snapshot.entries
+    assert first.category is second.category
+    assert not hasattr(first, "__dict__")
+
+
+def test_content_offloaded_to_blob_store():
+    """正文存放在 SQLite 中时内存只保留元数据，详情、列表、检索和导出都按需读取正文"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = SQLiteBlobStore(os.path.join(directory, "content.db"))
+        cache = NewsCache(blob_store=store)
+        articles = [make_article(i, f"2024-01-{i + 1:02d}", content=[
+            {"type": "text", "value": f"分布式软总线 第{i}篇"},
+            {"type": "image", "value": "https://example.com/cover.png"},
+        ]) for i in range(3)]
+        cache.update_cache(articles)
+
+        assert all(entry.content is None for entry in cache._snapshot.entries)
+        assert cache.get_article("article-1") == articles[1]
+        assert cache.get_article("article-1") == articles[1]
+        assert cache.get_cache_info()["content_store"]["hot_cache"]["hits"] == 1
+        assert cache.get_news(page_size=1).articles[0] == articles[2]
+        assert cache.get_news(search="第1篇", search_scope=SearchScope.CONTENT).total == 1
+        assert len(list(cache.iter_news_ndjson())) == 3
+        assert cache.get_news(view=NewsView.SUMMARY).articles[0].cover_image == "https://example.com/cover.png"
+
+        # 被移除文章的正文在下一次写入后才删除，期间旧快照仍可读取
+        cache.update_cache(articles[:2])
+        assert store.get_stats()["count"] == 3
+        cache.update_cache(articles[:2] + [make_article(9, "2024-02-01")])
+        assert store.get_stats()["count"] == 3
+
+
+def test_memory_budget_evicts_content_keeps_metadata():
+    """超出内存预算时先淘汰最久未读、日期最早的正文并转存到溢出存储，元数据保留；预算有余量时完整更新重新载入"""
+    articles = [make_article(i, f"2024-01-{i + 1:02d}", content=[
+        {"type": "text", "value": f"第{i}篇正文" * 200}
+    ]) for i in range(4)]
+    probe = NewsCache(memory_budget=0)
+    probe.update_cache(articles)
+    full_usage = probe.get_cache_info()["memory"]["usage_bytes"]
+    content_size = probe._snapshot.entries[0].content_size
+
+    spill_store = MemoryBlobStore()
+    cache = NewsCache(memory_budget=full_usage - content_size, spill_store=spill_store)
+    cache.append_to_cache(articles[:2])
+    cache.get_article("article-0")
+    before = cache._snapshot
+    cache.append_to_cache(articles[2:])
+
+    # article-1 从未被读取且日期最早（article-0 刚被读过），最先被淘汰，正文从溢出存储读取
+    memory = cache.get_cache_info()["memory"]
+    assert memory["evicted_items"] == 1
+    assert memory["usage_bytes"] <= memory["limit_bytes"]
+    assert memory["spilled"]["count"] == 1
+    assert cache._snapshot.by_id["article-1"].content is None
+    # 已发布的条目不被修改：淘汰换成不含正文的副本，以同一代数发布
+    assert before.by_id["article-1"].content is not None
+    assert cache.generation == before.generation + 1
+    assert cache.get_article("article-1") == articles[1]
+    assert cache.get_article("article-0") == articles[0]
+    assert cache.get_news(page_size=10).articles[2] == articles[1]
+    assert cache.get_news(search="第1篇", search_scope=SearchScope.CONTENT).total == 1
+    assert cache.get_news(view=NewsView.SUMMARY).total == 4
+
+    # 移除一篇后有了余量，完整更新重新载入被淘汰的正文，且不计为修改；溢出的正文在下一次写入时删除
+    cache.update_cache(articles[1:])
+    assert cache._snapshot.by_id["article-1"].content is not None
+    assert cache.get_article("article-1") == articles[1]
+    assert cache.get_last_changes().changed == []
+    cache.update_cache(articles[2:])
+    assert spill_store.get_stats()["count"] == 0
+
+
+def test_change_feed_since_generation():
+    """增量同步只返回 since 之后的最终变更，日志截断或代数超前时要求全量同步"""
+    cache = NewsCache()
+    cache.update_cache([make_article(1, "2024-01-01"), make_article(2, "2024-01-02")])
+    since = cache.generation
+    assert cache.get_changes(since).added == []
+
+    cache.update_cache([make_article(1, "2024-01-01", title="新标题"), make_article(3, "2024-01-03")])
+    cache.update_cache([make_article(1, "2024-01-01", title="新标题"), make_article(3, "2024-01-03"),
+                        make_article(4, "2024-01-04")])
+    cache.update_cache([make_article(1, "2024-01-01", title="新标题"), make_article(3, "2024-01-03")])
+
+    changes = cache.get_changes(since)
+    assert changes.generation == cache.generation and not changes.resync
+    assert [article.id for article in changes.added] == ["article-3"]
+    assert [article.title for article in changes.changed] == ["新标题"]
+    assert changes.removed == ["https://example.com/article/2"]
+    assert not hasattr(changes.added[0], "content")
+    assert cache.get_changes(since, view=NewsView.FULL).added[0].content[0].value == "正文 3"
+
+    assert cache.get_changes(cache.generation + 1).resync
+    original_size = settings.news_change_log_size
+    settings.news_change_log_size = 2
+    try:
+        cache.update_cache([make_article(5, "2024-01-05")])
+        assert cache.get_changes(since).resync
+        assert not cache.get_changes(cache.generation - 1).resync
+    finally:
+        settings.news_change_log_size = original_size
+
+
+if __name__ == "__main__":
+    test_date_keys_sort_mixed_formats()
+    test_append_to_cache_keeps_order_and_dedups()
+    test_append_batches_merge_and_defer_search_index()
+    test_append_builds_snapshot_incrementally()
+    test_get_news_not_blocked_by_writer_lock()
+    test_category_source_index_totals()
+    test_get_article_by_id_and_url()
+    test_search_keeps_substring_semantics()
+    test_search_index_vocabulary_trigrams()
+    test_content_scope_search()
+    test_relevance_sort()
+    test_query_cache_hits_and_generation_invalidation()
+    test_render_news_page_memoized_per_generation()
+    test_cursor_pagination_stable_across_refresh()
+    test_summary_view_omits_content()
+    test_ndjson_export_streams_snapshot()
+    test_date_range_filter()
+    test_facet_counts()
+    test_update_cache_diffs_and_records_changes()
+    test_compact_entries_round_trip()
+    test_content_offloaded_to_blob_store()
+    test_memory_budget_evicts_content_keeps_metadata()
+    test_change_feed_since_generation()
+    print("[SUCCESS] NewsCache 测试全部通过")
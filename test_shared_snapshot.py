@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+多进程共享缓存快照（core.shared_snapshot）离线测试
+owner 与 reader 在同一进程内用两组缓存实例模拟
+"""
+import json
+import os
+import sys
+import tempfile
+from functools import partial
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import core.cache as cache_module
+import core.shared_snapshot as shared_snapshot
+from api import news, banner
+from core.cache import NewsCache, BannerCache
+from core.config import settings
+from core.shared_snapshot import (
+    MappedSnapshot, MmapBlobStore, OwnerRequestPoller, SnapshotExporter, SnapshotFollower, SnapshotRole
+)
+from models.news import NewsArticle, SearchScope, NewsView
+
+
+def make_article(index: int, date: str, title: str = None) -> NewsArticle:
+    """构造一篇测试文章"""
+    return NewsArticle(
+        id=f"article-{index}",
+        title=title or f"测试文章 {index}",
+        date=date,
+        url=f"https://example.com/article/{index}",
+        content=[{"type": "text", "value": f"分布式软总线 第{index}篇"},
+                 {"type": "image", "value": "https://example.com/cover.png"}],
+        category="官方动态",
+        source="OpenHarmony"
+    )
+
+
+def test_reader_serves_owner_snapshot():
+    """只读进程载入 owner 导出的快照：元数据、正文、代数、变更日志与轮播图都一致"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "snapshot.bin")
+        owner_news, owner_banner = NewsCache(), BannerCache()
+        reader_news, reader_banner = NewsCache(blob_store=MmapBlobStore()), BannerCache()
+        exporter = SnapshotExporter(path, owner_news, owner_banner)
+        follower = SnapshotFollower(path, reader_news, reader_banner)
+
+        articles = [make_article(i, f"2024-01-{i + 1:02d}") for i in range(3)]
+        owner_news.update_cache(articles)
+        owner_banner.update_cache([{"url": "https://example.com/banner.png"}])
+        exporter.export()
+        assert follower.poll()
+        assert not follower.poll()  # 文件未变化时不重复载入
+
+        assert reader_news.generation == owner_news.generation
+        assert all(entry.content is None for entry in reader_news._snapshot.entries)
+        assert reader_news.get_article("article-1") == articles[1]
+        assert reader_news.get_news(page_size=1).articles[0] == articles[2]
+        assert reader_news._snapshot.has_search_indexes()  # 标题/摘要索引在跟随线程中已建好
+        assert reader_news.get_news(search="第1篇", search_scope=SearchScope.CONTENT).total == 1
+        assert reader_news.get_news(view=NewsView.SUMMARY).articles[0].cover_image == "https://example.com/cover.png"
+        assert reader_news.get_status()["status"] == "ready"
+        assert reader_banner.get_banner_images() == [{"url": "https://example.com/banner.png"}]
+        assert reader_banner.generation == owner_banner.generation
+
+        # 新快照原子替换后，旧快照中的正文仍可读取（旧快照持有自己的映射）
+        since = owner_news.generation
+        old_snapshot = reader_news._snapshot
+        old_entry = old_snapshot.by_id["article-0"]
+        owner_news.update_cache(articles[1:] + [make_article(9, "2024-02-01", title="新文章")])
+        exporter.export()
+        assert follower.poll()
+        assert reader_news.get_article("article-9").title == "新文章"
+        # 有人按正文搜索过之后，正文索引也在载入新快照时建好
+        assert reader_news._snapshot.has_search_indexes(SearchScope.CONTENT)
+        assert reader_news.get_news(search="第9篇", search_scope=SearchScope.CONTENT).total == 1
+        assert reader_news.get_article("article-0") is None
+        assert reader_news._entry_to_article(old_snapshot, old_entry) == articles[0]
+        changes = reader_news.get_changes(since)
+        assert [article.id for article in changes.added] == ["article-9"]
+        assert changes.removed == ["https://example.com/article/0"]
+
+        # 只有状态变化的导出（代数不变）不切换映射、不重建快照
+        current_snapshot = reader_news._snapshot
+        owner_news.set_updating(True)
+        exporter.export()
+        assert follower.poll()
+        assert reader_news._snapshot is current_snapshot
+        assert reader_news.get_status()["is_updating"]
+
+        # 再切换两次之后，旧快照仍能读取自己的正文
+        owner_news.update_cache(articles[2:] + [make_article(10, "2024-03-01")])
+        exporter.export()
+        assert follower.poll()
+        owner_news.update_cache([make_article(11, "2024-04-01")])
+        exporter.export()
+        assert follower.poll()
+        assert reader_news.get_article("article-1") is None
+        assert reader_news._entry_to_article(old_snapshot, old_entry) == articles[0]
+        assert [entry.to_article(content) for entry, content in
+                zip(old_snapshot.entries, old_snapshot.load_contents(old_snapshot.entries))] == articles[::-1]
+
+
+def test_snapshot_file_layout_and_dedup():
+    """相同内容摘要的正文只写一次，映射按偏移读取"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "snapshot.bin")
+        owner_news = NewsCache()
+        owner_news.update_cache([make_article(1, "2024-01-01")])
+        SnapshotExporter(path, owner_news, BannerCache()).export()
+
+        snapshot = MappedSnapshot(path)
+        assert len(snapshot) == 1
+        content_hash = snapshot.header["news"]["articles"][0]["content_hash"]
+        assert "分布式软总线".encode("utf-8") in snapshot.get(content_hash)
+        assert snapshot.get("missing") is None
+        assert not any(name.endswith(".tmp") for name in os.listdir(directory))
+
+
+def test_reader_hands_writes_to_owner():
+    """只读进程把爬取、刷新与清空缓存转交给 owner（202），自己的缓存副本保持不变，owner 取走请求后执行"""
+    cache_module._news_cache = NewsCache()
+    cache_module._banner_cache = BannerCache()
+    cache_module._banner_cache.update_cache([{"url": "https://example.com/banner.png"}])
+    generation = cache_module._banner_cache.generation
+    app = FastAPI()
+    app.include_router(news.router)
+    app.include_router(banner.router)
+    client = TestClient(app)
+
+    original_role = shared_snapshot._role
+    original_path = settings.shared_snapshot_path
+    original_actions = dict(shared_snapshot._owner_actions)
+    with tempfile.TemporaryDirectory() as directory:
+        settings.shared_snapshot_path = os.path.join(directory, "snapshot.bin")
+        requests_dir = settings.shared_snapshot_path + ".requests"
+        shared_snapshot._role = SnapshotRole.READER
+        try:
+            assert client.post("/api/news/crawl", params={"source": "openharmony"}).status_code == 202
+            assert client.post("/api/news/cache/refresh").status_code == 202
+            assert client.post("/api/banner/crawl").status_code == 202
+            assert client.delete("/api/banner/cache/clear").status_code == 202
+            forced = client.get("/api/banner/mobile", params={"force_crawl": "true"})
+            assert forced.status_code == 202 and forced.json()["images"] == ["https://example.com/banner.png"]
+            assert client.get("/api/banner/mobile").json()["images"] == ["https://example.com/banner.png"]
+
+            # 缓存为空时只读进程不会自行爬取
+            cache_module._banner_cache._cache = []
+            empty = client.get("/api/banner/mobile")
+            assert empty.status_code == 200 and not empty.json()["success"]
+            assert cache_module._banner_cache.generation == generation
+
+            # 同一请求在 owner 取走之前只保留一份；上一次运行留下的请求被丢弃
+            assert sorted(os.listdir(requests_dir)) == [
+                "banner_clear.json", "banner_crawl.json", "news_crawl-openharmony.json", "news_refresh.json"
+            ]
+            with open(os.path.join(requests_dir, "news_refresh-stale.json"), "w", encoding="utf-8") as stale:
+                json.dump({"boot_id": "previous-boot", "action": "news_refresh", "params": {}}, stale)
+
+            handled = []
+
+            async def record(action, **params):
+                handled.append((action, params))
+
+            for action in ("news_crawl", "news_refresh", "banner_crawl", "banner_clear"):
+                shared_snapshot.register_owner_action(action, partial(record, action))
+            poller = OwnerRequestPoller(settings.shared_snapshot_path)
+            assert poller.poll() == 4
+            assert sorted(handled) == [
+                ("banner_clear", {}), ("banner_crawl", {}), ("news_crawl", {"source": "openharmony"}),
+                ("news_refresh", {})
+            ]
+            assert os.listdir(requests_dir) == []
+            assert poller.poll() == 0
+        finally:
+            shared_snapshot._role = original_role
+            settings.shared_snapshot_path = original_path
+            shared_snapshot._owner_actions.clear()
+            shared_snapshot._owner_actions.update(original_actions)
+
+
+if __name__ == "__main__":
+    test_reader_serves_owner_snapshot()
+    test_snapshot_file_layout_and_dedup()
+    test_reader_hands_writes_to_owner()
+    print("[SUCCESS] 共享快照测试全部通过")